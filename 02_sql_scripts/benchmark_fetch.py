@@ -0,0 +1,143 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from mysql.connector.constants import FieldType
+
+from fetch_columnar import leer_columnar
+
+# Compara el camino actual (fetchall -> tuplas con Decimal/datetime -> pd.DataFrame)
+# con el camino columnar (modo raw -> arrays NumPy tipados por columna).
+#
+#   python benchmark_fetch.py                 # contra la base MySQL de DB_CONFIG
+#   python benchmark_fetch.py --sintetico 1000000   # sin base: conversión de filas ya leídas
+
+
+# --- CURSORES EN MEMORIA PARA EL MODO SINTÉTICO ---
+class CursorEnMemoria:
+    """Entrega filas ya leídas, como un cursor en modo raw (bytes por celda)."""
+
+    def __init__(self, filas, description):
+        self.filas = filas
+        self.description = description
+        self.posicion = 0
+
+    def fetchmany(self, n):
+        lote = self.filas[self.posicion:self.posicion + n]
+        self.posicion += n
+        return lote
+
+    def fetchall(self):
+        return self.fetchmany(len(self.filas))
+
+
+class CursorConvertido(CursorEnMemoria):
+    """Como un cursor normal: convierte cada celda a int/str/Decimal/datetime al leerla."""
+
+    def fetchmany(self, n):
+        return [
+            (int(i), c.decode(), Decimal(m.decode()), datetime.fromisoformat(f.decode()))
+            for i, c, m, f in super().fetchmany(n)
+        ]
+
+
+def filas_sinteticas(n):
+    """Filas con la forma de detalle + monto tal como llegan en modo raw (bytes por celda)."""
+    rng = np.random.default_rng(0)
+    ids = np.arange(1, n + 1)
+    centavos = rng.integers(99, 1199, n)
+    segundos = rng.integers(0, 86400 * 270, n)
+    inicio = datetime(2005, 5, 24)
+
+    raw = []
+    for i, c, s in zip(ids.tolist(), centavos.tolist(), segundos.tolist()):
+        fecha = inicio + timedelta(seconds=s)
+        raw.append((str(i).encode(), f"CLIENTE {i % 599}".encode(), f"{c / 100:.2f}".encode(), str(fecha).encode()))
+
+    description = [
+        ("rental_id", FieldType.LONG, None, None, None, None, 0),
+        ("cliente", FieldType.VAR_STRING, None, None, None, None, 0),
+        ("amount", FieldType.NEWDECIMAL, None, None, None, None, 0),
+        ("rental_date", FieldType.DATETIME, None, None, None, None, 0),
+    ]
+    return raw, description
+
+
+# --- CAMINOS A COMPARAR ---
+def camino_tuplas(cursor):
+    resultados = cursor.fetchall()
+    columnas = [col[0] for col in cursor.description]
+    return pd.DataFrame(resultados, columns=columnas)
+
+
+def camino_columnar(cursor):
+    return leer_columnar(cursor)
+
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        df = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), df
+
+
+def imprimir(nombre, filas, t_tuplas, t_columnar, df_tuplas, df_columnar):
+    mb_tuplas = df_tuplas.memory_usage(deep=True).sum() / 1024 ** 2
+    mb_columnar = df_columnar.memory_usage(deep=True).sum() / 1024 ** 2
+    print(
+        f"{nombre:<36} {filas:>10} {t_tuplas:>10.3f} {t_columnar:>10.3f} "
+        f"{t_tuplas / t_columnar if t_columnar else 0:>8.1f}x {mb_tuplas:>9.1f} {mb_columnar:>9.1f}"
+    )
+
+
+def encabezado():
+    print(f"{'consulta':<36} {'filas':>10} {'tuplas s':>10} {'columnar s':>10} {'mejora':>9} {'MB tupl.':>9} {'MB col.':>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: fetch por tuplas vs. fetch columnar tipado.")
+    parser.add_argument("--sintetico", type=int, default=None, help="Filas sintéticas (no usa la base de datos)")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    encabezado()
+    if args.sintetico:
+        # El camino por tuplas incluye la conversión a objetos Python que hace el conector al leer
+        raw, description = filas_sinteticas(args.sintetico)
+        t_tuplas, df_tuplas = medir(lambda: camino_tuplas(CursorConvertido(raw, description)), args.repeticiones)
+        t_columnar, df_columnar = medir(lambda: camino_columnar(CursorEnMemoria(raw, description)), args.repeticiones)
+        imprimir("sintético (detalle + monto)", args.sintetico, t_tuplas, t_columnar, df_tuplas, df_columnar)
+        return
+
+    # Import diferido: el modo sintético no necesita la configuración de conexión
+    from sql_sakila_script import conectar, consultas
+
+    conexion = conectar("mysql", use_pure=False)
+    for nombre_archivo, consulta in consultas.items():
+        def tuplas():
+            cursor = conexion.cursor()
+            cursor.execute(consulta)
+            df = camino_tuplas(cursor)
+            cursor.close()
+            return df
+
+        def columnar():
+            cursor = conexion.cursor(raw=True)
+            cursor.execute(consulta)
+            df = camino_columnar(cursor)
+            cursor.close()
+            return df
+
+        t_tuplas, df_tuplas = medir(tuplas, args.repeticiones)
+        t_columnar, df_columnar = medir(columnar, args.repeticiones)
+        imprimir(nombre_archivo, len(df_tuplas), t_tuplas, t_columnar, df_tuplas, df_columnar)
+    conexion.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import time
+
+from sql_sakila_script import MOTORES, conectar, consultas
+
+# Ejecuta el mismo set de reportes en cada motor (mismos datos: ambos se cargan desde
+# 01_data_raw/sakila-db.zip) y compara tiempo de consulta + lectura y filas/s.
+#
+#   python benchmark_motores.py                    # mysql y sqlite
+#   python benchmark_motores.py --motores sqlite   # sin servidor MySQL
+
+
+def medir(conexion, consulta, repeticiones):
+    """Mejor tiempo de execute + fetchall y las filas de la última corrida."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        cursor = conexion.cursor()
+        cursor.execute(consulta)
+        filas = cursor.fetchall()
+        cursor.close()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: mismas consultas en MySQL y en SQLite.")
+    parser.add_argument("--motores", nargs="+", choices=MOTORES, default=MOTORES)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    resultados = {}
+    for motor in args.motores:
+        try:
+            conexion = conectar(motor)
+        except Exception as error:
+            print(f"⚠️ Motor {motor} no disponible: {type(error).__name__}: {error}")
+            continue
+        for nombre_archivo, consulta in consultas.items():
+            resultados[motor, nombre_archivo] = medir(conexion, consulta, args.repeticiones)
+        conexion.close()
+
+    motores = [m for m in args.motores if any(motor == m for motor, _ in resultados)]
+    print(f"{'consulta':<36} {'motor':<8} {'filas':>8} {'segundos':>10} {'filas/s':>12}")
+    for nombre_archivo in consultas:
+        referencia = None
+        for motor in motores:
+            segundos, filas = resultados[motor, nombre_archivo]
+            # Mismo contenido en ambos motores; el orden de los empates del ORDER BY puede variar
+            contenido = sorted(map(repr, filas))
+            igual = "" if referencia is None else ("  = mismas filas" if contenido == referencia else "  ≠ filas distintas")
+            referencia = referencia or contenido
+            print(
+                f"{nombre_archivo:<36} {motor:<8} {len(filas):>8} {segundos:>10.3f} "
+                f"{len(filas) / segundos if segundos else 0:>12,.0f}{igual}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+
+from motor_sqlite import ConexionSQLite
+from planes_consultas import tablas_de_consulta
+
+
+# --- HUELLAS ---
+# Cada CSV exportado guarda a su lado (<archivo>.huella.json) el hash de su SQL y, por cada
+# tabla de origen, una suma de verificación de su contenido: CHECKSUM TABLE en MySQL y un
+# SHA-256 de las filas en SQLite. No depende de last_update (que en SQLite ningún trigger
+# renueva, y que en MySQL no delata un DELETE + INSERT en el mismo segundo ni un UPDATE que
+# fija last_update a mano), así que si la huella coincide el resultado de la consulta no cambió.
+LOTE_SUMA = 10_000
+
+
+def ruta_huella(ruta_csv):
+    return ruta_csv + ".huella.json"
+
+
+def hash_consulta(consulta):
+    # Se normalizan los espacios: reindentar la consulta no la invalida
+    return hashlib.sha256(" ".join(consulta.split()).encode("utf-8")).hexdigest()
+
+
+def _suma_sqlite(conexion, tabla):
+    # Sobre la conexión sqlite3 directa: las filas se leen en orden de rowid, por lotes
+    cursor = conexion.sqlite.execute(f"SELECT * FROM {tabla}")
+    suma, filas = hashlib.sha256(), 0
+    while (lote := cursor.fetchmany(LOTE_SUMA)):
+        suma.update(repr(lote).encode("utf-8"))
+        filas += len(lote)
+    cursor.close()
+    return {"filas": filas, "suma": suma.hexdigest()}
+
+
+def huella_tablas(conexion, tablas):
+    if isinstance(conexion, ConexionSQLite):
+        return {tabla: _suma_sqlite(conexion, tabla) for tabla in tablas}
+    if not tablas:
+        return {}
+    cursor = conexion.cursor()
+    cursor.execute(f"CHECKSUM TABLE {', '.join(tablas)}")
+    # Devuelve (esquema.tabla, suma) por tabla, en el orden pedido
+    huellas = {tabla: {"suma": str(suma)} for tabla, (_, suma) in zip(tablas, cursor.fetchall())}
+    cursor.close()
+    return huellas
+
+
+def huellas_actuales(conexion, consultas, origen):
+    """Huella de cada consulta; cada tabla se consulta una sola vez aunque la usen varias."""
+    tablas_por_consulta = {n: sorted(set(tablas_de_consulta(c).values())) for n, c in consultas.items()}
+    tablas = huella_tablas(conexion, sorted({t for ts in tablas_por_consulta.values() for t in ts}))
+    return {
+        nombre_archivo: {
+            "origen": origen,
+            "sql": hash_consulta(consulta),
+            "tablas": {t: tablas[t] for t in tablas_por_consulta[nombre_archivo]},
+        }
+        for nombre_archivo, consulta in consultas.items()
+    }
+
+
+def leer_huella(ruta_csv):
+    ruta = ruta_huella(ruta_csv)
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def guardar_huellas(huellas, nombres_archivo, output_folder):
+    # Solo para los CSV que se escribieron bien; la huella se tomó antes de exportar,
+    # así un cambio durante la exportación vuelve a disparar la consulta en la próxima corrida
+    for nombre_archivo in nombres_archivo:
+        ruta = ruta_huella(os.path.join(output_folder, nombre_archivo))
+        with open(ruta + ".parcial", "w", encoding="utf-8") as f:
+            json.dump(huellas[nombre_archivo], f, indent=2)
+        os.replace(ruta + ".parcial", ruta)
+
+
+# --- CONSULTAS A EXPORTAR ---
+def consultas_pendientes(huellas, consultas, output_folder):
+    """Consultas sin CSV, sin huella o cuya huella (SQL, origen o tablas) cambió."""
+    pendientes = {}
+    for nombre_archivo, consulta in consultas.items():
+        ruta_csv = os.path.join(output_folder, nombre_archivo)
+        if not os.path.exists(ruta_csv) or leer_huella(ruta_csv) != huellas[nombre_archivo]:
+            pendientes[nombre_archivo] = consulta
+    return pendientes
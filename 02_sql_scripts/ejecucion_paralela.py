@@ -0,0 +1,65 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from exportacion_streaming import exportar_consulta_streaming
+
+
+# --- TAREA POR CONSULTA ---
+def _exportar_con_pool(pool, nombre_archivo, consulta, output_folder, tamano_lote, timeout_segundos):
+    inicio = time.perf_counter()
+    resultado = {"archivo": nombre_archivo, "ok": False, "filas": 0, "error": None}
+    conexion = None
+    try:
+        conexion = pool.get_connection()
+        espera = time.perf_counter() - inicio
+
+        if timeout_segundos:
+            # El servidor corta la consulta si excede el límite (MySQL >= 5.7, solo SELECT)
+            cursor = conexion.cursor()
+            cursor.execute(f"SET SESSION MAX_EXECUTION_TIME = {int(timeout_segundos * 1000)}")
+            cursor.close()
+
+        ruta = os.path.join(output_folder, nombre_archivo)
+        stats = exportar_consulta_streaming(conexion, consulta, ruta, tamano_lote)
+        resultado.update(stats)
+        resultado["ok"] = True
+        resultado["espera_pool_segundos"] = espera
+        resultado["segundos_consulta"] = stats["segundos"]
+    except Exception as error:
+        # Aislamiento de fallos: el error queda en el resultado y no afecta a las demás consultas
+        resultado["error"] = f"{type(error).__name__}: {error}"
+    finally:
+        if conexion is not None:
+            conexion.close()  # Devuelve la conexión al pool
+        resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+
+# --- EJECUCIÓN EN PARALELO ---
+def exportar_en_paralelo(pool, consultas, output_folder, workers, tamano_lote=10000, timeout_segundos=None):
+    """
+    Ejecuta las consultas a la vez sobre un pool acotado de conexiones.
+    Cada consulta usa su propia conexión del pool y escribe su propio CSV;
+    devuelve un resultado por consulta con tiempos, filas y error (si lo hubo).
+    """
+    resultados = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export") as ejecutor:
+        futuros = [
+            ejecutor.submit(
+                _exportar_con_pool, pool, nombre_archivo, consulta,
+                output_folder, tamano_lote, timeout_segundos
+            )
+            for nombre_archivo, consulta in consultas.items()
+        ]
+        for futuro in as_completed(futuros):
+            resultado = futuro.result()
+            resultados.append(resultado)
+            if resultado["ok"]:
+                print(
+                    f"✅ Exportado: {resultado['archivo']} ({resultado['filas']} filas, "
+                    f"{resultado['segundos']:.2f} s)"
+                )
+            else:
+                print(f"❌ Falló: {resultado['archivo']} ({resultado['segundos']:.2f} s) -> {resultado['error']}")
+    return resultados
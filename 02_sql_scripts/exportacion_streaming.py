@@ -0,0 +1,115 @@
+import csv
+import os
+import resource
+import sys
+import time
+
+
+# --- MEDICIÓN DE MEMORIA ---
+def rss_actual_mb():
+    """RSS actual del proceso en MB (Linux: /proc/self/statm; resto: pico del proceso)."""
+    try:
+        with open("/proc/self/statm") as f:
+            paginas_residentes = int(f.read().split()[1])
+        return paginas_residentes * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, IndexError):
+        return rss_pico_proceso_mb()
+
+
+def rss_pico_proceso_mb():
+    """Pico de RSS de todo el proceso en MB (ru_maxrss viene en KB en Linux y en bytes en macOS)."""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1024 ** 2 if sys.platform == "darwin" else pico / 1024
+
+
+def reiniciar_pico_rss():
+    """
+    Pone el pico de RSS (VmHWM) en el RSS actual, para medir el pico de una sola consulta
+    (Linux: escribir "5" en /proc/self/clear_refs). False si el sistema no lo permite.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def rss_pico_mb():
+    """Pico de RSS desde el último reiniciar_pico_rss (VmHWM) en MB; 0.0 si no está disponible."""
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0.0
+
+
+# --- EXPORTACIÓN POR LOTES ---
+def _cerrar_cursor(conexion, cursor):
+    # Si la exportación se corta a mitad, el cursor sin buffer todavía tiene filas pendientes
+    # y mysql.connector no lo deja cerrar ("Unread result found"), lo que taparía el error
+    # original: el resultado pendiente se descarta antes. ConexionSQLite no lo necesita.
+    if getattr(conexion, "unread_result", False):
+        conexion.consume_results()
+    cursor.close()
+
+
+def exportar_consulta_streaming(conexion, consulta, ruta_salida, tamano_lote=10000):
+    """
+    Ejecuta la consulta con un cursor sin buffer (el servidor entrega las filas
+    a medida que se leen) y escribe cada lote de fetchmany directo al CSV.
+    La memoria queda acotada por el tamaño del lote, no por el total de filas.
+    El CSV se escribe en un archivo temporal y se renombra al terminar, así
+    una consulta que falla nunca deja un archivo truncado.
+    """
+    cursor = conexion.cursor(buffered=False)
+    reiniciar_pico_rss()
+    inicio = time.perf_counter()
+    filas = 0
+    rss_pico = rss_actual_mb()
+    ruta_temporal = ruta_salida + ".parcial"
+    # Tiempo por fase: execute, fetchmany y escritura del CSV. Con el cursor sin buffer el
+    # servidor entrega las filas a medida que se piden, así que el fetch incluye su trabajo.
+    segundos_fetch = segundos_serializacion = 0.0
+
+    try:
+        cursor.execute(consulta)
+        segundos_execute = time.perf_counter() - inicio
+        columnas = [col[0] for col in cursor.description]
+
+        # Mismo formato que DataFrame.to_csv(index=False): utf-8, QUOTE_MINIMAL y os.linesep
+        with open(ruta_temporal, "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.writer(archivo, lineterminator=os.linesep)
+            escritor.writerow(columnas)
+            while True:
+                marca = time.perf_counter()
+                lote = cursor.fetchmany(tamano_lote)
+                segundos_fetch += time.perf_counter() - marca
+                if not lote:
+                    break
+                marca = time.perf_counter()
+                escritor.writerows(lote)
+                segundos_serializacion += time.perf_counter() - marca
+                filas += len(lote)
+                rss_pico = max(rss_pico, rss_actual_mb())
+        os.replace(ruta_temporal, ruta_salida)
+    finally:
+        _cerrar_cursor(conexion, cursor)
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+
+    segundos = time.perf_counter() - inicio
+    return {
+        "archivo": os.path.basename(ruta_salida),
+        "filas": filas,
+        "segundos": segundos,
+        "filas_por_segundo": filas / segundos if segundos > 0 else 0.0,
+        "rss_pico_mb": max(rss_pico, rss_pico_mb()),
+        "segundos_execute": segundos_execute,
+        "segundos_fetch": segundos_fetch,
+        "segundos_serializacion": segundos_serializacion,
+        "bytes": os.path.getsize(ruta_salida),
+    }
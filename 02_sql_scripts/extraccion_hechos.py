@@ -0,0 +1,315 @@
+import os
+import time
+
+import pandas as pd
+
+from exportacion_streaming import reiniciar_pico_rss, rss_pico_mb
+
+# --- CONSULTA DE HECHOS ---
+# Una sola pasada por rental/payment con los ids necesarios para derivar los cuatro
+# reportes agregados. Los nombres (categoría, película, cliente) se traen aparte desde
+# tablas pequeñas, así la tabla de hechos solo lleva enteros, la fecha y el monto en centavos.
+# film, category y store no se unen: las claves foráneas de inventory/film_category
+# garantizan las mismas filas que los INNER JOIN de las consultas originales.
+# La segunda parte del UNION agrega los pagos sin alquiler asociado, que sí cuentan
+# en clientes_mas_frecuentes (customer JOIN payment).
+CONSULTA_HECHOS = """
+    SELECT
+        r.rental_id,
+        r.rental_date,
+        i.film_id,
+        fc.category_id,
+        i.store_id,
+        p.payment_id,
+        p.customer_id,
+        CAST(ROUND(p.amount * 100) AS SIGNED) AS centavos
+    FROM rental r
+    JOIN inventory i ON r.inventory_id = i.inventory_id
+    LEFT JOIN film_category fc ON i.film_id = fc.film_id
+    LEFT JOIN payment p ON p.rental_id = r.rental_id
+    UNION ALL
+    SELECT
+        NULL, NULL, NULL, NULL, NULL,
+        p.payment_id,
+        p.customer_id,
+        CAST(ROUND(p.amount * 100) AS SIGNED)
+    FROM payment p
+    LEFT JOIN rental r ON p.rental_id = r.rental_id
+    WHERE r.rental_id IS NULL;
+"""
+
+CONSULTAS_DIMENSIONES = {
+    "categorias": "SELECT category_id, name AS categoria FROM category;",
+    "peliculas": "SELECT film_id, title AS pelicula FROM film;",
+    "clientes": "SELECT customer_id, CONCAT(first_name, ' ', last_name) AS cliente FROM customer;",
+}
+
+# Tipos compactos de la tabla de hechos (enteros nulables donde el LEFT JOIN puede dejar NULL)
+TIPOS_HECHOS = {
+    "rental_id": "Int64",
+    "film_id": "Int32",
+    "category_id": "Int16",
+    "store_id": "Int16",
+    "payment_id": "Int64",
+    "customer_id": "Int32",
+    "centavos": "Int64",
+}
+
+REPORTES_DERIVADOS = [
+    "alquileres_por_mes_categoria.csv",
+    "ingresos_por_tienda_categoria.csv",
+    "peliculas_mas_rentables.csv",
+    "clientes_mas_frecuentes.csv",
+]
+
+
+# --- EXTRACCIÓN ---
+def leer_hechos(cursor, tamano_lote=100000):
+    """Lee el resultado del cursor por lotes y lo convierte a tipos compactos lote a lote."""
+    columnas = [col[0] for col in cursor.description]
+    partes = []
+    while True:
+        lote = cursor.fetchmany(tamano_lote)
+        if not lote:
+            break
+        parte = pd.DataFrame(lote, columns=columnas)
+        parte["rental_date"] = pd.to_datetime(parte["rental_date"])
+        partes.append(parte.astype(TIPOS_HECHOS))
+    if not partes:
+        vacio = pd.DataFrame(columns=columnas).astype(TIPOS_HECHOS)
+        vacio["rental_date"] = pd.to_datetime(vacio["rental_date"])
+        return vacio
+    return pd.concat(partes, ignore_index=True)
+
+
+def extraer_hechos(conexion, tamano_lote=100000, consulta=CONSULTA_HECHOS):
+    """Ejecuta la consulta de hechos y las de dimensiones; devuelve (hechos, dimensiones, segundos_bd)."""
+    inicio = time.perf_counter()
+    cursor = conexion.cursor(buffered=False)
+    cursor.execute(consulta)
+    hechos = leer_hechos(cursor, tamano_lote)
+    cursor.close()
+
+    dimensiones = {}
+    cursor = conexion.cursor()
+    for nombre, consulta_dim in CONSULTAS_DIMENSIONES.items():
+        cursor.execute(consulta_dim)
+        columnas = [col[0] for col in cursor.description]
+        dimensiones[nombre] = pd.DataFrame(cursor.fetchall(), columns=columnas)
+    cursor.close()
+    return hechos, dimensiones, time.perf_counter() - inicio
+
+
+# --- AGREGACIÓN VECTORIZADA ---
+def agregar_hechos(hechos):
+    """
+    Agrega la tabla de hechos por las claves de cada reporte. Devuelve montos en
+    centavos (enteros) y claves por id, para poder sumar agregados parciales
+    (por ejemplo, deltas incrementales) sin perder precisión.
+    """
+    con_alquiler = hechos[hechos["rental_id"].notna()]
+    con_categoria = con_alquiler[con_alquiler["category_id"].notna()]
+    pagos = hechos[hechos["payment_id"].notna()]
+
+    # Alquileres por mes y categoría: un conteo por (alquiler, categoría) aunque tenga varios pagos
+    alquileres = con_categoria.drop_duplicates(["rental_id", "category_id"])
+    alquileres_mes = (
+        alquileres.groupby([alquileres["rental_date"].dt.strftime("%Y-%m").rename("mes"), "category_id"])
+                  .size().rename("total_alquileres").reset_index()
+    )
+
+    # Ingresos por tienda y categoría: cada pago una vez por categoría de su película
+    pagos_categoria = pagos[pagos["category_id"].notna()].drop_duplicates(["payment_id", "category_id"])
+    ingresos_tienda = (
+        pagos_categoria.groupby(["store_id", "category_id"])["centavos"]
+                       .sum().rename("ingresos").reset_index()
+    )
+
+    # Películas y clientes: cada pago una sola vez
+    pagos_unicos = pagos.drop_duplicates("payment_id")
+    pagos_pelicula = pagos_unicos[pagos_unicos["film_id"].notna()]
+    peliculas = (
+        pagos_pelicula.groupby("film_id")
+                      .agg(total_alquileres=("payment_id", "size"), total_ingresos=("centavos", "sum"))
+                      .reset_index()
+    )
+    clientes = (
+        pagos_unicos.groupby("customer_id")
+                    .agg(total_transacciones=("payment_id", "size"), total_gastado=("centavos", "sum"))
+                    .reset_index()
+    )
+
+    return {
+        "alquileres_por_mes_categoria.csv": alquileres_mes,
+        "ingresos_por_tienda_categoria.csv": ingresos_tienda,
+        "peliculas_mas_rentables.csv": peliculas,
+        "clientes_mas_frecuentes.csv": clientes,
+    }
+
+
+# --- NOMBRES, ORDEN Y FORMATO DE SALIDA ---
+# Claves del GROUP BY de cada reporte (por nombre, como en las consultas originales)
+CLAVES_REPORTES = {
+    "alquileres_por_mes_categoria.csv": ["mes", "categoria"],
+    "ingresos_por_tienda_categoria.csv": ["store_id", "categoria"],
+    "peliculas_mas_rentables.csv": ["pelicula"],
+    "clientes_mas_frecuentes.csv": ["customer_id", "cliente"],
+}
+
+# ORDER BY de cada consulta original: (columnas, ascendente)
+ORDEN_REPORTES = {
+    "alquileres_por_mes_categoria.csv": (["mes", "total_alquileres"], [True, False]),
+    "ingresos_por_tienda_categoria.csv": (["ingresos"], [False]),
+    "peliculas_mas_rentables.csv": (["total_ingresos"], [False]),
+    "clientes_mas_frecuentes.csv": (["total_gastado"], [False]),
+}
+
+# Columnas de monto, que se manejan en centavos enteros hasta el momento de escribir
+COLUMNAS_MONTO = {
+    "ingresos_por_tienda_categoria.csv": "ingresos",
+    "peliculas_mas_rentables.csv": "total_ingresos",
+    "clientes_mas_frecuentes.csv": "total_gastado",
+}
+
+COLUMNAS_REPORTES = {
+    "alquileres_por_mes_categoria.csv": ["mes", "categoria", "total_alquileres"],
+    "ingresos_por_tienda_categoria.csv": ["store_id", "categoria", "ingresos"],
+    "peliculas_mas_rentables.csv": ["pelicula", "total_alquileres", "total_ingresos"],
+    "clientes_mas_frecuentes.csv": ["customer_id", "cliente", "total_transacciones", "total_gastado"],
+}
+
+
+def centavos_a_texto(centavos):
+    # Mismo texto que el DECIMAL de SUM(p.amount) en MySQL: siempre dos decimales
+    return (centavos.astype("int64") / 100).map("{:.2f}".format)
+
+
+def texto_a_centavos(montos):
+    return (pd.to_numeric(montos) * 100).round().astype("int64")
+
+
+def nombrar_agregados(agregados, dimensiones):
+    """Reemplaza los ids por nombres y reagrupa por las claves de cada reporte (montos en centavos)."""
+    categorias = dimensiones["categorias"].set_index("category_id")["categoria"]
+    peliculas = dimensiones["peliculas"].set_index("film_id")["pelicula"]
+    clientes = dimensiones["clientes"].set_index("customer_id")["cliente"]
+
+    alquileres_mes = agregados["alquileres_por_mes_categoria.csv"].copy()
+    alquileres_mes["categoria"] = alquileres_mes["category_id"].astype("int64").map(categorias)
+
+    ingresos = agregados["ingresos_por_tienda_categoria.csv"].copy()
+    ingresos["store_id"] = ingresos["store_id"].astype("int64")
+    ingresos["categoria"] = ingresos["category_id"].astype("int64").map(categorias)
+
+    pelis = agregados["peliculas_mas_rentables.csv"].copy()
+    pelis["pelicula"] = pelis["film_id"].astype("int64").map(peliculas)
+
+    clis = agregados["clientes_mas_frecuentes.csv"].copy()
+    clis["customer_id"] = clis["customer_id"].astype("int64")
+    clis["cliente"] = clis["customer_id"].map(clientes)
+    clis = clis[clis["cliente"].notna()]  # customer JOIN payment
+
+    return combinar_reportes({
+        "alquileres_por_mes_categoria.csv": alquileres_mes,
+        "ingresos_por_tienda_categoria.csv": ingresos,
+        "peliculas_mas_rentables.csv": pelis,
+        "clientes_mas_frecuentes.csv": clis,
+    })
+
+
+def combinar_reportes(*partes):
+    """Suma reportes nombrados (totales previos + deltas, por ejemplo) por las claves de cada uno."""
+    combinados = {}
+    for nombre_archivo, claves in CLAVES_REPORTES.items():
+        columnas = COLUMNAS_REPORTES[nombre_archivo]
+        df = pd.concat([p[nombre_archivo][columnas] for p in partes if nombre_archivo in p], ignore_index=True)
+        valores = [c for c in columnas if c not in claves]
+        combinados[nombre_archivo] = df.groupby(claves, as_index=False, sort=False)[valores].sum()
+    return combinados
+
+
+def ordenar_y_formatear(reportes):
+    """Aplica el ORDER BY de cada consulta original y el formato de montos del CSV."""
+    salida = {}
+    for nombre_archivo, df in reportes.items():
+        columnas, ascendente = ORDEN_REPORTES[nombre_archivo]
+        # Orden estable: los empates del ORDER BY quedan ordenados por las claves del GROUP BY
+        df = (
+            df.sort_values(CLAVES_REPORTES[nombre_archivo], kind="stable")
+              .sort_values(columnas, ascending=ascendente, kind="stable")
+              .reset_index(drop=True)
+        )
+        if nombre_archivo in COLUMNAS_MONTO:
+            columna = COLUMNAS_MONTO[nombre_archivo]
+            df[columna] = centavos_a_texto(df[columna])
+        salida[nombre_archivo] = df[COLUMNAS_REPORTES[nombre_archivo]]
+    return salida
+
+
+def formatear_reportes(agregados, dimensiones):
+    """Aplica nombres, el ORDER BY de cada consulta original y el formato de salida del CSV."""
+    return ordenar_y_formatear(nombrar_agregados(agregados, dimensiones))
+
+
+# --- MEDICIÓN DE LAS CONSULTAS ORIGINALES ---
+def medir_consultas(conexion, consultas):
+    """Tiempo de BD (execute + lectura completa) de cada consulta, sin exportar nada."""
+    tiempos = {}
+    cursor = conexion.cursor(buffered=False)
+    for nombre_archivo, consulta in consultas.items():
+        inicio = time.perf_counter()
+        cursor.execute(consulta)
+        while cursor.fetchmany(100000):
+            pass
+        tiempos[nombre_archivo] = time.perf_counter() - inicio
+    cursor.close()
+    return tiempos
+
+
+# --- MODO HECHOS ---
+def exportar_desde_hechos(conexion, consultas, output_folder, tamano_lote=100000, comparar=False, metricas=None):
+    """
+    Extrae la tabla de hechos en un solo escaneo, deriva los cuatro reportes
+    agregados en memoria y los escribe. Con comparar=True también mide las
+    consultas originales para reportar cuánto tiempo de BD se ahorró.
+    Con metricas (ver instrumentacion.py) registra el escaneo como consulta "tabla_hechos"
+    (execute + lectura juntos: el cursor sin buffer no los separa) y la escritura de cada reporte.
+    """
+    reiniciar_pico_rss()
+    hechos, dimensiones, segundos_bd = extraer_hechos(conexion, tamano_lote)
+    print(f"📦 Tabla de hechos: {len(hechos)} filas, {hechos.memory_usage(deep=True).sum() / 1024 ** 2:.1f} MB, BD {segundos_bd:.2f} s")
+
+    inicio = time.perf_counter()
+    reportes = formatear_reportes(agregar_hechos(hechos), dimensiones)
+    segundos_agregacion = time.perf_counter() - inicio
+    if metricas is not None:
+        metricas.registrar("exportacion", {"consulta": "tabla_hechos", "modo": "hechos"}, {
+            "fetch_segundos": segundos_bd,
+            "derivacion_segundos": segundos_agregacion,
+            "filas": len(hechos),
+            "rss_pico_bytes": int(rss_pico_mb() * 2**20),
+        })
+    for nombre_archivo, df in reportes.items():
+        marca = time.perf_counter()
+        ruta = os.path.join(output_folder, nombre_archivo)
+        df.to_csv(ruta, index=False)
+        print(f"✅ Exportado: {nombre_archivo} ({len(df)} filas)")
+        if metricas is not None:
+            metricas.registrar("exportacion", {"consulta": nombre_archivo, "modo": "hechos"}, {
+                "serializacion_segundos": time.perf_counter() - marca,
+                "filas": len(df),
+                "bytes_escritos": os.path.getsize(ruta),
+            })
+    segundos_derivacion = time.perf_counter() - inicio
+    print(f"⚙️ Derivación en memoria: {segundos_derivacion:.2f} s")
+
+    if comparar:
+        tiempos = medir_consultas(conexion, {n: consultas[n] for n in REPORTES_DERIVADOS})
+        segundos_originales = sum(tiempos.values())
+        ahorro = segundos_originales - segundos_bd
+        porcentaje = ahorro / segundos_originales * 100 if segundos_originales > 0 else 0.0
+        print(
+            f"⏱️ Tiempo de BD: escaneo único {segundos_bd:.2f} s vs. consultas originales "
+            f"{segundos_originales:.2f} s -> ahorro {ahorro:.2f} s ({porcentaje:.1f}%)"
+        )
+    return reportes
@@ -0,0 +1,282 @@
+import csv
+import json
+import os
+import time
+
+import pandas as pd
+
+from exportacion_streaming import reiniciar_pico_rss, rss_actual_mb, rss_pico_mb
+from extraccion_hechos import (
+    COLUMNAS_MONTO,
+    CONSULTAS_DIMENSIONES,
+    REPORTES_DERIVADOS,
+    agregar_hechos,
+    combinar_reportes,
+    leer_hechos,
+    nombrar_agregados,
+    ordenar_y_formatear,
+    texto_a_centavos,
+)
+
+ARCHIVO_MARCAS = "marcas_agua.json"
+DETALLE = "detalle_alquileres.csv"
+
+
+# --- MARCAS DE AGUA ---
+# Por cada archivo de salida se guarda hasta qué rental_id / payment_id ya está incluido.
+# Los ids son AUTO_INCREMENT, así que todo lo nuevo queda por encima de la marca.
+# Las filas modificadas en el lugar (UPDATE) no se detectan: para eso está --reconstruir.
+def leer_marcas(output_folder):
+    ruta = os.path.join(output_folder, ARCHIVO_MARCAS)
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def guardar_marcas(output_folder, marcas):
+    ruta = os.path.join(output_folder, ARCHIVO_MARCAS)
+    with open(ruta + ".parcial", "w", encoding="utf-8") as f:
+        json.dump(marcas, f, indent=2)
+    os.replace(ruta + ".parcial", ruta)
+
+
+def consultar_maximos(conexion):
+    # Primero payment y después rental: así todo pago <= max_pago apunta a un alquiler <= max_alquiler
+    cursor = conexion.cursor()
+    cursor.execute("SELECT COALESCE(MAX(payment_id), 0) FROM payment;")
+    max_pago = int(cursor.fetchone()[0])
+    cursor.execute("SELECT COALESCE(MAX(rental_id), 0) FROM rental;")
+    max_alquiler = int(cursor.fetchone()[0])
+    cursor.close()
+    return max_alquiler, max_pago
+
+
+# --- CONSULTAS DELTA ---
+def consulta_hechos_delta(desde_alquiler, hasta_alquiler, desde_pago, hasta_pago):
+    """
+    Misma forma que CONSULTA_HECHOS pero solo con la actividad nueva:
+    alquileres en (desde_alquiler, hasta_alquiler] con sus pagos nuevos, y pagos
+    nuevos de alquileres ya incluidos (o sin alquiler), con rental_id en NULL para
+    que no vuelvan a contar como alquiler.
+    """
+    desde_alquiler, hasta_alquiler = int(desde_alquiler), int(hasta_alquiler)
+    desde_pago, hasta_pago = int(desde_pago), int(hasta_pago)
+    return f"""
+        SELECT
+            r.rental_id,
+            r.rental_date,
+            i.film_id,
+            fc.category_id,
+            i.store_id,
+            p.payment_id,
+            p.customer_id,
+            CAST(ROUND(p.amount * 100) AS SIGNED) AS centavos
+        FROM rental r
+        JOIN inventory i ON r.inventory_id = i.inventory_id
+        LEFT JOIN film_category fc ON i.film_id = fc.film_id
+        LEFT JOIN payment p ON p.rental_id = r.rental_id
+            AND p.payment_id > {desde_pago} AND p.payment_id <= {hasta_pago}
+        WHERE r.rental_id > {desde_alquiler} AND r.rental_id <= {hasta_alquiler}
+        UNION ALL
+        SELECT
+            NULL,
+            NULL,
+            i.film_id,
+            fc.category_id,
+            i.store_id,
+            p.payment_id,
+            p.customer_id,
+            CAST(ROUND(p.amount * 100) AS SIGNED)
+        FROM payment p
+        LEFT JOIN rental r ON p.rental_id = r.rental_id
+        LEFT JOIN inventory i ON r.inventory_id = i.inventory_id
+        LEFT JOIN film_category fc ON i.film_id = fc.film_id
+        WHERE p.payment_id > {desde_pago} AND p.payment_id <= {hasta_pago}
+          AND (r.rental_id IS NULL OR r.rental_id <= {desde_alquiler});
+    """
+
+
+def consulta_detalle_delta(consulta_detalle, desde_alquiler, hasta_alquiler):
+    # Envuelve la consulta de detalle original para no duplicar sus JOIN
+    base = consulta_detalle.strip().rstrip(";")
+    return (
+        f"SELECT * FROM ({base}) d "
+        f"WHERE d.rental_id > {int(desde_alquiler)} AND d.rental_id <= {int(hasta_alquiler)};"
+    )
+
+
+# --- DETALLE: ANEXAR FILAS NUEVAS ---
+def anexar_detalle(conexion, consulta, ruta, bytes_confirmados, tamano_lote):
+    """
+    Agrega al CSV de detalle las filas de la consulta delta. Antes de anexar se
+    trunca el archivo al tamaño registrado en la marca anterior, así una corrida
+    interrumpida no deja filas duplicadas. Devuelve las mismas estadísticas que
+    exportar_consulta_streaming (con "bytes" = bytes anexados) y el tamaño final.
+    """
+    nuevo = bytes_confirmados is None or not os.path.exists(ruta)
+    filas = 0
+    reiniciar_pico_rss()
+    inicio = time.perf_counter()
+    rss_pico = rss_actual_mb()
+    segundos_fetch = segundos_serializacion = 0.0
+    cursor = conexion.cursor(buffered=False)
+    cursor.execute(consulta)
+    segundos_execute = time.perf_counter() - inicio
+    columnas = [col[0] for col in cursor.description]
+    with open(ruta, "w" if nuevo else "r+", newline="", encoding="utf-8") as archivo:
+        if not nuevo:
+            archivo.seek(bytes_confirmados)
+            archivo.truncate()
+        escritor = csv.writer(archivo, lineterminator=os.linesep)
+        if nuevo:
+            escritor.writerow(columnas)
+        while True:
+            marca = time.perf_counter()
+            lote = cursor.fetchmany(tamano_lote)
+            segundos_fetch += time.perf_counter() - marca
+            if not lote:
+                break
+            marca = time.perf_counter()
+            escritor.writerows(lote)
+            segundos_serializacion += time.perf_counter() - marca
+            filas += len(lote)
+            rss_pico = max(rss_pico, rss_actual_mb())
+    cursor.close()
+    tamano = os.path.getsize(ruta)
+    return {
+        "archivo": os.path.basename(ruta),
+        "filas": filas,
+        "segundos_execute": segundos_execute,
+        "segundos_fetch": segundos_fetch,
+        "segundos_serializacion": segundos_serializacion,
+        "bytes": tamano - (0 if nuevo else bytes_confirmados),
+        "rss_pico_mb": max(rss_pico, rss_pico_mb()),
+        "tamano": tamano,
+    }
+
+
+# --- AGREGADOS: LEER TOTALES PREVIOS ---
+def leer_reportes(output_folder):
+    """Lee los CSV agregados ya exportados y pasa los montos a centavos para poder sumarles deltas."""
+    reportes = {}
+    for nombre_archivo in REPORTES_DERIVADOS:
+        df = pd.read_csv(
+            os.path.join(output_folder, nombre_archivo),
+            dtype={"mes": str, "categoria": str, "pelicula": str, "cliente": str},
+            keep_default_na=False
+        )
+        if nombre_archivo in COLUMNAS_MONTO:
+            columna = COLUMNAS_MONTO[nombre_archivo]
+            df[columna] = texto_a_centavos(df[columna])
+        reportes[nombre_archivo] = df
+    return reportes
+
+
+def _leer_dimensiones(conexion):
+    dimensiones = {}
+    cursor = conexion.cursor()
+    for nombre, consulta in CONSULTAS_DIMENSIONES.items():
+        cursor.execute(consulta)
+        columnas = [col[0] for col in cursor.description]
+        dimensiones[nombre] = pd.DataFrame(cursor.fetchall(), columns=columnas)
+    cursor.close()
+    return dimensiones
+
+
+# --- MODO INCREMENTAL ---
+def exportar_incremental(conexion, consultas, output_folder, tamano_lote=10000, reconstruir=False, metricas=None):
+    """
+    Trae solo los alquileres y pagos posteriores a la marca de agua: anexa las filas
+    nuevas al detalle y suma los deltas a los cuatro reportes agregados sin volver a
+    ejecutar los GROUP BY completos. La primera corrida (o --reconstruir) parte de cero.
+    Con metricas (ver instrumentacion.py) registra el detalle como las demás exportaciones,
+    el escaneo delta como consulta "tabla_hechos" (como el modo hechos) y la escritura de
+    cada reporte.
+    """
+    inicio = time.perf_counter()
+    marcas = {} if reconstruir else leer_marcas(output_folder)
+    max_alquiler, max_pago = consultar_maximos(conexion)
+
+    # --- Detalle ---
+    ruta_detalle = os.path.join(output_folder, DETALLE)
+    marca_detalle = marcas.get(DETALLE, {}) if os.path.exists(ruta_detalle) else {}
+    desde = marca_detalle.get("rental_id", 0)
+    stats = anexar_detalle(
+        conexion,
+        consulta_detalle_delta(consultas[DETALLE], desde, max_alquiler),
+        ruta_detalle,
+        marca_detalle.get("bytes"),
+        tamano_lote
+    )
+    print(f"✅ Detalle: {stats['filas']} filas nuevas (rental_id {desde} -> {max_alquiler})")
+    if metricas is not None:
+        metricas.registrar("exportacion", {"consulta": DETALLE, "modo": "incremental"}, {
+            "consulta_segundos": stats["segundos_execute"],
+            "fetch_segundos": stats["segundos_fetch"],
+            "serializacion_segundos": stats["segundos_serializacion"],
+            "filas": stats["filas"],
+            "bytes_escritos": stats["bytes"],
+            "rss_pico_bytes": int(stats["rss_pico_mb"] * 2**20),
+        })
+
+    # --- Agregados ---
+    # Comparten una sola consulta delta; si falta algún archivo o sus marcas no coinciden,
+    # los cuatro se reconstruyen desde cero.
+    marcas_agregados = [marcas.get(n) for n in REPORTES_DERIVADOS]
+    consistentes = (
+        all(marcas_agregados)
+        and all(m == marcas_agregados[0] for m in marcas_agregados)
+        and all(os.path.exists(os.path.join(output_folder, n)) for n in REPORTES_DERIVADOS)
+    )
+    base = marcas_agregados[0] if consistentes else {"rental_id": 0, "payment_id": 0}
+
+    reiniciar_pico_rss()
+    marca = time.perf_counter()
+    cursor = conexion.cursor(buffered=False)
+    cursor.execute(consulta_hechos_delta(base["rental_id"], max_alquiler, base["payment_id"], max_pago))
+    delta = leer_hechos(cursor, tamano_lote)
+    cursor.close()
+    segundos_bd = time.perf_counter() - marca
+
+    marca = time.perf_counter()
+    partes = [nombrar_agregados(agregar_hechos(delta), _leer_dimensiones(conexion))]
+    if consistentes:
+        partes.insert(0, leer_reportes(output_folder))
+    reportes = ordenar_y_formatear(combinar_reportes(*partes))
+    if metricas is not None:
+        metricas.registrar("exportacion", {"consulta": "tabla_hechos", "modo": "incremental"}, {
+            "fetch_segundos": segundos_bd,
+            "derivacion_segundos": time.perf_counter() - marca,
+            "filas": len(delta),
+            "rss_pico_bytes": int(rss_pico_mb() * 2**20),
+        })
+
+    # Se escriben todos a temporales y luego se reemplazan juntos
+    segundos_escritura = {}
+    for nombre_archivo, df in reportes.items():
+        marca = time.perf_counter()
+        df.to_csv(os.path.join(output_folder, nombre_archivo + ".parcial"), index=False)
+        segundos_escritura[nombre_archivo] = time.perf_counter() - marca
+    for nombre_archivo, df in reportes.items():
+        ruta = os.path.join(output_folder, nombre_archivo)
+        os.replace(ruta + ".parcial", ruta)
+        print(f"✅ Actualizado: {nombre_archivo} ({len(df)} filas)")
+        if metricas is not None:
+            metricas.registrar("exportacion", {"consulta": nombre_archivo, "modo": "incremental"}, {
+                "serializacion_segundos": segundos_escritura[nombre_archivo],
+                "filas": len(df),
+                "bytes_escritos": os.path.getsize(ruta),
+            })
+    print(
+        f"📦 Delta: {len(delta)} filas de hechos "
+        f"(payment_id {base['payment_id']} -> {max_pago}"
+        f"{'' if consistentes else ', reconstrucción completa'})"
+    )
+
+    # Las marcas se guardan al final: si la consulta o la escritura fallan, la próxima corrida repite el mismo delta
+    marcas = {DETALLE: {"rental_id": max_alquiler, "bytes": stats["tamano"]}}
+    for nombre_archivo in REPORTES_DERIVADOS:
+        marcas[nombre_archivo] = {"rental_id": max_alquiler, "payment_id": max_pago}
+    guardar_marcas(output_folder, marcas)
+    print(f"⏱️ Actualización incremental: {time.perf_counter() - inicio:.2f} s")
@@ -0,0 +1,116 @@
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+from mysql.connector.constants import FieldType
+
+# --- TIPOS DE COLUMNA SEGÚN cursor.description ---
+TIPOS_ENTEROS = {
+    FieldType.TINY, FieldType.SHORT, FieldType.INT24,
+    FieldType.LONG, FieldType.LONGLONG, FieldType.YEAR,
+}
+TIPOS_DECIMALES = {FieldType.DECIMAL, FieldType.NEWDECIMAL, FieldType.FLOAT, FieldType.DOUBLE}
+TIPOS_FECHA = {FieldType.DATETIME, FieldType.TIMESTAMP, FieldType.DATE}
+
+
+def _a_bytes(valores):
+    # En modo raw el conector C entrega bytes; el conector puro entrega bytearray
+    if valores and isinstance(valores[0], bytearray):
+        return [bytes(v) if v is not None else None for v in valores]
+    return valores
+
+
+def _separar_nulos(valores, relleno):
+    # Devuelve un array de bytes de ancho fijo (nulos reemplazados por relleno) y la máscara
+    # de nulos, o None si no hay ninguno
+    if None not in valores:
+        return np.array(valores, dtype="S"), None
+    arreglo = np.array(valores, dtype=object)
+    nulos = np.equal(arreglo, None)
+    arreglo[nulos] = relleno
+    return arreglo.astype("S"), nulos
+
+
+def _escala(valores):
+    # Decimales del primer valor no nulo (b"2825.75" -> 2), para escribir el CSV con el mismo
+    # texto; None si todos son nulos (cursor.description no trae la escala en mysql-connector)
+    for v in valores:
+        if v is not None:
+            texto = v.decode() if isinstance(v, bytes) else str(v)
+            return len(texto.split(".")[1]) if "." in texto else 0
+    return None
+
+
+def columna_a_array(valores, tipo):
+    """
+    Convierte los valores de una columna (bytes en modo raw) a un array tipado:
+    int64 (Int64 si hay nulos), float64 o datetime64; el texto queda como str.
+    La conversión la hace NumPy sobre el bloque completo, sin un objeto
+    Decimal o datetime por celda.
+    """
+    valores = _a_bytes(valores)
+    if tipo in TIPOS_ENTEROS:
+        arreglo, nulos = _separar_nulos(valores, b"0")
+        enteros = arreglo.astype(np.int64)
+        return enteros if nulos is None else pd.arrays.IntegerArray(enteros, nulos)
+    if tipo in TIPOS_DECIMALES:
+        # NaN y NaT ya marcan los nulos en el array: la máscara no hace falta
+        arreglo, _ = _separar_nulos(valores, b"nan")
+        return arreglo.astype(np.float64)
+    if tipo in TIPOS_FECHA:
+        arreglo, _ = _separar_nulos(valores, b"NaT")
+        return arreglo.astype("datetime64[s]")
+    if any(isinstance(v, bytes) for v in valores[:1]):
+        valores = [v.decode("utf-8") if v is not None else None for v in valores]
+    return np.array(valores, dtype=object)
+
+
+# --- LECTURA COLUMNAR ---
+def leer_columnar(cursor, tamano_lote=100000):
+    """
+    Lee el resultado por lotes y arma el DataFrame columna por columna a partir
+    de arrays tipados según cursor.description. Guarda en df.attrs["escalas"]
+    los decimales de cada columna DECIMAL para escribirla igual que MySQL.
+    """
+    nombres = [col[0] for col in cursor.description]
+    tipos = [col[1] for col in cursor.description]
+    partes = [[] for _ in nombres]
+    escalas = {}
+
+    while True:
+        lote = cursor.fetchmany(tamano_lote)
+        if not lote:
+            break
+        for i, (nombre, tipo) in enumerate(zip(nombres, tipos)):
+            # Transponer con map(itemgetter) es varias veces más rápido que zip(*lote)
+            columna = list(map(itemgetter(i), lote))
+            # La escala sale del primer valor no nulo, aunque el primer lote sea todo NULL
+            if tipo in (FieldType.DECIMAL, FieldType.NEWDECIMAL) and escalas.get(nombre) is None:
+                escalas[nombre] = _escala(columna)
+            partes[i].append(columna_a_array(columna, tipo))
+
+    datos = {}
+    for nombre, tipo, trozos in zip(nombres, tipos, partes):
+        if not trozos:
+            datos[nombre] = columna_a_array([], tipo)
+        elif len(trozos) == 1:
+            datos[nombre] = trozos[0]
+        else:
+            datos[nombre] = pd.concat([pd.Series(t) for t in trozos], ignore_index=True).array
+    df = pd.DataFrame(datos, columns=nombres)
+    # Una columna toda NULL no tiene escala: se escribe vacía igual
+    df.attrs["escalas"] = {nombre: escala for nombre, escala in escalas.items() if escala is not None}
+    return df
+
+
+def a_csv(df, ruta):
+    """to_csv que escribe las columnas DECIMAL con su escala original (10.00, no 10.0)."""
+    escalas = df.attrs.get("escalas", {})
+    if escalas:
+        df = df.copy()
+        for columna, escala in escalas.items():
+            valores = df[columna].to_numpy(dtype=np.float64)
+            texto = np.char.mod(f"%.{escala}f", valores).astype(object)
+            texto[np.isnan(valores)] = ""
+            df[columna] = texto
+    df.to_csv(ruta, index=False)
@@ -0,0 +1,397 @@
+import argparse
+import io
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from extraccion_hechos import formatear_reportes
+from limpieza_datos import CARPETA_DASHBOARD, LIMPIEZAS, limpiar_detalle
+from motor_sqlite import construir_sqlite
+
+# Generador de datos sintéticos con la forma de Sakila, para pruebas de carga. Toma de la
+# base real (sakila.sqlite, la misma que usa --motor sqlite) sus distribuciones y genera
+# escala veces más clientes, películas, inventario y alquileres (con un pago cada uno):
+#   - mezcla de categorías: cada película sintética copia categoría, tarifa, popularidad y
+#     copias de inventario de una película real (recorridas en ciclo), con ruido en la popularidad;
+#   - perfil de fechas: día calendario con las mismas frecuencias que los alquileres reales
+#     (conserva meses y días de la semana) y hora según el perfil real de ese día de la semana;
+#   - sesgo de gasto por cliente: la actividad de cada cliente sintético sale de la de un
+#     cliente real (con ruido), y el monto de cada pago de los montos reales de su tarifa.
+# Todo se genera por lotes vectorizados (np.searchsorted sobre distribuciones acumuladas):
+# la memoria depende del tamaño del lote y de las dimensiones, no del número de alquileres.
+#
+#   python generador_sintetico.py --escala 10 --sqlite sakila_x10.sqlite
+#   python generador_sintetico.py --escala 100 --limpios ../05_dashboard_x100
+#   SAKILA_SQLITE=sakila_x10.sqlite python sql_sakila_script.py --motor sqlite --modo hechos
+
+# Base real de referencia (no RUTA_SQLITE: SAKILA_SQLITE puede apuntar a una sintética)
+RUTA_BASE_REAL = "sakila.sqlite"
+ULTIMA_ACTUALIZACION = "2006-02-15 05:05:03"
+
+
+# --- PERFILES DE LA BASE REAL ---
+def leer_perfiles(ruta_real=RUTA_BASE_REAL):
+    """Distribuciones de la base Sakila real (la construye desde el zip si no existe)."""
+    if not os.path.exists(ruta_real):
+        construir_sqlite(ruta_real)
+    conexion = sqlite3.connect(ruta_real)
+    try:
+        alquileres = pd.read_sql_query(
+            "SELECT r.rental_date, r.customer_id, i.film_id FROM rental r "
+            "JOIN inventory i ON r.inventory_id = i.inventory_id", conexion
+        )
+        peliculas = pd.read_sql_query(
+            "SELECT f.*, fc.category_id FROM film f JOIN film_category fc ON f.film_id = fc.film_id "
+            "ORDER BY f.film_id", conexion
+        )
+        clientes = pd.read_sql_query("SELECT * FROM customer ORDER BY customer_id", conexion)
+        inventario = pd.read_sql_query("SELECT film_id, store_id FROM inventory", conexion)
+        pagos = pd.read_sql_query(
+            "SELECT CAST(ROUND(p.amount * 100) AS INTEGER) AS centavos, "
+            "CAST(ROUND(f.rental_rate * 100) AS INTEGER) AS tarifa FROM payment p "
+            "JOIN rental r ON p.rental_id = r.rental_id JOIN inventory i ON r.inventory_id = i.inventory_id "
+            "JOIN film f ON i.film_id = f.film_id", conexion
+        )
+        categorias = pd.read_sql_query("SELECT category_id, name AS categoria FROM category", conexion)
+    finally:
+        conexion.close()
+
+    fechas = pd.to_datetime(alquileres["rental_date"])
+    dias = fechas.dt.normalize().value_counts().sort_index()
+    horas = pd.crosstab(fechas.dt.dayofweek, fechas.dt.hour).reindex(index=range(7), columns=range(24), fill_value=0)
+
+    return {
+        "dias": dias.index.to_numpy().astype("datetime64[D]"),
+        "peso_dias": dias.to_numpy(dtype=float),
+        "horas_por_dia_semana": horas.to_numpy(dtype=float),
+        "peliculas": peliculas,
+        "alquileres_por_pelicula": alquileres["film_id"].value_counts().reindex(peliculas["film_id"], fill_value=0).to_numpy(),
+        "copias_por_pelicula": inventario["film_id"].value_counts().reindex(peliculas["film_id"], fill_value=0).to_numpy(),
+        "participacion_tiendas": inventario["store_id"].value_counts(normalize=True).sort_index(),
+        "clientes": clientes,
+        "alquileres_por_cliente": alquileres["customer_id"].value_counts().reindex(clientes["customer_id"], fill_value=0).to_numpy(),
+        "montos_por_tarifa": {
+            tarifa: grupo.value_counts().sort_index() for tarifa, grupo in pagos.groupby("tarifa")["centavos"]
+        },
+        "categorias": categorias,
+    }
+
+
+# --- MODELO SINTÉTICO (dimensiones) ---
+def _acumulada(pesos):
+    return np.cumsum(np.asarray(pesos, dtype=float))
+
+
+def _muestrear(acumulada, n, rng):
+    """Índices muestreados con probabilidad proporcional a los pesos de la acumulada."""
+    return np.searchsorted(acumulada, rng.random(n) * acumulada[-1], side="right")
+
+
+def construir_modelo(perfiles, escala, semilla=0):
+    """Películas, inventario y clientes sintéticos, y las acumuladas para muestrear alquileres."""
+    rng = np.random.default_rng(semilla)
+    reales = perfiles["peliculas"]
+    n_peliculas = max(int(round(len(reales) * escala)), 1)
+    plantilla = np.arange(n_peliculas) % len(reales)
+    copia = np.arange(n_peliculas) // len(reales)
+
+    peliculas = reales.iloc[plantilla].reset_index(drop=True)
+    peliculas["film_id"] = np.arange(1, n_peliculas + 1)
+    peliculas["title"] = peliculas["title"] + np.where(copia > 0, " " + copia.astype(str), "")
+    peliculas["tarifa"] = (peliculas["rental_rate"] * 100).round().astype(np.int64)
+
+    # Popularidad con ruido leve (gamma de media 1, desvío 0.1): conserva la forma sin repetir conteos exactos
+    popularidad = perfiles["alquileres_por_pelicula"][plantilla] * rng.gamma(100.0, 0.01, n_peliculas)
+    copias = perfiles["copias_por_pelicula"][plantilla]
+    popularidad[copias == 0] = 0
+
+    # Inventario contiguo por película: las copias de la película f van de inicio[f] a inicio[f] + copias[f]
+    inicio_copias = np.concatenate([[0], np.cumsum(copias)[:-1]])
+    tiendas = perfiles["participacion_tiendas"]
+    inventario = pd.DataFrame({
+        "inventory_id": np.arange(1, copias.sum() + 1),
+        "film_id": np.repeat(peliculas["film_id"].to_numpy(), copias),
+        "store_id": rng.choice(tiendas.index.to_numpy(), copias.sum(), p=tiendas.to_numpy()),
+    })
+
+    reales_clientes = perfiles["clientes"]
+    n_clientes = max(int(round(len(reales_clientes) * escala)), 1)
+    plantilla_clientes = np.arange(n_clientes) % len(reales_clientes)
+    clientes = reales_clientes.iloc[plantilla_clientes].reset_index(drop=True)
+    clientes["customer_id"] = np.arange(1, n_clientes + 1)
+    # Nombre del cliente real (mismo género estimado), apellido al azar
+    clientes["last_name"] = reales_clientes["last_name"].to_numpy()[rng.integers(0, len(reales_clientes), n_clientes)]
+    clientes["email"] = (
+        clientes["first_name"] + "." + clientes["last_name"] + "." + clientes["customer_id"].astype(str) + "@sakilacustomer.org"
+    )
+    actividad = perfiles["alquileres_por_cliente"][plantilla_clientes] * rng.gamma(100.0, 0.01, n_clientes)
+
+    horas = perfiles["horas_por_dia_semana"]
+    return {
+        "n_alquileres": max(int(round(perfiles["peso_dias"].sum() * escala)), 1),
+        "peliculas": peliculas,
+        "inventario": inventario,
+        "clientes": clientes,
+        "categorias": perfiles["categorias"],
+        "acumulada_peliculas": _acumulada(popularidad),
+        "inicio_copias": inicio_copias,
+        "copias": copias,
+        "acumulada_clientes": _acumulada(actividad),
+        "dias": perfiles["dias"],
+        "acumulada_dias": _acumulada(perfiles["peso_dias"]),
+        "acumulada_horas": np.cumsum(horas, axis=1) / horas.sum(axis=1, keepdims=True),
+        "montos_por_tarifa": {
+            tarifa: (montos.index.to_numpy(), _acumulada(montos.to_numpy()))
+            for tarifa, montos in perfiles["montos_por_tarifa"].items()
+        },
+    }
+
+
+# --- ALQUILERES (por lotes) ---
+def generar_alquileres(modelo, primer_id, n, rng):
+    """
+    Lote de n alquileres con su pago, con las columnas de la tabla de hechos de
+    extraccion_hechos (más inventory_id): rental_id, rental_date, film_id, category_id,
+    store_id, payment_id, customer_id, centavos.
+    """
+    # Fecha: día calendario real, hora según el perfil de su día de la semana, minuto/segundo al azar
+    dias = modelo["dias"][_muestrear(modelo["acumulada_dias"], n, rng)]
+    dia_semana = (dias.astype("int64") + 3) % 7  # 1970-01-01 fue jueves (lunes=0)
+    horas = np.minimum((modelo["acumulada_horas"][dia_semana] < rng.random(n)[:, None]).sum(axis=1), 23)
+    fechas = dias.astype("datetime64[s]") + (horas * 3600 + rng.integers(0, 3600, n)).astype("timedelta64[s]")
+
+    indice_pelicula = _muestrear(modelo["acumulada_peliculas"], n, rng)
+    inventario = modelo["inicio_copias"][indice_pelicula] + rng.integers(0, modelo["copias"][indice_pelicula])
+    peliculas = modelo["peliculas"]
+    tarifas = peliculas["tarifa"].to_numpy()[indice_pelicula]
+
+    centavos = np.empty(n, dtype=np.int64)
+    for tarifa, (montos, acumulada) in modelo["montos_por_tarifa"].items():
+        es_tarifa = tarifas == tarifa
+        centavos[es_tarifa] = montos[_muestrear(acumulada, int(es_tarifa.sum()), rng)]
+
+    ids = np.arange(primer_id, primer_id + n)
+    return pd.DataFrame({
+        "rental_id": ids,
+        "rental_date": fechas,
+        "film_id": peliculas["film_id"].to_numpy()[indice_pelicula],
+        "category_id": peliculas["category_id"].to_numpy()[indice_pelicula],
+        "store_id": modelo["inventario"]["store_id"].to_numpy()[inventario],
+        "inventory_id": inventario + 1,
+        "payment_id": ids,
+        "customer_id": _muestrear(modelo["acumulada_clientes"], n, rng) + 1,
+        "centavos": centavos,
+    })
+
+
+def lotes_alquileres(modelo, tamano_lote, semilla=0):
+    """Genera los alquileres lote a lote; cada lote con su propio generador (reproducible)."""
+    for numero, inicio in enumerate(range(0, modelo["n_alquileres"], tamano_lote)):
+        n = min(tamano_lote, modelo["n_alquileres"] - inicio)
+        yield generar_alquileres(modelo, inicio + 1, n, np.random.default_rng([semilla, numero]))
+
+
+# --- SALIDA: BASE SQLITE ---
+def _texto_fecha(fechas):
+    return np.char.replace(np.datetime_as_string(fechas, unit="s"), "T", " ")
+
+
+def _insertar(conexion, tabla, df):
+    columnas = ", ".join(df.columns)
+    marcas = ", ".join("?" * len(df.columns))
+    conexion.executemany(
+        f"INSERT INTO {tabla} ({columnas}) VALUES ({marcas})",
+        df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    )
+
+
+def escribir_sqlite(modelo, ruta_db, tamano_lote, semilla=0):
+    """
+    Base Sakila completa con las tablas que leen los reportes reemplazadas por las sintéticas
+    (el resto: categorías, tiendas, personal, direcciones, etc. quedan como en la real).
+    """
+    parcial = ruta_db + ".parcial"
+    construir_sqlite(parcial)
+    conexion = sqlite3.connect(parcial)
+    conexion.execute("PRAGMA journal_mode = OFF")
+    conexion.execute("PRAGMA synchronous = OFF")
+
+    tablas = ["payment", "rental", "inventory", "film_category", "film_actor", "film_text", "film", "customer"]
+    # Índices fuera durante la carga y recreados al final (mucho más rápido)
+    indices = conexion.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+        f"AND tbl_name IN ({', '.join('?' * len(tablas))})", tablas
+    ).fetchall()
+    for nombre, _ in indices:
+        conexion.execute(f"DROP INDEX {nombre}")
+    for tabla in tablas:
+        conexion.execute(f"DELETE FROM {tabla}")
+
+    peliculas = modelo["peliculas"]
+    columnas_film = [c for c in peliculas.columns if c not in ("category_id", "tarifa")]
+    _insertar(conexion, "film", peliculas[columnas_film])
+    _insertar(conexion, "film_text", peliculas[["film_id", "title", "description"]])
+    _insertar(conexion, "film_category", peliculas[["film_id", "category_id", "last_update"]])
+    _insertar(conexion, "inventory", modelo["inventario"].assign(last_update=ULTIMA_ACTUALIZACION))
+    _insertar(conexion, "customer", modelo["clientes"])
+    conexion.commit()
+
+    for lote in lotes_alquileres(modelo, tamano_lote, semilla):
+        fechas = _texto_fecha(lote["rental_date"].to_numpy())
+        # El personal 1 atiende la tienda 1 y el 2 la 2, como en Sakila
+        _insertar(conexion, "rental", pd.DataFrame({
+            "rental_id": lote["rental_id"], "rental_date": fechas, "inventory_id": lote["inventory_id"],
+            "customer_id": lote["customer_id"], "staff_id": lote["store_id"], "last_update": ULTIMA_ACTUALIZACION,
+        }))
+        _insertar(conexion, "payment", pd.DataFrame({
+            "payment_id": lote["payment_id"], "customer_id": lote["customer_id"], "staff_id": lote["store_id"],
+            "rental_id": lote["rental_id"], "amount": lote["centavos"] / 100, "payment_date": fechas,
+            "last_update": ULTIMA_ACTUALIZACION,
+        }))
+        conexion.commit()
+        print(f"   {int(lote['rental_id'].iloc[-1])} / {modelo['n_alquileres']} alquileres")
+
+    for _, sql in indices:
+        conexion.execute(sql)
+    conexion.execute("ANALYZE")
+    conexion.commit()
+    conexion.close()
+    os.replace(parcial, ruta_db)
+    return ruta_db
+
+
+# --- SALIDA: DATASETS *_limpio DEL DASHBOARD ---
+def _dimensiones(modelo):
+    clientes = modelo["clientes"]
+    return {
+        "categorias": modelo["categorias"],
+        "peliculas": modelo["peliculas"][["film_id"]].assign(pelicula=modelo["peliculas"]["title"]),
+        "clientes": clientes[["customer_id"]].assign(cliente=clientes["first_name"] + " " + clientes["last_name"]),
+    }
+
+
+def escribir_limpios(modelo, destino, tamano_lote, semilla=0):
+    """
+    Escribe los cinco *_limpio.csv sin pasar por una base: el detalle se limpia y se anexa
+    lote a lote, y los cuatro agregados se acumulan con np.bincount por id (memoria acotada)
+    y al final toman el formato de las consultas (extraccion_hechos) y la limpieza del notebook.
+    """
+    os.makedirs(destino, exist_ok=True)
+    dimensiones = _dimensiones(modelo)
+    categorias = dimensiones["categorias"]
+    nombres_categoria = np.empty(int(categorias["category_id"].max()) + 1, dtype=object)
+    nombres_categoria[categorias["category_id"]] = categorias["categoria"]
+    nombres_pelicula = dimensiones["peliculas"]["pelicula"].to_numpy()
+    nombres_cliente = dimensiones["clientes"]["cliente"].to_numpy()
+
+    n_peliculas, n_clientes=len(modelo["peliculas"]), len(modelo["clientes"])
+    n_categorias = len(nombres_categoria)
+    n_tiendas = int(modelo["inventario"]["store_id"].max()) + 1
+    meses = pd.period_range(modelo["dias"].min(), modelo["dias"].max(), freq="M")
+    primer_mes = meses[0].ordinal
+
+    alquileres_mes = np.zeros((len(meses), n_categorias), dtype=np.int64)
+    ingresos = np.zeros((n_tiendas, n_categorias), dtype=np.int64)
+    pagos_pelicula = np.zeros(n_peliculas + 1, dtype=np.int64)
+    ingresos_pelicula = np.zeros(n_peliculas + 1, dtype=np.int64)
+    pagos_cliente = np.zeros(n_clientes + 1, dtype=np.int64)
+    gasto_cliente = np.zeros(n_clientes + 1, dtype=np.int64)
+
+    ruta_detalle = os.path.join(destino, "detalle_alquileres_limpio.csv")
+    with open(ruta_detalle + ".parcial", "w", encoding="utf-8", newline="") as archivo:
+        for numero, lote in enumerate(lotes_alquileres(modelo, tamano_lote, semilla)):
+            detalle = pd.DataFrame({
+                "rental_id": lote["rental_id"],
+                "cliente": nombres_cliente[lote["customer_id"].to_numpy() - 1],
+                "pelicula": nombres_pelicula[lote["film_id"].to_numpy() - 1],
+                "categoria": nombres_categoria[lote["category_id"].to_numpy()],
+                "rental_date": lote["rental_date"],
+            })
+            limpiar_detalle(detalle).to_csv(archivo, index=False, header=numero == 0)
+
+            mes = lote["rental_date"].dt.to_period("M").array.asi8 - primer_mes
+            categoria = lote["category_id"].to_numpy()
+            centavos = lote["centavos"].to_numpy()
+            alquileres_mes += np.bincount(mes * n_categorias + categoria, minlength=alquileres_mes.size).reshape(alquileres_mes.shape)
+            ingresos += np.bincount(
+                lote["store_id"].to_numpy() * n_categorias + categoria, weights=centavos, minlength=ingresos.size
+            ).astype(np.int64).reshape(ingresos.shape)
+            pagos_pelicula += np.bincount(lote["film_id"], minlength=n_peliculas + 1)
+            ingresos_pelicula += np.bincount(lote["film_id"], weights=centavos, minlength=n_peliculas + 1).astype(np.int64)
+            pagos_cliente += np.bincount(lote["customer_id"], minlength=n_clientes + 1)
+            gasto_cliente += np.bincount(lote["customer_id"], weights=centavos, minlength=n_clientes + 1).astype(np.int64)
+            print(f"   {int(lote['rental_id'].iloc[-1])} / {modelo['n_alquileres']} alquileres")
+    os.replace(ruta_detalle + ".parcial", ruta_detalle)
+
+    # Agregados por id con la misma forma que extraccion_hechos.agregar_hechos
+    filas_mes, columnas_cat=np.nonzero(alquileres_mes)
+    filas_tienda, columnas_tienda=np.nonzero(ingresos)
+    con_pagos_pelicula = np.flatnonzero(pagos_pelicula)
+    con_pagos_cliente = np.flatnonzero(pagos_cliente)
+    agregados = {
+        "alquileres_por_mes_categoria.csv": pd.DataFrame({
+            "mes": meses[filas_mes].strftime("%Y-%m"),
+            "category_id": columnas_cat,
+            "total_alquileres": alquileres_mes[filas_mes, columnas_cat],
+        }),
+        "ingresos_por_tienda_categoria.csv": pd.DataFrame({
+            "store_id": filas_tienda, "category_id": columnas_tienda, "ingresos": ingresos[filas_tienda, columnas_tienda],
+        }),
+        "peliculas_mas_rentables.csv": pd.DataFrame({
+            "film_id": con_pagos_pelicula,
+            "total_alquileres": pagos_pelicula[con_pagos_pelicula],
+            "total_ingresos": ingresos_pelicula[con_pagos_pelicula],
+        }),
+        "clientes_mas_frecuentes.csv": pd.DataFrame({
+            "customer_id": con_pagos_cliente,
+            "total_transacciones": pagos_cliente[con_pagos_cliente],
+            "total_gastado": gasto_cliente[con_pagos_cliente],
+        }),
+    }
+
+    escritos = [ruta_detalle]
+    for nombre_archivo, df in formatear_reportes(agregados, dimensiones).items():
+        nombre_limpio, limpiar=LIMPIEZAS[nombre_archivo]
+        # Ida y vuelta por CSV, como la limpieza del pipeline (montos como texto con dos decimales)
+        df = limpiar(pd.read_csv(io.StringIO(df.to_csv(index=False))))
+        ruta = os.path.join(destino, nombre_limpio)
+        df.to_csv(ruta, index=False)
+        escritos.append(ruta)
+    return escritos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos Sakila sintéticos a escala, con las distribuciones de la base real.")
+    parser.add_argument("--escala", type=float, required=True, help="Factor sobre Sakila (1=~16 000 alquileres, 6250=~100 M)")
+    parser.add_argument("--sqlite", metavar="RUTA", help="Escribe una base SQLite con el esquema Sakila")
+    parser.add_argument(
+        "--limpios", nargs="?", const=CARPETA_DASHBOARD, metavar="CARPETA",
+        help="Escribe directamente los cinco *_limpio.csv del dashboard (por defecto en 05_dashboard)"
+    )
+    parser.add_argument("--base-real", default=RUTA_BASE_REAL, help="Base Sakila real de la que se toman las distribuciones")
+    parser.add_argument("--tamano-lote", type=int, default=1_000_000)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+    if not args.sqlite and not args.limpios:
+        parser.error("indique --sqlite RUTA y/o --limpios [CARPETA]")
+
+    inicio = time.perf_counter()
+    modelo = construir_modelo(leer_perfiles(args.base_real), args.escala, args.semilla)
+    print(
+        f"🎲 Escala {args.escala:g}: {modelo['n_alquileres']} alquileres, {len(modelo['clientes'])} clientes, "
+        f"{len(modelo['peliculas'])} películas, {len(modelo['inventario'])} copias en inventario"
+    )
+    if args.sqlite:
+        ruta = escribir_sqlite(modelo, args.sqlite, args.tamano_lote, args.semilla)
+        print(f"✅ Base SQLite: {ruta} ({os.path.getsize(ruta) / 1024 ** 2:.0f} MB)")
+    if args.limpios:
+        for ruta in escribir_limpios(modelo, args.limpios, args.tamano_lote, args.semilla):
+            print(f"✅ Limpio: {ruta}")
+    print(f"⏱️ {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import argparse
+import os
+import sys
+import zipfile
+
+import pandas as pd
+
+# Etapa de limpieza del notebook (03_notebooks/Analisis_base_datos_Sakila.ipynb) dentro del
+# pipeline: lee los CSV exportados y escribe los *_limpio.csv que consume el dashboard, con
+# las mismas columnas derivadas pero sin ningún apply fila por fila.
+#
+#   python limpieza_datos.py                                   # output_csv_sakila -> 05_dashboard
+#   python limpieza_datos.py --destino limpios --sin-zip
+#   python limpieza_datos.py --almacen                         # + almacén mapeado en memoria
+
+RAIZ_REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+CARPETA_DASHBOARD = os.path.join(RAIZ_REPO, "05_dashboard")
+RUTA_ZIP_LIMPIOS = os.path.join(RAIZ_REPO, "04_output_csv_sakila_limpio", "csv_limpios.zip")
+
+# Nombres en inglés fijos (lo que devuelven dt.month_name()/dt.day_name() sin locale),
+# así el resultado no depende del locale de la máquina
+MESES = ["January", "February", "March", "April", "May", "June", "July",
+         "August", "September", "October", "November", "December"]
+DIAS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def normalizar_columnas(df):
+    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+    return df
+
+
+# --- LIMPIEZA POR DATASET ---
+def limpiar_detalle(df):
+    df = normalizar_columnas(df)
+    df["rental_date"] = pd.to_datetime(df["rental_date"])
+
+    # Un solo accessor para todas las partes de la fecha; los nombres salen de los
+    # números (categóricas por código) en vez de formatear un string por fila
+    fechas = df["rental_date"].dt
+    mes = fechas.month.to_numpy()
+    df["year"] = fechas.year
+    df["month"] = mes
+    df["month_name"] = pd.Categorical.from_codes(mes - 1, MESES)
+    df["day"] = fechas.day
+    df["weekday"] = pd.Categorical.from_codes(fechas.dayofweek.to_numpy(), DIAS)
+    df["hour"] = fechas.hour
+
+    # Las operaciones de texto corren sobre los ~600 clientes distintos, no sobre cada
+    # alquiler: el estimador de 05_dashboard/generos.py factoriza cliente y primer nombre,
+    # resuelve el género por nombre (cache, diccionario nombres_genero.csv o la regla del
+    # notebook) y el resultado vuelve a las filas por código
+    if CARPETA_DASHBOARD not in sys.path:
+        sys.path.insert(0, CARPETA_DASHBOARD)
+    from generos import EstimadorGenero
+
+    estimador = EstimadorGenero()
+    df["primer_nombre"], df["genero_estimado"] = estimador.estimar(df["cliente"])
+    estimador.guardar()
+    return df
+
+
+def limpiar_alquileres_mes(df):
+    df = normalizar_columnas(df)
+    df["mes"] = pd.to_datetime(df["mes"])
+    # Mismo sort_values que el notebook (quicksort): deja los empates de cada mes en el
+    # orden que ya tienen los CSV publicados
+    df = df.sort_values("mes")
+    fechas = df["mes"].dt
+    mes = fechas.month.to_numpy()
+    df["year"] = fechas.year
+    df["nombre_mes"] = pd.Categorical.from_codes(mes - 1, MESES)
+    df["num_mes"] = mes
+    df["total_global_mes"] = df.groupby("mes")["total_alquileres"].transform("sum")
+    return df
+
+
+def limpiar_clientes(df):
+    return normalizar_columnas(df).drop_duplicates()
+
+
+def limpiar_peliculas(df):
+    df = normalizar_columnas(df).drop_duplicates()
+    df["ingreso_promedio_por_renta"] = df["total_ingresos"] / df["total_alquileres"]
+    return df
+
+
+def limpiar_tienda(df):
+    df = normalizar_columnas(df).drop_duplicates()
+    total_por_tienda = df.groupby("store_id")["ingresos"].transform("sum")
+    df["pct_ingreso_tienda"] = df["ingresos"] / total_por_tienda * 100
+    return df
+
+
+# CSV exportado -> (CSV limpio del dashboard, función de limpieza); en el orden del zip del notebook
+LIMPIEZAS = {
+    "detalle_alquileres.csv": ("detalle_alquileres_limpio.csv", limpiar_detalle),
+    "alquileres_por_mes_categoria.csv": ("alquileres_por_mes_categoria_limpio.csv", limpiar_alquileres_mes),
+    "clientes_mas_frecuentes.csv": ("clientes_mas_frecuentes_limpio.csv", limpiar_clientes),
+    "peliculas_mas_rentables.csv": ("peliculas_mas_rentables_limpio.csv", limpiar_peliculas),
+    "ingresos_por_tienda_categoria.csv": ("ingresos_por_tienda_categoria_limpio.csv", limpiar_tienda),
+}
+
+
+def escribir_almacen_dashboard(escritos, destino):
+    """
+    Escribe en destino/almacen las columnas .npy que los procesos del dashboard mapean en
+    memoria. Import diferido desde 05_dashboard: el formato lo define quien lo lee.
+    """
+    if CARPETA_DASHBOARD not in sys.path:
+        sys.path.insert(0, CARPETA_DASHBOARD)
+    from carga_datos import guardar_almacen
+
+    for ruta in escritos:
+        nombre = os.path.splitext(os.path.basename(ruta))[0]
+        print(f"🗄️ Almacén: {guardar_almacen(nombre, destino)}")
+
+
+def escribir_cuantiles_dashboard(escritos, destino):
+    """
+    Actualiza destino/cuantiles_segmentos.json (sketches KLL de los umbrales de clientes y
+    películas) para los datasets recién escritos. Import diferido desde 05_dashboard.
+    """
+    if CARPETA_DASHBOARD not in sys.path:
+        sys.path.insert(0, CARPETA_DASHBOARD)
+    from cuantiles import COLUMNAS_SEGMENTOS, escribir_cuantiles
+
+    nombres = [n for n in (os.path.splitext(os.path.basename(r))[0] for r in escritos) if n in COLUMNAS_SEGMENTOS]
+    if nombres:
+        print(f"📐 Cuantiles: {escribir_cuantiles(destino, nombres)}")
+
+
+def limpiar_exportacion(output_folder, destino=CARPETA_DASHBOARD, ruta_zip=RUTA_ZIP_LIMPIOS, almacen=False):
+    """
+    Escribe en destino los *_limpio.csv de los CSV presentes; si ruta_zip, los empaqueta y,
+    si almacen, escribe además el almacén compartido del dashboard. Al final actualiza los
+    sketches de cuantiles de los segmentos (con la versión ya definitiva de cada dataset).
+    """
+    os.makedirs(destino, exist_ok=True)
+    escritos = []
+    for nombre_archivo, (nombre_limpio, limpiar) in LIMPIEZAS.items():
+        ruta_csv = os.path.join(output_folder, nombre_archivo)
+        if not os.path.exists(ruta_csv):
+            print(f"⚠️ Sin {ruta_csv}: no se genera {nombre_limpio}")
+            continue
+        df = limpiar(pd.read_csv(ruta_csv))
+        ruta = os.path.join(destino, nombre_limpio)
+        df.to_csv(ruta + ".parcial", index=False)
+        os.replace(ruta + ".parcial", ruta)
+        escritos.append(ruta)
+        print(f"✅ Limpio: {ruta} ({len(df)} filas)")
+
+    if ruta_zip and escritos:
+        with zipfile.ZipFile(ruta_zip + ".parcial", "w", zipfile.ZIP_DEFLATED) as zipf:
+            for ruta in escritos:
+                zipf.write(ruta, os.path.basename(ruta))
+        os.replace(ruta_zip + ".parcial", ruta_zip)
+        print(f"📦 {ruta_zip}")
+    if almacen and escritos:
+        escribir_almacen_dashboard(escritos, destino)
+    if escritos:
+        escribir_cuantiles_dashboard(escritos, destino)
+    return escritos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera los CSV limpios del dashboard a partir de la exportación.")
+    parser.add_argument("--origen", default="output_csv_sakila", help="Carpeta con los CSV exportados")
+    parser.add_argument("--destino", default=CARPETA_DASHBOARD, help="Carpeta donde se escriben los *_limpio.csv")
+    parser.add_argument("--sin-zip", action="store_true", help="No actualiza 04_output_csv_sakila_limpio/csv_limpios.zip")
+    parser.add_argument(
+        "--almacen", action="store_true",
+        help="Escribe además el almacén columnar (.npy) que los procesos del dashboard comparten por mmap"
+    )
+    args = parser.parse_args()
+    limpiar_exportacion(args.origen, args.destino, None if args.sin_zip else RUTA_ZIP_LIMPIOS, args.almacen)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+
+# Base Sakila embebida en SQLite, construida desde el mismo volcado que se carga en MySQL
+# (01_data_raw/sakila-db.zip). Expone la misma interfaz que mysql.connector que usan los
+# modos de exportación: conexion.cursor(), execute, fetchone/fetchmany/fetchall, description.
+
+RUTA_ZIP = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "01_data_raw", "sakila-db.zip")
+# SAKILA_SQLITE apunta los reportes a otra base con el mismo esquema (p. ej. una sintética)
+RUTA_SQLITE = os.environ.get("SAKILA_SQLITE", "sakila.sqlite")
+
+# Los montos de Sakila son DECIMAL(x,2). Las columnas declaradas DECIMAL pasan por el converter de
+# abajo; las expresiones sobre ellas (SUM(p.amount) AS ingresos) llegan de SQLite como REAL sin tipo
+# declarado y se reconocen por el nombre de la columna del resultado. Solo esas se devuelven como
+# Decimal con esta escala, igual que MySQL: cualquier otro REAL (promedios, proporciones) queda float
+ESCALA_MONTOS = Decimal("0.01")
+COLUMNAS_MONTO = {"amount", "monto", "ingresos", "total_ingresos", "total_gastado"}
+# Agregados sin alias sobre un monto: SUM(p.amount), MAX(amount)...
+PATRON_AGREGADO_MONTO = re.compile(r"(SUM|MIN|MAX)\(\s*(\w+\.)?(\w+)\s*\)", re.I)
+
+# Los tipos declarados se reducen a los que reconoce detect_types. Las columnas DECIMAL se
+# guardan como REAL: las que acumulan sumas (tablas resumen) se redondean a su escala al leerlas
+sqlite3.register_converter("DECIMAL", lambda valor: Decimal(valor.decode()).quantize(ESCALA_MONTOS))
+sqlite3.register_converter("DATETIME", lambda valor: datetime.fromisoformat(valor.decode()))
+
+
+# --- ESQUEMA: CREATE TABLE de MySQL -> SQLite ---
+TIPOS_SQLITE = {
+    "TINYINT": "INTEGER", "SMALLINT": "INTEGER", "MEDIUMINT": "INTEGER", "INT": "INTEGER",
+    "BIGINT": "INTEGER", "YEAR": "INTEGER", "BOOLEAN": "INTEGER",
+    "DECIMAL": "DECIMAL",
+    "DATETIME": "DATETIME", "TIMESTAMP": "DATETIME",
+    "BLOB": "BLOB", "GEOMETRY": "BLOB",
+}
+
+
+def _sin_comentarios_versionados(sql):
+    # /*!50705 ... */ es código que MySQL sí ejecuta según su versión: se conserva el contenido
+    return re.sub(r"/\*!\d+\s?(.*?)\*/", r"\1", sql, flags=re.S)
+
+
+def _columnas_indice(linea):
+    return [c.strip(" `") for c in re.search(r"\(([^)]*)\)", linea).group(1).split(",")]
+
+
+def _crear_indice(tabla, columnas, unico=False):
+    # Los nombres de índice de MySQL son por tabla; en SQLite son globales
+    nombre = f"idx_{tabla}_{'_'.join(columnas)}"
+    return f"CREATE {'UNIQUE ' if unico else ''}INDEX {nombre} ON {tabla} ({', '.join(columnas)})"
+
+
+def traducir_esquema(sql_esquema):
+    """
+    Convierte las tablas de sakila-schema.sql a sentencias SQLite. Devuelve las
+    sentencias CREATE TABLE y, aparte, los CREATE INDEX (se crean después de la
+    carga, que es más rápido). Las FOREIGN KEY no se declaran, pero sus columnas
+    se indexan como hace InnoDB; FULLTEXT/SPATIAL, vistas y procedimientos no se
+    traducen: los reportes solo leen tablas.
+    """
+    sql = re.sub(r"--[^\n]*", "", _sin_comentarios_versionados(sql_esquema))
+    tablas, indices = [], []
+    for tabla, cuerpo in re.findall(r"CREATE TABLE `?(\w+)`? \((.*?)\n\)", sql, flags=re.S):
+        columnas, clave, indexadas, foraneas = [], [], [], []
+        for linea in cuerpo.split("\n"):
+            linea = linea.strip().rstrip(",")
+            if not linea:
+                continue
+            palabra = linea.split()[0].upper()
+            if palabra == "PRIMARY":
+                clave = _columnas_indice(linea)
+                indexadas.append(clave)
+            elif palabra in ("KEY", "UNIQUE"):
+                columnas_indice = _columnas_indice(linea)
+                indexadas.append(columnas_indice)
+                indices.append(_crear_indice(tabla, columnas_indice, unico=palabra == "UNIQUE"))
+            elif palabra == "CONSTRAINT":
+                foraneas.append(_columnas_indice(linea))
+            elif palabra not in ("FULLTEXT", "SPATIAL"):
+                nombre, tipo = linea.replace("`", "").split()[:2]
+                columnas.append([nombre, TIPOS_SQLITE.get(re.match(r"\w+", tipo).group(0).upper(), "TEXT")])
+
+        definiciones = [f"{nombre} {tipo}" for nombre, tipo in columnas]
+        if len(clave) == 1 and dict(columnas)[clave[0]] == "INTEGER":
+            # INTEGER PRIMARY KEY es el rowid de SQLite: búsquedas por id sin índice aparte
+            definiciones[[n for n, _ in columnas].index(clave[0])] += " PRIMARY KEY"
+        elif clave:
+            definiciones.append(f"PRIMARY KEY ({', '.join(clave)})")
+        tablas.append(f"CREATE TABLE {tabla} ({', '.join(definiciones)})")
+
+        # InnoDB crea un índice por FOREIGN KEY si ningún otro empieza por esas columnas
+        for columnas_fk in foraneas:
+            if not any(existente[:len(columnas_fk)] == columnas_fk for existente in indexadas):
+                indexadas.append(columnas_fk)
+                indices.append(_crear_indice(tabla, columnas_fk))
+    return tablas, indices
+
+
+def sentencias_datos(sql_datos):
+    """INSERT de sakila-data.sql listos para SQLite (literales binarios 0x.. como X'..')."""
+    sql = _sin_comentarios_versionados(sql_datos)
+    for m in re.finditer(r"^INSERT INTO `?\w+`? VALUES .*?;$", sql, flags=re.S | re.M):
+        yield re.sub(r"(?<=[,(])0x([0-9A-Fa-f]+)", r"X'\1'", m.group(0))
+
+
+def _leer_miembro(archivo_zip, sufijo):
+    nombre = next(n for n in archivo_zip.namelist() if n.endswith(sufijo))
+    return archivo_zip.read(nombre).decode("utf-8")
+
+
+def construir_sqlite(ruta_db=RUTA_SQLITE, ruta_zip=RUTA_ZIP):
+    """
+    Crea la base SQLite a partir de sakila-schema.sql y sakila-data.sql. Se escribe
+    a un temporal y se reemplaza al final, así una construcción interrumpida no deja
+    una base a medias.
+    """
+    inicio = time.perf_counter()
+    with zipfile.ZipFile(ruta_zip) as archivo_zip:
+        esquema = _leer_miembro(archivo_zip, "sakila-schema.sql")
+        datos = _leer_miembro(archivo_zip, "sakila-data.sql")
+
+    parcial = ruta_db + ".parcial"
+    if os.path.exists(parcial):
+        os.remove(parcial)
+    conexion = sqlite3.connect(parcial)
+    try:
+        tablas, indices = traducir_esquema(esquema)
+        for sentencia in tablas:
+            conexion.execute(sentencia)
+        for sentencia in sentencias_datos(datos):
+            conexion.execute(sentencia)
+        # En MySQL film_text la llenan los triggers de film
+        conexion.execute("INSERT INTO film_text SELECT film_id, title, description FROM film")
+        for sentencia in indices:
+            conexion.execute(sentencia)
+        conexion.execute("ANALYZE")
+        conexion.commit()
+    finally:
+        conexion.close()
+    os.replace(parcial, ruta_db)
+    print(f"✅ Base SQLite creada: {ruta_db} ({os.path.getsize(ruta_db) / 1024 ** 2:.1f} MB, {time.perf_counter() - inicio:.1f} s)")
+
+
+# --- DIALECTO: MySQL -> SQLite ---
+# Especificadores de DATE_FORMAT con equivalente directo en strftime
+FORMATOS_FECHA = {
+    "%Y": "%Y", "%m": "%m", "%d": "%d", "%H": "%H",
+    "%i": "%M", "%s": "%S", "%S": "%S", "%j": "%j", "%%": "%%",
+}
+
+
+def _argumentos(sql, inicio):
+    """Argumentos de la llamada cuyo '(' está en sql[inicio], respetando paréntesis y comillas."""
+    nivel, comilla, desde, argumentos = 0, None, inicio + 1, []
+    for i in range(inicio, len(sql)):
+        caracter = sql[i]
+        if comilla:
+            if caracter == comilla:
+                comilla = None
+        elif caracter in "'\"":
+            comilla = caracter
+        elif caracter == "(":
+            nivel += 1
+        elif caracter == ")":
+            nivel -= 1
+            if nivel == 0:
+                argumentos.append(sql[desde:i].strip())
+                return argumentos, i + 1
+        elif caracter == "," and nivel == 1:
+            argumentos.append(sql[desde:i].strip())
+            desde = i + 1
+    raise ValueError(f"Paréntesis sin cerrar en: {sql[inicio:inicio + 80]}")
+
+
+def _reemplazar_funcion(sql, nombre, traducir):
+    patron = re.compile(rf"\b{nombre}\s*\(", re.I)
+    while (m := patron.search(sql)):
+        argumentos, fin = _argumentos(sql, m.end() - 1)
+        sql = sql[:m.start()] + traducir([a_sqlite(a) for a in argumentos]) + sql[fin:]
+    return sql
+
+
+def _date_format(argumentos):
+    fecha, formato = argumentos
+    traducido = re.sub(
+        r"%.",
+        lambda m: FORMATOS_FECHA.get(m.group(0)) or _sin_equivalente(m.group(0)),
+        formato
+    )
+    return f"strftime({traducido}, {fecha})"
+
+
+def _sin_equivalente(especificador):
+    raise ValueError(f"DATE_FORMAT {especificador} no tiene equivalente en SQLite")
+
+
+def es_monto(nombre):
+    """True si la columna del resultado es un monto DECIMAL(x,2) en MySQL."""
+    agregado = PATRON_AGREGADO_MONTO.fullmatch(nombre)
+    return (agregado.group(3) if agregado else nombre).lower() in COLUMNAS_MONTO
+
+
+def _marcadores(consulta):
+    # %s de mysql.connector -> ? de sqlite3, sin tocar los literales ('%s' de strftime)
+    return re.sub(
+        r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|%s""",
+        lambda m: m.group(1) or "?",
+        consulta
+    )
+
+
+def a_sqlite(consulta):
+    """
+    Traduce las diferencias de dialecto que usan las consultas del proyecto:
+    DATE_FORMAT(x, f) -> strftime(f, x), CONCAT(a, b, ...) -> (a || b || ...)
+    y CAST(x AS SIGNED/UNSIGNED) -> CAST(x AS INTEGER). El resto es SQL común.
+    """
+    consulta = _reemplazar_funcion(consulta, "DATE_FORMAT", _date_format)
+    consulta = _reemplazar_funcion(consulta, "CONCAT", lambda argumentos: f"({' || '.join(argumentos)})")
+    return re.sub(r"\bAS\s+(UNSIGNED|SIGNED)(\s+INTEGER)?\b", "AS INTEGER", consulta, flags=re.I)
+
+
+# --- CONEXIÓN CON LA INTERFAZ DE mysql.connector ---
+class CursorSQLite:
+    def __init__(self, conexion):
+        self._conexion = conexion
+        self._cursor = conexion.sqlite.cursor()
+        self._montos = ()
+
+    def execute(self, consulta, parametros=()):
+        # MAX_EXECUTION_TIME de MySQL se emula con el progress handler de SQLite
+        limite = re.match(r"\s*SET\s+SESSION\s+MAX_EXECUTION_TIME\s*=\s*(\d+)", consulta, re.I)
+        if limite:
+            self._conexion.limite_segundos = int(limite.group(1)) / 1000 or None
+            return
+        if parametros:
+            consulta = _marcadores(consulta)
+        self._conexion.iniciar_reloj()
+        self._cursor.execute(a_sqlite(consulta), parametros)
+        descripcion = self._cursor.description or ()
+        self._montos = tuple(i for i, columna in enumerate(descripcion) if es_monto(columna[0]))
+
+    def _convertir(self, fila):
+        if not self._montos:
+            return fila
+        fila = list(fila)
+        for i in self._montos:
+            if isinstance(fila[i], float):
+                fila[i] = Decimal(fila[i]).quantize(ESCALA_MONTOS)
+        return tuple(fila)
+
+    def fetchone(self):
+        fila = self._cursor.fetchone()
+        return None if fila is None else self._convertir(fila)
+
+    def fetchmany(self, tamano):
+        return [self._convertir(fila) for fila in self._cursor.fetchmany(tamano)]
+
+    def fetchall(self):
+        return [self._convertir(fila) for fila in self._cursor.fetchall()]
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class ConexionSQLite:
+    def __init__(self, ruta_db=RUTA_SQLITE, al_cerrar=None):
+        self.sqlite = sqlite3.connect(ruta_db, detect_types=sqlite3.PARSE_DECLTYPES)
+        self.limite_segundos = None
+        self._vence = None
+        self._al_cerrar = al_cerrar
+        self.sqlite.set_progress_handler(self._excedido, 10000)
+
+    def _excedido(self):
+        # Un valor distinto de cero interrumpe la consulta (OperationalError: interrupted)
+        return self._vence is not None and time.perf_counter() > self._vence
+
+    def iniciar_reloj(self):
+        self._vence = time.perf_counter() + self.limite_segundos if self.limite_segundos else None
+
+    def cursor(self, buffered=None, raw=False, **opciones):
+        # SQLite ya entrega las filas a medida que se leen: buffered no cambia nada
+        if raw:
+            raise ValueError("El motor SQLite no tiene modo raw; use --fetch tuplas")
+        return CursorSQLite(self)
+
+    def commit(self):
+        self.sqlite.commit()
+
+    def close(self):
+        self.sqlite.close()
+        if self._al_cerrar:
+            self._al_cerrar()
+
+
+class PoolSQLite:
+    """Equivalente a MySQLConnectionPool: como máximo pool_size conexiones abiertas a la vez."""
+
+    def __init__(self, pool_size, ruta_db=RUTA_SQLITE):
+        self.ruta_db = ruta_db
+        self._cupos = threading.BoundedSemaphore(pool_size)
+
+    def get_connection(self):
+        self._cupos.acquire()
+        try:
+            return ConexionSQLite(self.ruta_db, al_cerrar=self._cupos.release)
+        except Exception:
+            self._cupos.release()
+            raise
+
+
+def conectar(ruta_db=RUTA_SQLITE):
+    """Abre una conexión a la base SQLite; la construye desde el zip si todavía no existe."""
+    if not os.path.exists(ruta_db):
+        construir_sqlite(ruta_db)
+    return ConexionSQLite(ruta_db)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construye la base Sakila en SQLite desde sakila-db.zip.")
+    parser.add_argument("--ruta", default=RUTA_SQLITE)
+    parser.add_argument("--zip", default=RUTA_ZIP)
+    args = parser.parse_args()
+
+    construir_sqlite(args.ruta, args.zip)
+    conexion = sqlite3.connect(args.ruta)
+    for tabla in ("rental", "payment", "inventory", "film", "customer"):
+        print(f"   {tabla}: {conexion.execute(f'SELECT COUNT(*) FROM {tabla}').fetchone()[0]} filas")
+    conexion.close()
+
+
+if __name__ == "__main__":
+    main()
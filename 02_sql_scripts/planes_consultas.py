@@ -0,0 +1,391 @@
+import json
+import os
+import re
+import sqlite3
+import time
+
+import mysql.connector
+
+import motor_sqlite
+
+ARCHIVO_REPORTE = "reporte_planes.json"
+BASE_COPIA_MYSQL = "sakila_pruebas"
+RUTA_COPIA_SQLITE = "sakila_pruebas.sqlite"
+
+# Tablas con menos filas no reciben sugerencias: recorrerlas completas ya es barato
+FILAS_MINIMAS = 1000
+
+
+# --- LECTURA DE LA CONSULTA ---
+def tablas_de_consulta(consulta):
+    """Alias -> tabla de los FROM/JOIN de la consulta (las subconsultas se ignoran)."""
+    palabras_reservadas = {"ON", "WHERE", "JOIN", "LEFT", "RIGHT", "INNER", "GROUP", "ORDER", "LIMIT", "UNION"}
+    alias = {}
+    for tabla, nombre in re.findall(r"\b(?:FROM|JOIN)\s+`?(\w+)`?(?:\s+(?:AS\s+)?(\w+))?", consulta, re.I):
+        if nombre and nombre.upper() not in palabras_reservadas:
+            alias[nombre] = tabla
+        else:
+            alias[tabla] = tabla
+    return alias
+
+
+def columnas_referenciadas(consulta, alias):
+    """Columnas alias.columna que usa la consulta, en orden de aparición y sin repetir."""
+    return list(dict.fromkeys(re.findall(rf"\b{alias}\.`?(\w+)", consulta)))
+
+
+def columnas_de_filtro(consulta, alias):
+    """Columnas del alias que aparecen en condiciones ON / WHERE (candidatas a prefijo del índice)."""
+    columnas = []
+    for condicion in re.findall(r"\b(?:ON|WHERE)\b(.*?)(?=\b(?:JOIN|LEFT|WHERE|GROUP|ORDER|UNION|LIMIT)\b|;|$)", consulta, re.I | re.S):
+        columnas += re.findall(rf"\b{alias}\.`?(\w+)", condicion)
+    return list(dict.fromkeys(columnas))
+
+
+# --- ÍNDICES Y TAMAÑOS ---
+def indices_de_tabla(conexion, motor, tabla):
+    """Nombre de índice -> columnas. La clave primaria queda siempre como "PRIMARY"."""
+    cursor = conexion.cursor()
+    indices = {}
+    if motor == "sqlite":
+        cursor.execute(f"PRAGMA table_info({tabla})")
+        primaria = [fila[1] for fila in sorted(cursor.fetchall(), key=lambda f: f[5]) if fila[5]]
+        if primaria:
+            indices["PRIMARY"] = primaria
+        cursor.execute(f"PRAGMA index_list({tabla})")
+        for nombre in [fila[1] for fila in cursor.fetchall()]:
+            cursor.execute(f"PRAGMA index_info({nombre})")
+            indices[nombre] = [fila[2] for fila in sorted(cursor.fetchall())]
+    else:
+        cursor.execute(f"SHOW INDEX FROM {tabla}")
+        columnas = [col[0] for col in cursor.description]
+        for fila in cursor.fetchall():
+            fila = dict(zip(columnas, fila))
+            indices.setdefault(fila["Key_name"], []).append((fila["Seq_in_index"], fila["Column_name"]))
+        indices = {nombre: [c for _, c in sorted(cols)] for nombre, cols in indices.items()}
+    cursor.close()
+    return indices
+
+
+def contar_filas(conexion, tablas):
+    cursor = conexion.cursor()
+    filas = {}
+    for tabla in tablas:
+        cursor.execute(f"SELECT COUNT(*) FROM {tabla}")
+        filas[tabla] = cursor.fetchone()[0]
+    cursor.close()
+    return filas
+
+
+# --- CAPTURA DEL PLAN ---
+def _nodo(alias, tabla, acceso, indice=None, columnas_busqueda=(), cubre=False, filas_estimadas=None, detalle=""):
+    return {
+        "alias": alias,
+        "tabla": tabla,
+        "acceso": acceso,  # escaneo | escaneo_indice | busqueda | clave_primaria
+        "indice": indice,
+        "columnas_busqueda": list(columnas_busqueda),
+        "cubre": cubre,
+        "filas_estimadas": filas_estimadas,
+        "filas_reales": None,
+        "detalle": detalle,
+    }
+
+
+def plan_sqlite(conexion, consulta, alias_tablas):
+    """
+    EXPLAIN QUERY PLAN de SQLite. Las filas estimadas por acceso salen de
+    sqlite_stat1 (filas de la tabla para un escaneo, filas por clave para una
+    búsqueda); SQLite no expone filas reales por tabla desde Python.
+    """
+    cursor = conexion.cursor()
+    cursor.execute("EXPLAIN QUERY PLAN " + consulta)
+    detalles = [fila[3] for fila in cursor.fetchall()]
+    cursor.execute("SELECT tbl, idx, stat FROM sqlite_stat1")
+    estadisticas = {(tbl, idx): [int(n) for n in stat.split()] for tbl, idx, stat in cursor.fetchall()}
+    cursor.close()
+
+    nodos = []
+    for detalle in detalles:
+        m = re.match(
+            r"(SCAN|SEARCH) (\w+)(?: USING (AUTOMATIC COVERING INDEX|AUTOMATIC PARTIAL COVERING INDEX|COVERING INDEX|INDEX"
+            r"|INTEGER PRIMARY KEY|PRIMARY KEY)(?: (\w+))?)?(?: \((.*)\))?",
+            detalle
+        )
+        if not m:
+            continue
+        operacion, alias, uso, indice, condicion = m.groups()
+        tabla = alias_tablas.get(alias, alias)
+        filas_tabla = next((stat[0] for (tbl, _), stat in estadisticas.items() if tbl == tabla), None)
+        columnas = re.findall(r"(\w+)[=<>]", condicion or "")
+        cubre = bool(uso) and "COVERING" in uso
+        if operacion == "SCAN":
+            acceso = "escaneo_indice" if uso else "escaneo"
+            nodos.append(_nodo(alias, tabla, acceso, indice, (), cubre, filas_tabla, detalle))
+        elif uso in ("INTEGER PRIMARY KEY", "PRIMARY KEY"):
+            nodos.append(_nodo(alias, tabla, "clave_primaria", "PRIMARY", columnas, True, 1, detalle))
+        else:
+            stat = estadisticas.get((tabla, indice))
+            por_clave = stat[min(len(columnas), len(stat) - 1)] if stat else None
+            # Un índice AUTOMATIC lo arma SQLite en cada ejecución porque falta uno permanente
+            nodos.append(_nodo(alias, tabla, "busqueda", indice, columnas, cubre and "AUTOMATIC" not in uso, por_clave, detalle))
+    return nodos, "\n".join(detalles)
+
+
+# Accesos a tabla en el árbol de EXPLAIN ANALYZE (MySQL >= 8.0.18)
+ACCESOS_ANALYZE = re.compile(
+    r"-> (?:Table scan|Index scan|Covering index scan|Index range scan|Covering index range scan|Index lookup"
+    r"|Covering index lookup|Single-row index lookup|Single-row covering index lookup) on (\w+).*?"
+    r"\(actual time=[\d.e+]+\.\.([\d.e+]+) rows=([\d.e+]+) loops=(\d+)\)"
+)
+
+
+def plan_mysql(conexion, consulta, alias_tablas):
+    """
+    EXPLAIN tradicional de MySQL (tipo de acceso, índice, filas estimadas) más
+    EXPLAIN ANALYZE, que ejecuta la consulta y agrega filas reales por tabla.
+    """
+    cursor = conexion.cursor()
+    cursor.execute("EXPLAIN " + consulta)
+    columnas = [col[0] for col in cursor.description]
+    filas = [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+
+    nodos = []
+    for fila in filas:
+        alias = fila["table"]
+        if alias not in alias_tablas:
+            continue  # <derived>, <union>: no son tablas del esquema
+        tabla = alias_tablas[alias]
+        extra = fila.get("Extra") or ""
+        estimadas = float(fila["rows"] or 0) * float(fila.get("filtered") or 100) / 100
+        referencias = [r for r in (fila.get("ref") or "").split(",") if r]
+        if fila["type"] == "ALL":
+            acceso = "escaneo"
+        elif fila["type"] == "index":
+            acceso = "escaneo_indice"
+        elif fila["key"] == "PRIMARY":
+            acceso = "clave_primaria"
+        else:
+            acceso = "busqueda"
+        columnas_indice = indices_de_tabla(conexion, "mysql", tabla).get(fila["key"], []) if fila["key"] else []
+        nodos.append(_nodo(
+            alias, tabla, acceso, fila["key"], columnas_indice[:len(referencias)],
+            "Using index" in extra or acceso == "clave_primaria", estimadas,
+            f"{fila['type']} {fila['key'] or ''} {extra}".strip()
+        ))
+
+    texto = ""
+    try:
+        cursor.execute("EXPLAIN ANALYZE " + consulta)
+        texto = cursor.fetchone()[0]
+    except mysql.connector.Error:
+        pass  # MySQL < 8.0.18: quedan solo las estimaciones
+    cursor.close()
+    for alias, _, filas_reales, loops in ACCESOS_ANALYZE.findall(texto):
+        for nodo in nodos:
+            if nodo["alias"] == alias:
+                nodo["filas_reales"] = (nodo["filas_reales"] or 0) + round(float(filas_reales) * int(loops))
+    return nodos, texto or "\n".join(n["detalle"] for n in nodos)
+
+
+def filas_examinadas_estimadas(nodos):
+    # Join anidado: cada acceso se repite una vez por fila acumulada de los anteriores
+    total, acumuladas = 0.0, 1.0
+    for nodo in nodos:
+        if nodo["filas_estimadas"] is None:
+            return None
+        acumuladas *= max(nodo["filas_estimadas"], 1)
+        total += acumuladas
+    return round(total)
+
+
+# --- ASESOR DE ÍNDICES ---
+def sugerir_indices(consulta, nodos, indices, filas_tablas, filas_minimas=FILAS_MINIMAS):
+    """
+    Propone un índice de cobertura para cada acceso a una tabla grande que
+    todavía tiene que leer la fila completa: escaneos de tabla y búsquedas por
+    índice que no cubren las columnas usadas. Prefijo: columnas de la búsqueda
+    (o de ON/WHERE en un escaneo); después, el resto de columnas que lee la consulta.
+    La clave primaria no se repite: InnoDB y SQLite ya la guardan en cada índice.
+    """
+    sugerencias = []
+    for nodo in nodos:
+        tabla = nodo["tabla"]
+        if nodo["acceso"] == "clave_primaria" or nodo["cubre"] or filas_tablas.get(tabla, 0) < filas_minimas:
+            continue
+        primaria = indices[tabla].get("PRIMARY", [])
+        if nodo["acceso"] == "busqueda":
+            prefijo = nodo["columnas_busqueda"]
+        else:
+            prefijo = [c for c in columnas_de_filtro(consulta, nodo["alias"]) if c not in primaria]
+        resto = [c for c in columnas_referenciadas(consulta, nodo["alias"]) if c not in prefijo and c not in primaria]
+        columnas = prefijo + resto
+        if not columnas:
+            continue
+        # Ya cubierto si algún índice existente (más la clave primaria implícita) empieza con esas columnas
+        if any(existente[:len(prefijo)] == prefijo and set(columnas) <= set(existente + primaria)
+               for existente in indices[tabla].values()):
+            continue
+        sugerencias.append((tabla, columnas))
+    return sugerencias
+
+
+def sentencia_indice(tabla, columnas):
+    return f"CREATE INDEX idx_cov_{tabla}_{'_'.join(columnas)} ON {tabla} ({', '.join(columnas)})"
+
+
+def combinar_sugerencias(sugerencias):
+    """Sin repetidos y sin los índices que son prefijo de otro sugerido para la misma tabla."""
+    unicas = list(dict.fromkeys((tabla, tuple(columnas)) for tabla, columnas in sugerencias))
+    return [
+        (tabla, list(columnas)) for tabla, columnas in unicas
+        if not any(t == tabla and otras != columnas and otras[:len(columnas)] == columnas for t, otras in unicas)
+    ]
+
+
+# --- MEDICIÓN ---
+def medir_latencia(conexion, consulta, repeticiones):
+    """Mejor tiempo de execute + fetchall y número de filas del resultado."""
+    tiempos, filas = [], 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        cursor = conexion.cursor()
+        cursor.execute(consulta)
+        filas = len(cursor.fetchall())
+        cursor.close()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), filas
+
+
+def analizar_consultas(conexion, motor, consultas, repeticiones=3, filas_minimas=FILAS_MINIMAS):
+    """Plan, filas estimadas/reales, latencia e índices sugeridos de cada consulta."""
+    alias_por_consulta = {nombre: tablas_de_consulta(consulta) for nombre, consulta in consultas.items()}
+    tablas = sorted({t for alias in alias_por_consulta.values() for t in alias.values()})
+    indices = {tabla: indices_de_tabla(conexion, motor, tabla) for tabla in tablas}
+    filas_tablas = contar_filas(conexion, tablas)
+
+    analisis = {}
+    for nombre_archivo, consulta in consultas.items():
+        capturar = plan_sqlite if motor == "sqlite" else plan_mysql
+        nodos, texto = capturar(conexion, consulta, alias_por_consulta[nombre_archivo])
+        segundos, filas = medir_latencia(conexion, consulta, repeticiones)
+        reales = [n["filas_reales"] for n in nodos]
+        analisis[nombre_archivo] = {
+            "segundos": segundos,
+            "filas_resultado": filas,
+            "filas_examinadas_estimadas": filas_examinadas_estimadas(nodos),
+            "filas_examinadas_reales": sum(reales) if reales and None not in reales else None,
+            "accesos": nodos,
+            "plan": texto,
+            "indices_sugeridos": [
+                sentencia_indice(tabla, columnas)
+                for tabla, columnas in sugerir_indices(consulta, nodos, indices, filas_tablas, filas_minimas)
+            ],
+        }
+    return analisis
+
+
+# --- COPIA DE PRUEBAS ---
+def crear_copia(conexion, motor, db_config):
+    """Copia completa de la base para probar los índices sin tocar la original."""
+    if motor == "sqlite":
+        if os.path.exists(RUTA_COPIA_SQLITE):
+            os.remove(RUTA_COPIA_SQLITE)
+        destino = sqlite3.connect(RUTA_COPIA_SQLITE)
+        conexion.sqlite.backup(destino)
+        destino.close()
+        return motor_sqlite.ConexionSQLite(RUTA_COPIA_SQLITE)
+
+    cursor = conexion.cursor()
+    cursor.execute("SHOW FULL TABLES WHERE Table_type = 'BASE TABLE'")
+    tablas = [fila[0] for fila in cursor.fetchall()]
+    cursor.execute(f"DROP DATABASE IF EXISTS {BASE_COPIA_MYSQL}")
+    cursor.execute(f"CREATE DATABASE {BASE_COPIA_MYSQL}")
+    for tabla in tablas:
+        cursor.execute(f"CREATE TABLE {BASE_COPIA_MYSQL}.{tabla} LIKE {tabla}")
+        cursor.execute(f"INSERT INTO {BASE_COPIA_MYSQL}.{tabla} SELECT * FROM {tabla}")
+    conexion.commit()
+    cursor.close()
+    return mysql.connector.connect(**{**db_config, "database": BASE_COPIA_MYSQL})
+
+
+def eliminar_copia(conexion, motor):
+    if motor == "sqlite":
+        os.remove(RUTA_COPIA_SQLITE)
+        return
+    cursor = conexion.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS {BASE_COPIA_MYSQL}")
+    cursor.close()
+
+
+def aplicar_indices(conexion, motor, sentencias):
+    cursor = conexion.cursor()
+    for sentencia in sentencias:
+        cursor.execute(sentencia)
+    # Estadísticas nuevas para que el optimizador considere los índices
+    tablas = sorted({re.search(r" ON (\w+)", s).group(1) for s in sentencias})
+    if motor == "sqlite":
+        cursor.execute("ANALYZE")
+    elif tablas:
+        cursor.execute(f"ANALYZE TABLE {', '.join(tablas)}")
+        cursor.fetchall()
+    conexion.commit()
+    cursor.close()
+
+
+# --- MODO PLANES ---
+def exportar_planes(conexion, motor, consultas, output_folder, db_config=None, aplicar=False, repeticiones=3):
+    """
+    Captura el plan de cada consulta y lo guarda en reporte_planes.json junto con
+    filas examinadas (estimadas y, en MySQL 8.0.18+, reales), latencia e índices
+    sugeridos. Con aplicar=True crea los índices en una copia de la base y
+    registra la latencia y el plan de después.
+    """
+    analisis = analizar_consultas(conexion, motor, consultas, repeticiones)
+    reporte = {"motor": motor, "consultas": analisis}
+
+    for nombre_archivo, datos in analisis.items():
+        examinadas = datos["filas_examinadas_reales"] or datos["filas_examinadas_estimadas"]
+        print(
+            f"🔎 {nombre_archivo}: {datos['segundos'] * 1000:.1f} ms, {datos['filas_resultado']} filas, "
+            f"~{examinadas} filas examinadas"
+        )
+        for sentencia in datos["indices_sugeridos"]:
+            print(f"   💡 {sentencia}")
+
+    sugeridos = combinar_sugerencias(
+        (re.search(r" ON (\w+)", s).group(1), re.search(r"\((.*)\)", s).group(1).split(", "))
+        for datos in analisis.values() for s in datos["indices_sugeridos"]
+    )
+    sentencias = [sentencia_indice(tabla, columnas) for tabla, columnas in sugeridos]
+    reporte["indices_sugeridos"] = sentencias
+
+    if aplicar and sentencias:
+        copia = crear_copia(conexion, motor, db_config)
+        try:
+            # El antes también se mide sobre la copia, en las mismas condiciones que el después
+            antes = analizar_consultas(copia, motor, consultas, repeticiones)
+            aplicar_indices(copia, motor, sentencias)
+            despues = analizar_consultas(copia, motor, consultas, repeticiones)
+        finally:
+            copia.close()
+            eliminar_copia(conexion, motor)
+        reporte["comparacion"] = {}
+        print(f"🧪 Índices aplicados en una copia de la base ({len(sentencias)}):")
+        for nombre_archivo in consultas:
+            t_antes, t_despues = antes[nombre_archivo]["segundos"], despues[nombre_archivo]["segundos"]
+            reporte["comparacion"][nombre_archivo] = {
+                "segundos_antes": t_antes,
+                "segundos_despues": t_despues,
+                "plan_despues": despues[nombre_archivo]["plan"],
+                "accesos_despues": despues[nombre_archivo]["accesos"],
+            }
+            print(
+                f"   {nombre_archivo:<36} {t_antes * 1000:>8.1f} ms -> {t_despues * 1000:>8.1f} ms "
+                f"({t_antes / t_despues if t_despues else 0:.2f}x)"
+            )
+
+    ruta = os.path.join(output_folder, ARCHIVO_REPORTE)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(reporte, f, indent=2, ensure_ascii=False, default=str)
+    print(f"✅ Reporte de planes: {ruta}")
@@ -0,0 +1,254 @@
+import time
+
+from motor_sqlite import traducir_esquema
+
+# Tablas resumen de los cuatro reportes agregados, dentro del esquema Sakila. Se llenan una
+# vez con GROUP BY y después las mantienen triggers sobre rental y payment, así leer un
+# reporte es recorrer unas decenas o cientos de filas en vez de agregar todo el historial.
+#
+# Cambios en inventory o film_category (mover una copia de tienda, recategorizar una película)
+# no los siguen los triggers: después de ese tipo de cambio hay que volver a crear los resúmenes.
+
+TABLAS_RESUMEN = {
+    "resumen_alquileres_mes_categoria": """
+CREATE TABLE resumen_alquileres_mes_categoria (
+  mes CHAR(7) NOT NULL,
+  category_id TINYINT UNSIGNED NOT NULL,
+  total_alquileres INT NOT NULL,
+  last_update TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (mes, category_id)
+)""",
+    "resumen_ingresos_tienda_categoria": """
+CREATE TABLE resumen_ingresos_tienda_categoria (
+  store_id TINYINT UNSIGNED NOT NULL,
+  category_id TINYINT UNSIGNED NOT NULL,
+  ingresos DECIMAL(12,2) NOT NULL,
+  pagos INT NOT NULL,
+  last_update TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (store_id, category_id)
+)""",
+    "resumen_peliculas": """
+CREATE TABLE resumen_peliculas (
+  film_id SMALLINT UNSIGNED NOT NULL,
+  total_alquileres INT NOT NULL,
+  total_ingresos DECIMAL(12,2) NOT NULL,
+  last_update TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (film_id)
+)""",
+    "resumen_clientes": """
+CREATE TABLE resumen_clientes (
+  customer_id SMALLINT UNSIGNED NOT NULL,
+  total_transacciones INT NOT NULL,
+  total_gastado DECIMAL(12,2) NOT NULL,
+  last_update TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (customer_id)
+)""",
+}
+
+# Carga inicial: los mismos JOIN que las consultas originales, agrupados por ids
+CARGA_INICIAL = {
+    "resumen_alquileres_mes_categoria": """
+        INSERT INTO resumen_alquileres_mes_categoria (mes, category_id, total_alquileres, last_update)
+        SELECT DATE_FORMAT(r.rental_date, '%Y-%m'), fc.category_id, COUNT(*), CURRENT_TIMESTAMP
+        FROM rental r
+        JOIN inventory i ON r.inventory_id = i.inventory_id
+        JOIN film_category fc ON i.film_id = fc.film_id
+        GROUP BY DATE_FORMAT(r.rental_date, '%Y-%m'), fc.category_id
+    """,
+    "resumen_ingresos_tienda_categoria": """
+        INSERT INTO resumen_ingresos_tienda_categoria (store_id, category_id, ingresos, pagos, last_update)
+        SELECT i.store_id, fc.category_id, SUM(p.amount), COUNT(*), CURRENT_TIMESTAMP
+        FROM payment p
+        JOIN rental r ON p.rental_id = r.rental_id
+        JOIN inventory i ON r.inventory_id = i.inventory_id
+        JOIN film_category fc ON i.film_id = fc.film_id
+        GROUP BY i.store_id, fc.category_id
+    """,
+    "resumen_peliculas": """
+        INSERT INTO resumen_peliculas (film_id, total_alquileres, total_ingresos, last_update)
+        SELECT i.film_id, COUNT(p.payment_id), SUM(p.amount), CURRENT_TIMESTAMP
+        FROM payment p
+        JOIN rental r ON p.rental_id = r.rental_id
+        JOIN inventory i ON r.inventory_id = i.inventory_id
+        GROUP BY i.film_id
+    """,
+    "resumen_clientes": """
+        INSERT INTO resumen_clientes (customer_id, total_transacciones, total_gastado, last_update)
+        SELECT c.customer_id, COUNT(p.payment_id), SUM(p.amount), CURRENT_TIMESTAMP
+        FROM customer c
+        JOIN payment p ON c.customer_id = p.customer_id
+        GROUP BY c.customer_id
+    """,
+}
+
+# Lectura de los reportes desde los resúmenes: mismas columnas y mismo orden que las
+# consultas originales. Las filas en cero quedan de un delta negativo y no existirían en el GROUP BY.
+CONSULTAS_RESUMEN = {
+    "alquileres_por_mes_categoria.csv": """
+        SELECT
+            s.mes,
+            cat.name AS categoria,
+            s.total_alquileres
+        FROM resumen_alquileres_mes_categoria s
+        JOIN category cat ON s.category_id = cat.category_id
+        WHERE s.total_alquileres > 0
+        ORDER BY s.mes, s.total_alquileres DESC;
+    """,
+
+    "ingresos_por_tienda_categoria.csv": """
+        SELECT
+            s.store_id,
+            cat.name AS categoria,
+            s.ingresos
+        FROM resumen_ingresos_tienda_categoria s
+        JOIN category cat ON s.category_id = cat.category_id
+        WHERE s.pagos > 0
+        ORDER BY s.ingresos DESC;
+    """,
+
+    "peliculas_mas_rentables.csv": """
+        SELECT
+            f.title AS pelicula,
+            SUM(s.total_alquileres) AS total_alquileres,
+            SUM(s.total_ingresos) AS total_ingresos
+        FROM resumen_peliculas s
+        JOIN film f ON s.film_id = f.film_id
+        WHERE s.total_alquileres > 0
+        GROUP BY f.title
+        ORDER BY total_ingresos DESC;
+    """,
+
+    "clientes_mas_frecuentes.csv": """
+        SELECT
+            c.customer_id,
+            CONCAT(c.first_name, ' ', c.last_name) AS cliente,
+            s.total_transacciones,
+            s.total_gastado
+        FROM resumen_clientes s
+        JOIN customer c ON s.customer_id = c.customer_id
+        WHERE s.total_transacciones > 0
+        ORDER BY s.total_gastado DESC;
+    """,
+}
+
+
+# --- DELTAS ---
+def _acumular(motor, tabla, claves, valores, select):
+    """INSERT ... SELECT que suma los deltas del SELECT a la fila existente (o la crea)."""
+    columnas = ", ".join(claves + valores + ["last_update"])
+    if motor == "sqlite":
+        sumas = ", ".join(f"{v} = {v} + excluded.{v}" for v in valores)
+        conflicto = f"ON CONFLICT ({', '.join(claves)}) DO UPDATE SET {sumas}, last_update = CURRENT_TIMESTAMP"
+    else:
+        sumas = ", ".join(f"{v} = {v} + VALUES({v})" for v in valores)
+        conflicto = f"ON DUPLICATE KEY UPDATE {sumas}, last_update = CURRENT_TIMESTAMP"
+    return f"INSERT INTO {tabla} ({columnas}) {select} {conflicto};"
+
+
+def delta_alquileres(motor, signo, fila, condicion=""):
+    # Un alquiler cuenta una vez por cada categoría de su película, como en el JOIN original
+    return _acumular(motor, "resumen_alquileres_mes_categoria", ["mes", "category_id"], ["total_alquileres"], f"""
+        SELECT DATE_FORMAT({fila}.rental_date, '%Y-%m'), fc.category_id, {signo}1, CURRENT_TIMESTAMP
+        FROM inventory i JOIN film_category fc ON i.film_id = fc.film_id
+        WHERE i.inventory_id = {fila}.inventory_id {condicion}""")
+
+
+def delta_pago(motor, signo, fila):
+    """Deltas de un pago (NEW u OLD de payment) en los tres resúmenes de montos."""
+    return [
+        _acumular(motor, "resumen_ingresos_tienda_categoria", ["store_id", "category_id"], ["ingresos", "pagos"], f"""
+            SELECT i.store_id, fc.category_id, {signo}{fila}.amount, {signo}1, CURRENT_TIMESTAMP
+            FROM rental r
+            JOIN inventory i ON r.inventory_id = i.inventory_id
+            JOIN film_category fc ON i.film_id = fc.film_id
+            WHERE r.rental_id = {fila}.rental_id"""),
+        _acumular(motor, "resumen_peliculas", ["film_id"], ["total_alquileres", "total_ingresos"], f"""
+            SELECT i.film_id, {signo}1, {signo}{fila}.amount, CURRENT_TIMESTAMP
+            FROM rental r JOIN inventory i ON r.inventory_id = i.inventory_id
+            WHERE r.rental_id = {fila}.rental_id"""),
+        _acumular(motor, "resumen_clientes", ["customer_id"], ["total_transacciones", "total_gastado"], f"""
+            SELECT c.customer_id, {signo}1, {signo}{fila}.amount, CURRENT_TIMESTAMP
+            FROM customer c
+            WHERE c.customer_id = {fila}.customer_id"""),
+    ]
+
+
+def delta_pagos_de_alquiler(motor, signo, fila, condicion=""):
+    """Mueve los pagos de un alquiler (NEW u OLD de rental) cuando cambia su copia de inventario o se borra."""
+    return [
+        _acumular(motor, "resumen_ingresos_tienda_categoria", ["store_id", "category_id"], ["ingresos", "pagos"], f"""
+            SELECT i.store_id, fc.category_id, {signo}SUM(p.amount), {signo}COUNT(*), CURRENT_TIMESTAMP
+            FROM payment p
+            JOIN inventory i ON i.inventory_id = {fila}.inventory_id
+            JOIN film_category fc ON i.film_id = fc.film_id
+            WHERE p.rental_id = {fila}.rental_id {condicion}
+            GROUP BY i.store_id, fc.category_id"""),
+        _acumular(motor, "resumen_peliculas", ["film_id"], ["total_alquileres", "total_ingresos"], f"""
+            SELECT i.film_id, {signo}COUNT(*), {signo}SUM(p.amount), CURRENT_TIMESTAMP
+            FROM payment p
+            JOIN inventory i ON i.inventory_id = {fila}.inventory_id
+            WHERE p.rental_id = {fila}.rental_id {condicion}
+            GROUP BY i.film_id"""),
+    ]
+
+
+def disparadores(motor):
+    """Triggers que mantienen los resúmenes al insertar, actualizar o borrar en rental y payment."""
+    cambio_alquiler = "AND (OLD.rental_date <> NEW.rental_date OR OLD.inventory_id <> NEW.inventory_id)"
+    cambio_inventario = "AND OLD.inventory_id <> NEW.inventory_id"
+    cuerpos = {
+        "resumen_rental_insert": ("AFTER INSERT ON rental", [delta_alquileres(motor, "+", "NEW")]),
+        "resumen_rental_update": ("AFTER UPDATE ON rental", [
+            delta_alquileres(motor, "-", "OLD", cambio_alquiler),
+            delta_alquileres(motor, "+", "NEW", cambio_alquiler),
+            *delta_pagos_de_alquiler(motor, "-", "OLD", cambio_inventario),
+            *delta_pagos_de_alquiler(motor, "+", "NEW", cambio_inventario),
+        ]),
+        # BEFORE: en MySQL la FOREIGN KEY pone payment.rental_id en NULL al borrar el alquiler,
+        # y esa acción en cascada no dispara los triggers de payment
+        "resumen_rental_delete": ("BEFORE DELETE ON rental", [
+            delta_alquileres(motor, "-", "OLD"),
+            *delta_pagos_de_alquiler(motor, "-", "OLD"),
+        ]),
+        "resumen_payment_insert": ("AFTER INSERT ON payment", delta_pago(motor, "+", "NEW")),
+        "resumen_payment_update": ("AFTER UPDATE ON payment", delta_pago(motor, "-", "OLD") + delta_pago(motor, "+", "NEW")),
+        "resumen_payment_delete": ("AFTER DELETE ON payment", delta_pago(motor, "-", "OLD")),
+    }
+    return {
+        nombre: f"CREATE TRIGGER {nombre} {evento} FOR EACH ROW BEGIN\n" + "\n".join(sentencias) + "\nEND"
+        for nombre, (evento, sentencias) in cuerpos.items()
+    }
+
+
+# --- CREACIÓN ---
+def crear_resumenes(conexion, motor):
+    """
+    (Re)crea las tablas resumen, las llena con la agregación completa y agrega los
+    triggers. Conviene correrlo sin escrituras en curso: lo que se inserte entre la
+    carga inicial y la creación de los triggers no quedaría en los resúmenes.
+    """
+    inicio = time.perf_counter()
+    triggers = disparadores(motor)
+    cursor = conexion.cursor()
+    for nombre in triggers:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    for tabla, ddl in TABLAS_RESUMEN.items():
+        cursor.execute(f"DROP TABLE IF EXISTS {tabla}")
+        if motor == "sqlite":
+            ddl = traducir_esquema(ddl)[0][0]
+        cursor.execute(ddl)
+        cursor.execute(CARGA_INICIAL[tabla])
+    for sentencia in triggers.values():
+        cursor.execute(sentencia)
+    conexion.commit()
+
+    for tabla in TABLAS_RESUMEN:
+        cursor.execute(f"SELECT COUNT(*) FROM {tabla}")
+        print(f"✅ Resumen: {tabla} ({cursor.fetchone()[0]} filas)")
+    cursor.close()
+    print(f"⏱️ Resúmenes y {len(triggers)} triggers creados en {time.perf_counter() - inicio:.2f} s")
+
+
+def consultas_con_resumenes(consultas):
+    """Las consultas del proyecto con los cuatro agregados leídos desde las tablas resumen."""
+    return {nombre: CONSULTAS_RESUMEN.get(nombre, consulta) for nombre, consulta in consultas.items()}
@@ -1,21 +1,40 @@
+import argparse
+import os
+import sys
+import time
 
 import mysql.connector
 import pandas as pd
-import os
+from mysql.connector import pooling
 
-# Conexión a la base de datos
-conexion = mysql.connector.connect(
-    host="localhost",
-    user="root",
-    password="Aeacucho",
-    database="sakila"
-)
+import motor_sqlite
+from cache_resultados import consultas_pendientes, guardar_huellas, huellas_actuales
+from ejecucion_paralela import exportar_en_paralelo
+from exportacion_streaming import exportar_consulta_streaming, reiniciar_pico_rss, rss_actual_mb, rss_pico_mb
+from extraccion_hechos import REPORTES_DERIVADOS, exportar_desde_hechos
+from extraccion_incremental import exportar_incremental
+from planes_consultas import exportar_planes
+from resumenes_materializados import consultas_con_resumenes, crear_resumenes
+from fetch_columnar import a_csv, leer_columnar
+from limpieza_datos import CARPETA_DASHBOARD, RUTA_ZIP_LIMPIOS, limpiar_exportacion
 
-cursor = conexion.cursor()
+# instrumentacion.py y carga_datos.py son compartidos con el dashboard (mismo formato de métricas
+# y mismos esquemas columnares para ambos)
+if CARPETA_DASHBOARD not in sys.path:
+    sys.path.insert(0, CARPETA_DASHBOARD)
+from carga_datos import escribir_columnar  # noqa: E402
+from instrumentacion import instrumentacion_desde_entorno  # noqa: E402
 
-# Crear carpeta de salida
+# Parámetros de conexión a la base de datos
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "Aeacucho",
+    "database": "sakila"
+}
+
+# Carpeta de salida
 output_folder = "output_csv_sakila"
-os.makedirs(output_folder, exist_ok=True)
 
 # Lista de consultas mejoradas
 consultas = {
@@ -90,15 +109,296 @@ consultas = {
     """
 }
 
-# Ejecutar consultas y exportar a CSV
-for nombre_archivo, consulta in consultas.items():
-    cursor.execute(consulta)
-    resultados = cursor.fetchall()
-    columnas = [col[0] for col in cursor.description]
-    df = pd.DataFrame(resultados, columns=columnas)
-    df.to_csv(os.path.join(output_folder, nombre_archivo), index=False)
-    print(f"✅ Exportado: {nombre_archivo} ({len(df)} filas)")
-
-# Cerrar conexiones
-cursor.close()
-conexion.close()
+# Motores disponibles: "mysql" (servidor de DB_CONFIG) o "sqlite" (base embebida creada
+# desde 01_data_raw/sakila-db.zip; las consultas se traducen con motor_sqlite.a_sqlite)
+MOTORES = ["mysql", "sqlite"]
+
+
+def conectar(motor="mysql", **opciones):
+    """Abre una conexión nueva a la base Sakila en el motor indicado."""
+    if motor == "sqlite":
+        return motor_sqlite.conectar(**opciones)
+    return mysql.connector.connect(**DB_CONFIG, **opciones)
+
+
+def crear_pool(motor, workers):
+    """Pool acotado de conexiones con la interfaz de MySQLConnectionPool (get_connection / close)."""
+    if motor == "sqlite":
+        # Se construye antes de abrir el pool para que los workers no la creen a la vez
+        motor_sqlite.conectar().close()
+        return motor_sqlite.PoolSQLite(workers)
+    return pooling.MySQLConnectionPool(pool_name="sakila_export", pool_size=workers, **DB_CONFIG)
+
+
+# --- MÉTRICAS POR CONSULTA ---
+# Un evento "exportacion" por consulta exportada (SAKILA_METRICAS, ver 05_dashboard/instrumentacion.py)
+def registrar_exportacion(metricas, modo, stats):
+    if metricas is None:
+        return
+    metricas.registrar("exportacion", {"consulta": stats["archivo"], "modo": modo}, {
+        "consulta_segundos": stats["segundos_execute"],
+        "fetch_segundos": stats["segundos_fetch"],
+        "serializacion_segundos": stats["segundos_serializacion"],
+        "filas": stats["filas"],
+        "bytes_escritos": stats["bytes"],
+        "rss_pico_bytes": int(stats["rss_pico_mb"] * 2**20),
+    })
+
+
+# --- MODO COMPLETO: fetchall + DataFrame (comportamiento original) ---
+def exportar_completo(conexion, consultas, output_folder, fetch="tuplas", metricas=None):
+    if fetch == "columnar":
+        # Modo raw: el conector entrega bytes y leer_columnar los convierte por columna a arrays tipados
+        cursor = conexion.cursor(raw=True)
+    else:
+        cursor = conexion.cursor()
+    for nombre_archivo, consulta in consultas.items():
+        reiniciar_pico_rss()
+        inicio = time.perf_counter()
+        cursor.execute(consulta)
+        fin_execute = time.perf_counter()
+        ruta = os.path.join(output_folder, nombre_archivo)
+        if fetch == "columnar":
+            df = leer_columnar(cursor)
+            fin_fetch = time.perf_counter()
+            a_csv(df, ruta)
+        else:
+            resultados = cursor.fetchall()
+            fin_fetch = time.perf_counter()
+            columnas = [col[0] for col in cursor.description]
+            df = pd.DataFrame(resultados, columns=columnas)
+            df.to_csv(ruta, index=False)
+        print(f"✅ Exportado: {nombre_archivo} ({len(df)} filas)")
+        registrar_exportacion(metricas, "completo", {
+            "archivo": nombre_archivo,
+            "filas": len(df),
+            "segundos_execute": fin_execute - inicio,
+            "segundos_fetch": fin_fetch - fin_execute,
+            "segundos_serializacion": time.perf_counter() - fin_fetch,
+            "bytes": os.path.getsize(ruta),
+            "rss_pico_mb": rss_pico_mb() or rss_actual_mb(),
+        })
+    cursor.close()
+
+
+# --- MODO STREAMING: cursor sin buffer + fetchmany, memoria constante ---
+def exportar_streaming(conexion, consultas, output_folder, tamano_lote, metricas=None, modo="streaming"):
+    for nombre_archivo, consulta in consultas.items():
+        ruta = os.path.join(output_folder, nombre_archivo)
+        stats = exportar_consulta_streaming(conexion, consulta, ruta, tamano_lote)
+        print(
+            f"✅ Exportado: {nombre_archivo} ({stats['filas']} filas, "
+            f"{stats['filas_por_segundo']:,.0f} filas/s, "
+            f"RSS pico {stats['rss_pico_mb']:.1f} MB)"
+        )
+        registrar_exportacion(metricas, modo, stats)
+
+
+# --- MODO HECHOS: un solo escaneo de rental/payment y agregados derivados en memoria ---
+def exportar_hechos(conexion, consultas, output_folder, tamano_lote, comparar, metricas=None):
+    # Las consultas que no son agregados derivables (detalle) se exportan tal cual
+    otras = {n: c for n, c in consultas.items() if n not in REPORTES_DERIVADOS}
+    exportar_streaming(conexion, otras, output_folder, tamano_lote, metricas, modo="hechos")
+    if any(n in consultas for n in REPORTES_DERIVADOS):
+        exportar_desde_hechos(conexion, consultas, output_folder, tamano_lote, comparar, metricas)
+
+
+# --- MODO PARALELO: consultas simultáneas sobre un pool de conexiones ---
+def exportar_paralelo(consultas, output_folder, workers, tamano_lote, timeout_segundos, motor="mysql", metricas=None):
+    workers = max(1, min(workers, len(consultas), pooling.CNX_POOL_MAXSIZE))
+    pool = crear_pool(motor, workers)
+
+    inicio = time.perf_counter()
+    resultados = exportar_en_paralelo(pool, consultas, output_folder, workers, tamano_lote, timeout_segundos)
+    total = time.perf_counter() - inicio
+
+    # El pico de RSS de cada consulta es el del proceso mientras corrían todas a la vez
+    for resultado in resultados:
+        if resultado["ok"]:
+            registrar_exportacion(metricas, "paralelo", resultado)
+    suma = sum(r["segundos"] for r in resultados)
+    fallidas = [r["archivo"] for r in resultados if not r["ok"]]
+    print(f"⏱️ Tiempo total: {total:.2f} s (suma secuencial de consultas: {suma:.2f} s, {workers} workers)")
+    if fallidas:
+        print(f"⚠️ Consultas con error: {', '.join(fallidas)}")
+    return fallidas
+
+
+# --- CACHE: solo se exportan las consultas cuyo SQL o tablas de origen cambiaron ---
+def origen_datos(motor):
+    if motor == "sqlite":
+        return f"sqlite://{os.path.abspath(motor_sqlite.RUTA_SQLITE)}"
+    return f"mysql://{DB_CONFIG['host']}/{DB_CONFIG['database']}"
+
+
+def filtrar_con_cache(consultas, output_folder, motor, modo):
+    """Devuelve las consultas a exportar y las huellas actuales para guardarlas al terminar."""
+    conexion = conectar(motor)
+    try:
+        huellas = huellas_actuales(conexion, consultas, origen_datos(motor))
+    finally:
+        conexion.close()
+    pendientes = consultas_pendientes(huellas, consultas, output_folder)
+    if modo == "hechos" and any(n in pendientes for n in REPORTES_DERIVADOS):
+        # Los cuatro agregados salen del mismo escaneo de hechos: se regeneran juntos
+        pendientes = {n: c for n, c in consultas.items() if n in pendientes or n in REPORTES_DERIVADOS}
+    for nombre_archivo in consultas:
+        if nombre_archivo not in pendientes:
+            print(f"♻️ Sin cambios: {nombre_archivo} (se conserva el CSV)")
+    return pendientes, huellas
+
+
+def convertir_columnar(consultas, output_folder, formato):
+    # Paso posterior a cualquier modo: cada CSV exportado también en Parquet / Arrow IPC
+    for nombre_archivo in consultas:
+        ruta_csv = os.path.join(output_folder, nombre_archivo)
+        if not os.path.exists(ruta_csv):
+            continue
+        ruta = escribir_columnar(ruta_csv, formato)
+        print(f"✅ {formato.capitalize()}: {ruta} ({os.path.getsize(ruta) / 1024:.0f} KB, CSV {os.path.getsize(ruta_csv) / 1024:.0f} KB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta los reportes de Sakila a CSV.")
+    parser.add_argument(
+        "--modo", choices=["completo", "streaming", "paralelo", "hechos", "incremental", "planes", "resumenes"], default="completo",
+        help="completo: fetchall + DataFrame; streaming: lotes fetchmany escritos directo al CSV; "
+             "paralelo: consultas simultáneas sobre un pool de conexiones; "
+             "hechos: un solo escaneo de rental/payment y agregados derivados en memoria; "
+             "incremental: solo alquileres/pagos nuevos desde la última marca de agua; "
+             "planes: EXPLAIN / EXPLAIN ANALYZE de cada consulta e índices sugeridos (no exporta CSV); "
+             "resumenes: crea las tablas resumen de los cuatro agregados y sus triggers (no exporta CSV)"
+    )
+    parser.add_argument(
+        "--tamano-lote", type=int, default=10000,
+        help="Filas por llamada a fetchmany en modo streaming/paralelo"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4,
+        help="Consultas simultáneas (y tamaño del pool) en modo paralelo"
+    )
+    parser.add_argument(
+        "--timeout-consulta", type=float, default=None,
+        help="Segundos máximos por consulta en modo paralelo (MAX_EXECUTION_TIME del servidor)"
+    )
+    parser.add_argument(
+        "--comparar", action="store_true",
+        help="En modo hechos, mide también las consultas originales y reporta el tiempo de BD ahorrado"
+    )
+    parser.add_argument(
+        "--reconstruir", action="store_true",
+        help="En modo incremental, ignora las marcas de agua y reconstruye todo desde cero"
+    )
+    parser.add_argument(
+        "--aplicar-indices", action="store_true",
+        help="En modo planes, crea los índices sugeridos en una copia de la base y compara la latencia antes/después"
+    )
+    parser.add_argument(
+        "--fetch", choices=["tuplas", "columnar"], default="tuplas",
+        help="En modo completo: tuplas (fetchall + DataFrame) o columnar "
+             "(extensión C en modo raw y arrays NumPy tipados por columna)"
+    )
+    parser.add_argument(
+        "--usar-resumenes", action="store_true",
+        help="Lee los cuatro reportes agregados desde las tablas resumen (creadas con --modo resumenes) "
+             "en vez de agregar rental/payment completos"
+    )
+    parser.add_argument(
+        "--cache", action="store_true",
+        help="Solo vuelve a ejecutar las consultas cuyo SQL o contenido de las tablas de origen (checksum) "
+             "cambió desde la última exportación (modos completo, streaming, paralelo y hechos)"
+    )
+    parser.add_argument(
+        "--motor", choices=MOTORES, default="mysql",
+        help="mysql: servidor de DB_CONFIG; sqlite: base embebida construida desde 01_data_raw/sakila-db.zip"
+    )
+    parser.add_argument(
+        "--formato-columnar", choices=["parquet", "arrow"], default=None,
+        help="Además de los CSV, escribe cada resultado en Parquet o Arrow IPC con tipos explícitos (requiere pyarrow)"
+    )
+    parser.add_argument(
+        "--limpiar", nargs="?", const=CARPETA_DASHBOARD, default=None, metavar="DESTINO",
+        help="Al terminar, genera los *_limpio.csv del dashboard (columnas derivadas del notebook, vectorizadas) "
+             "en DESTINO (por defecto 05_dashboard) y actualiza 04_output_csv_sakila_limpio/csv_limpios.zip"
+    )
+    parser.add_argument(
+        "--almacen", action="store_true",
+        help="Con --limpiar, escribe además el almacén columnar (.npy) que los procesos del dashboard comparten por mmap"
+    )
+    parser.add_argument(
+        "--sin-zip", action="store_true",
+        help="Con --limpiar, no actualiza 04_output_csv_sakila_limpio/csv_limpios.zip (el zip versionado)"
+    )
+    args = parser.parse_args()
+    if args.motor == "sqlite" and args.fetch == "columnar":
+        parser.error("--fetch columnar usa el modo raw de mysql-connector; con --motor sqlite use --fetch tuplas")
+    if args.fetch == "columnar" and args.modo != "completo":
+        parser.error("--fetch columnar aplica solo al modo completo")
+    if args.cache and args.modo in ("incremental", "planes", "resumenes"):
+        parser.error("--cache aplica a los modos completo, streaming, paralelo y hechos")
+    if args.usar_resumenes and args.modo in ("hechos", "incremental", "resumenes"):
+        parser.error("--usar-resumenes aplica a los modos completo, streaming, paralelo y planes")
+    if args.limpiar and args.modo in ("planes", "resumenes"):
+        parser.error("--limpiar aplica a los modos que exportan CSV")
+    if args.almacen and not args.limpiar:
+        parser.error("--almacen requiere --limpiar")
+    if args.sin_zip and not args.limpiar:
+        parser.error("--sin-zip requiere --limpiar")
+    ruta_zip = None if args.sin_zip else RUTA_ZIP_LIMPIOS
+
+    # Con --usar-resumenes los agregados se leen de las tablas que mantienen los triggers
+    consultas_modo = consultas_con_resumenes(consultas) if args.usar_resumenes else consultas
+
+    # Crear carpeta de salida
+    os.makedirs(output_folder, exist_ok=True)
+    metricas = instrumentacion_desde_entorno("extractor")
+
+    a_exportar, huellas = consultas_modo, {}
+    if args.cache:
+        a_exportar, huellas = filtrar_con_cache(consultas_modo, output_folder, args.motor, args.modo)
+
+    if args.modo == "paralelo":
+        fallidas = []
+        if a_exportar:
+            fallidas = exportar_paralelo(
+                a_exportar, output_folder, args.workers, args.tamano_lote, args.timeout_consulta, args.motor, metricas
+            )
+            guardar_huellas(huellas, [n for n in a_exportar if n in huellas and n not in fallidas], output_folder)
+        if args.formato_columnar:
+            convertir_columnar(consultas, output_folder, args.formato_columnar)
+        if args.limpiar and not fallidas:
+            limpiar_exportacion(output_folder, args.limpiar, ruta_zip, almacen=args.almacen)
+        sys.exit(1 if fallidas else 0)
+
+    if not a_exportar:
+        print("♻️ Ninguna consulta cambió: no se ejecuta nada")
+    else:
+        if args.fetch == "columnar" and not mysql.connector.HAVE_CEXT:
+            print("⚠️ La extensión C de mysql-connector no está disponible; se usa el conector puro en modo raw.")
+        conexion = conectar(args.motor, use_pure=False) if args.fetch == "columnar" else conectar(args.motor)
+        try:
+            if args.modo == "streaming":
+                exportar_streaming(conexion, a_exportar, output_folder, args.tamano_lote, metricas)
+            elif args.modo == "hechos":
+                exportar_hechos(conexion, a_exportar, output_folder, args.tamano_lote, args.comparar, metricas)
+            elif args.modo == "incremental":
+                exportar_incremental(conexion, consultas, output_folder, args.tamano_lote, args.reconstruir, metricas)
+            elif args.modo == "planes":
+                exportar_planes(conexion, args.motor, consultas_modo, output_folder, DB_CONFIG, args.aplicar_indices)
+            elif args.modo == "resumenes":
+                crear_resumenes(conexion, args.motor)
+            else:
+                exportar_completo(conexion, a_exportar, output_folder, args.fetch, metricas)
+        finally:
+            # Cerrar conexión
+            conexion.close()
+        guardar_huellas(huellas, [n for n in a_exportar if n in huellas], output_folder)
+
+    if args.formato_columnar:
+        convertir_columnar(consultas, output_folder, args.formato_columnar)
+    if args.limpiar:
+        limpiar_exportacion(output_folder, args.limpiar, ruta_zip, almacen=args.almacen)
+
+
+if __name__ == "__main__":
+    main()
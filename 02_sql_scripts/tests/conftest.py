@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Los módulos de 02_sql_scripts son scripts sueltos, no un paquete
+CARPETA_SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, CARPETA_SCRIPTS)
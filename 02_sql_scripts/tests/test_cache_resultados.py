@@ -0,0 +1,67 @@
+import os
+import sqlite3
+
+import pytest
+
+from cache_resultados import consultas_pendientes, guardar_huellas, huellas_actuales
+from motor_sqlite import ConexionSQLite
+
+CONSULTAS = {"gasto_por_cliente.csv": "SELECT customer_id, SUM(amount) FROM payment GROUP BY customer_id"}
+
+
+@pytest.fixture
+def base(tmp_path):
+    # payment como en el esquema traducido: last_update sin trigger que lo renueve
+    ruta = str(tmp_path / "base.sqlite")
+    conexion = sqlite3.connect(ruta)
+    conexion.execute(
+        "CREATE TABLE payment (payment_id INTEGER PRIMARY KEY, customer_id INTEGER, "
+        "amount DECIMAL NOT NULL, last_update DATETIME NOT NULL)"
+    )
+    conexion.executemany(
+        "INSERT INTO payment VALUES (?, ?, ?, '2006-02-15 22:12:30')",
+        [(i, i % 5, 2.99) for i in range(1, 101)],
+    )
+    conexion.commit()
+    conexion.close()
+    return ruta
+
+
+def _exportar_y_guardar(ruta_db, carpeta):
+    conexion = ConexionSQLite(ruta_db)
+    huellas = huellas_actuales(conexion, CONSULTAS, "sqlite://prueba")
+    conexion.close()
+    for nombre_archivo in CONSULTAS:
+        open(os.path.join(carpeta, nombre_archivo), "w").close()
+    guardar_huellas(huellas, list(CONSULTAS), carpeta)
+
+
+def _pendientes(ruta_db, carpeta):
+    conexion = ConexionSQLite(ruta_db)
+    huellas = huellas_actuales(conexion, CONSULTAS, "sqlite://prueba")
+    conexion.close()
+    return consultas_pendientes(huellas, CONSULTAS, carpeta)
+
+
+def test_sin_cambios_no_hay_pendientes(base, tmp_path):
+    _exportar_y_guardar(base, tmp_path)
+    assert _pendientes(base, tmp_path) == {}
+
+
+def test_update_sin_last_update_invalida(base, tmp_path):
+    _exportar_y_guardar(base, tmp_path)
+    conexion = sqlite3.connect(base)
+    conexion.execute("UPDATE payment SET amount = amount + 100 WHERE payment_id < 50")
+    conexion.commit()
+    conexion.close()
+    assert list(_pendientes(base, tmp_path)) == list(CONSULTAS)
+
+
+def test_delete_mas_insert_con_mismo_last_update_invalida(base, tmp_path):
+    _exportar_y_guardar(base, tmp_path)
+    conexion = sqlite3.connect(base)
+    conexion.execute("DELETE FROM payment WHERE payment_id = 7")
+    conexion.execute("INSERT INTO payment VALUES (101, 3, 9.99, '2006-02-15 22:12:30')")
+    conexion.commit()
+    conexion.close()
+    assert list(_pendientes(base, tmp_path)) == list(CONSULTAS)
@@ -0,0 +1,35 @@
+import sqlite3
+from decimal import Decimal
+
+import pytest
+
+from motor_sqlite import ConexionSQLite
+
+
+@pytest.fixture
+def cursor(tmp_path):
+    ruta = str(tmp_path / "base.sqlite")
+    conexion = sqlite3.connect(ruta)
+    conexion.execute("CREATE TABLE payment (payment_id INTEGER PRIMARY KEY, customer_id INTEGER, amount DECIMAL)")
+    conexion.executemany("INSERT INTO payment VALUES (?, ?, ?)", [(1, 1, 2.99), (2, 1, 0.99), (3, 2, 4.99)])
+    conexion.commit()
+    conexion.close()
+    conexion = ConexionSQLite(ruta)
+    yield conexion.cursor()
+    conexion.close()
+
+
+def test_solo_los_montos_se_devuelven_como_decimal(cursor):
+    cursor.execute(
+        "SELECT SUM(amount) AS total_gastado, SUM(p.amount), AVG(amount) AS promedio, "
+        "COUNT(*) * 1.0 / 3 AS proporcion FROM payment p WHERE customer_id = 1"
+    )
+    total, suma, promedio, proporcion = cursor.fetchone()
+    assert total == suma == Decimal("3.98")
+    assert promedio == pytest.approx(1.99) and isinstance(promedio, float)
+    assert proporcion == pytest.approx(2 / 3)
+
+
+def test_marcadores_fuera_de_literales(cursor):
+    cursor.execute("SELECT strftime('%s', '1970-01-02'), amount FROM payment WHERE payment_id = %s", (3,))
+    assert cursor.fetchall() == [("86400", Decimal("4.99"))]
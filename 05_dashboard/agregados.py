@@ -0,0 +1,316 @@
+import numpy as np
+import pandas as pd
+
+from cuantiles import SketchKLL
+
+# --- CAPA DE AGREGADOS DEL DASHBOARD ---
+# Todo lo que las pestañas calculan a partir de los DataFrames (KPIs, conteos, pivots,
+# umbrales por cuantil) se arma aquí una sola vez por versión de los datos. La app cachea
+# el resultado y en cada rerun solo construye las figuras a partir de tablas pequeñas.
+#
+# Cada función devuelve un dict; las entradas de los gráficos que dependen de una columna
+# solo se incluyen si esa columna existe en el dataset.
+
+DIAS_SEMANA = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Dispersión a gran escala: por encima de UMBRAL_DENSIDAD filas los puntos "generales" se
+# envían como un histograma 2D de BINS_DENSIDAD x BINS_DENSIDAD celdas y solo el segmento
+# destacado va como puntos (a lo sumo MAX_PUNTOS_DESTACADOS): el tamaño de la figura queda
+# acotado sin importar cuántas filas tenga el dataset.
+UMBRAL_DENSIDAD = 20_000
+BINS_DENSIDAD = 80
+MAX_PUNTOS_DESTACADOS = 5_000
+
+
+# --- DISPERSIÓN / DENSIDAD ---
+def densidad_2d(x, y, bins = BINS_DENSIDAD, mascara = None):
+    """
+    Conteos en una grilla bins x bins (centros de celda); las celdas vacías quedan en NaN
+    (transparentes). Con mascara solo cuentan esas filas: va como pesos, sin copiar x/y.
+    """
+    rango = None
+    if mascara is not None and mascara.any():
+        x, y = np.asarray(x), np.asarray(y)
+        # Mismo rango que tendría el histograma de las filas seleccionadas (initial: cualquier
+        # valor del array sirve de cota, y vale también para columnas enteras)
+        rango = [
+            [x.min(where = mascara, initial = x.max()), x.max(where = mascara, initial = x.min())],
+            [y.min(where = mascara, initial = y.max()), y.max(where = mascara, initial = y.min())],
+        ]
+    conteos, bordes_x, bordes_y = np.histogram2d(x, y, bins = bins, range = rango, weights = mascara)
+    return {
+        "x": (bordes_x[:-1] + bordes_x[1:]) / 2,
+        "y": (bordes_y[:-1] + bordes_y[1:]) / 2,
+        "z": np.where(conteos.T > 0, conteos.T, np.nan),
+    }
+
+
+# --- SEGMENTOS POR CUANTIL ---
+def umbral_cuantil(df, columna, q, cuantiles = None):
+    """Cuantil q de la columna desde su sketch KLL: el guardado (cuantiles.py) o uno armado por bloques."""
+    sketch = (cuantiles or {}).get(columna)
+    if sketch is None:
+        sketch = SketchKLL().agregar(df[columna].to_numpy())
+    return sketch.cuantil(q)
+
+
+def mascara_segmento(df, x, y, umbral_x, umbral_y):
+    """Filas con x <= umbral_x e y >= umbral_y: una sola máscara booleana sobre los arrays."""
+    mascara = df[x].to_numpy() <= umbral_x
+    mascara &= df[y].to_numpy() >= umbral_y
+    return mascara
+
+
+def segmentar_dispersion(df, es_interes, tipo_interes, tipo_general, x, y):
+    """
+    Entradas del gráfico de dispersión por segmento. Con pocas filas, todos los puntos con su
+    columna 'tipo' (primero los destacados); con muchas, los destacados como puntos (los de
+    mayor y si superan el tope) y el resto como densidad 2D.
+    """
+    if len(df) <= UMBRAL_DENSIDAD:
+        # Un solo take (destacados primero, orden estable) y la etiqueta desde la misma máscara
+        orden = np.argsort(~es_interes, kind = "stable")
+        puntos = df.take(orden)
+        puntos["tipo"] = np.where(es_interes[orden], tipo_interes, tipo_general)
+        return {"puntos": puntos, "densidad": None, "omitidos": 0}
+
+    destacados = df[es_interes]
+    omitidos = max(len(destacados) - MAX_PUNTOS_DESTACADOS, 0)
+    if omitidos:
+        destacados = destacados.nlargest(MAX_PUNTOS_DESTACADOS, y)
+    return {
+        "puntos": destacados.assign(tipo = tipo_interes),
+        "densidad": dict(densidad_2d(df[x], df[y], mascara = ~es_interes), tipo = tipo_general),
+        "omitidos": omitidos,
+    }
+
+
+def agregados_detalle(df_detalle):
+    dias_mas_alquilados = df_detalle['weekday'].value_counts()
+    agregados = {
+        "vista_previa": df_detalle.head(),
+        "total_alquileres": df_detalle.shape[0],
+        "categorias_unicas": df_detalle["categoria"].nunique(),
+        "dia_top": dias_mas_alquilados.idxmax(),
+        "cantidad_top": dias_mas_alquilados.max(),
+        "dia_bajo": dias_mas_alquilados.idxmin(),
+        "cantidad_baja": dias_mas_alquilados.min(),
+    }
+
+    if 'hour' in df_detalle.columns:
+        conteo_horas = df_detalle['hour'].value_counts().sort_index().reset_index()
+        conteo_horas.columns = ['Hora', 'Cantidad de Alquileres']
+        agregados["conteo_horas"] = conteo_horas
+
+    if 'genero_estimado' in df_detalle.columns:
+        conteo_genero = df_detalle['genero_estimado'].value_counts().reset_index()
+        conteo_genero.columns = ['Género', 'Cantidad']
+        agregados["conteo_genero"] = conteo_genero
+
+    if 'categoria' in df_detalle.columns:
+        agregados["conteo_cats"] = (
+            df_detalle.groupby(['categoria', 'genero_estimado'], observed = True).size().reset_index(name = 'Cantidad')
+        )
+
+    if 'weekday' in df_detalle.columns:
+        conteo_dias = dias_mas_alquilados.reindex(DIAS_SEMANA).reset_index()
+        conteo_dias.columns = ['Día', 'Cantidad']
+        agregados["conteo_dias"] = conteo_dias
+
+    return agregados
+
+
+def agregados_desde_conteos(vista_previa, conteo_dias, conteo_horas, conteo_cruzado, nombres_categoria, nombres_genero):
+    """
+    Mismas entradas que agregados_detalle, a partir de conteos ya agregados: por día de la
+    semana (7, lunes primero), por hora (24) y una matriz categoría x género. Lo usan el
+    motor de filtros y el cubo de conteos.
+    """
+    dias = pd.Series(conteo_dias, index = DIAS_SEMANA)
+    presentes = dias[dias > 0] if dias.any() else dias
+    horas = np.flatnonzero(conteo_horas)
+    generos = pd.Series(conteo_cruzado.sum(axis = 0), index = nombres_genero)
+    generos = generos[generos > 0].sort_values(ascending = False, kind = "stable")
+    filas_cat, columnas_gen = np.nonzero(conteo_cruzado)
+
+    return {
+        "vista_previa": vista_previa,
+        "total_alquileres": int(dias.sum()),
+        "categorias_unicas": int(np.count_nonzero(conteo_cruzado.sum(axis = 1))),
+        "dia_top": presentes.idxmax(),
+        "cantidad_top": int(presentes.max()),
+        "dia_bajo": presentes.idxmin(),
+        "cantidad_baja": int(presentes.min()),
+        "conteo_horas": pd.DataFrame({"Hora": horas, "Cantidad de Alquileres": np.asarray(conteo_horas)[horas]}),
+        "conteo_genero": pd.DataFrame({"Género": generos.index, "Cantidad": generos.to_numpy()}),
+        "conteo_cats": pd.DataFrame({
+            "categoria": [nombres_categoria[i] for i in filas_cat],
+            "genero_estimado": [nombres_genero[i] for i in columnas_gen],
+            "Cantidad": conteo_cruzado[filas_cat, columnas_gen],
+        }),
+        "conteo_dias": pd.DataFrame({"Día": DIAS_SEMANA, "Cantidad": conteo_dias}),
+    }
+
+
+def agregados_alquileres_mes(df_alquileres_mes):
+    fila_max_alquileres = df_alquileres_mes.loc[df_alquileres_mes['total_global_mes'].idxmax()]
+    agregados = {
+        "vista_previa": df_alquileres_mes.head(),
+        "meses_analizados": df_alquileres_mes["mes"].nunique(),
+        "n_alquileres": df_alquileres_mes["total_alquileres"].sum(),
+        "prom_alquileres_mensuales": df_alquileres_mes["total_global_mes"].mean(),
+        "mes_mayor_alquiler": fila_max_alquileres['nombre_mes'],
+        "cantidad_mayor_alquiler": fila_max_alquileres['total_global_mes'],
+    }
+
+    if 'mes' in df_alquileres_mes.columns and 'total_global_mes' in df_alquileres_mes.columns:
+        agregados["df_mes"] = df_alquileres_mes.drop_duplicates(subset = 'mes')
+
+    if 'categoria' in df_alquileres_mes.columns and 'total_alquileres' in df_alquileres_mes.columns:
+        # Top 4 categorías con más alquileres totales, pivoteadas para el gráfico de área
+        top4_cats = df_alquileres_mes.groupby('categoria')['total_alquileres'].sum().nlargest(4).index
+        df_top4 = df_alquileres_mes[df_alquileres_mes['categoria'].isin(top4_cats)]
+        agregados["top4_cats"] = list(top4_cats)
+        agregados["pivot_top4"] = (
+            df_top4.pivot(index = 'mes', columns = 'categoria', values = 'total_alquileres')
+                .fillna(0)
+                .reset_index()
+        )
+
+    if 'nombre_mes' in df_alquileres_mes.columns and 'total_alquileres' in df_alquileres_mes.columns:
+        orden_meses = df_alquileres_mes[['num_mes', 'nombre_mes']].drop_duplicates().sort_values('num_mes')['nombre_mes'].tolist()
+        agregados["df_estacionalidad"] = (
+            df_alquileres_mes.groupby('nombre_mes', observed = True)['total_alquileres']
+                .mean()
+                .reindex(orden_meses)
+                .reset_index(name = 'promedio_alquileres')
+        )
+
+    return agregados
+
+
+def agregados_clientes(df_clientes, cuantiles = None):
+    max_gastado = df_clientes.loc[df_clientes['total_gastado'].idxmax()]
+    mas_frecuente = df_clientes.loc[df_clientes["total_transacciones"].idxmax()]
+    agregados = {
+        "vista_previa": df_clientes.head(),
+        "total_clientes": df_clientes.shape[0],
+        "ingreso_total": df_clientes["total_gastado"].sum(),
+        "cliente_max": max_gastado["cliente"],
+        "cantidad_max": max_gastado["total_gastado"],
+        "cliente_mas_frecuente": mas_frecuente["cliente"],
+        "cliente_frecuencia": mas_frecuente["total_transacciones"],
+    }
+
+    if "total_gastado" in df_clientes.columns and "cliente" in df_clientes.columns:
+        agregados["top10"] = df_clientes.sort_values('total_gastado', ascending = False).head(10)
+
+    if 'cliente' in df_clientes.columns and 'total_transacciones' in df_clientes.columns:
+        agregados["top15"] = df_clientes.sort_values("total_transacciones", ascending = False).head(15)
+
+    if 'total_transacciones' in df_clientes.columns and 'total_gastado' in df_clientes.columns:
+        if len(df_clientes) <= UMBRAL_DENSIDAD:
+            agregados["dispersion"] = df_clientes[['cliente', 'total_transacciones', 'total_gastado']]
+        else:
+            agregados["dispersion"] = densidad_2d(df_clientes['total_transacciones'], df_clientes['total_gastado'])
+
+    # Clientes con pocas transacciones y gasto alto
+    umbral_transacciones_pocas = umbral_cuantil(df_clientes, 'total_transacciones', 0.50, cuantiles)
+    umbral_gasto_alto = umbral_cuantil(df_clientes, 'total_gastado', 0.75, cuantiles)
+    es_interes = mascara_segmento(
+        df_clientes, 'total_transacciones', 'total_gastado', umbral_transacciones_pocas, umbral_gasto_alto
+    )
+    agregados["clientes_interes"] = df_clientes.loc[es_interes, ['cliente', 'total_transacciones', 'total_gastado']]
+    agregados["segmentos"] = segmentar_dispersion(
+        df_clientes[['cliente', 'total_transacciones', 'total_gastado']], es_interes,
+        '🎯 Clientes de Interés', 'Clientes Generales', 'total_transacciones', 'total_gastado'
+    )
+    agregados["porcentaje"] = es_interes.sum() / len(df_clientes) * 100
+    return agregados
+
+
+def agregados_peliculas(df_peliculas, cuantiles = None):
+    max_ingresos = df_peliculas.loc[df_peliculas['total_ingresos'].idxmax()]
+    mas_alquileres = df_peliculas.loc[df_peliculas["total_alquileres"].idxmax()]
+    agregados = {
+        "vista_previa": df_peliculas.head(),
+        "total_peliculas": df_peliculas.shape[0],
+        "ingreso_medio": df_peliculas["total_ingresos"].mean(),
+        "peli_max": max_ingresos["pelicula"],
+        "peli_cantidad_max": max_ingresos["total_ingresos"],
+        "peli_mas_alquilada": mas_alquileres["pelicula"],
+        "peli_frecuencia": mas_alquileres["total_alquileres"],
+    }
+
+    if 'pelicula' in df_peliculas.columns and 'total_ingresos' in df_peliculas.columns:
+        agregados["top8_income"] = df_peliculas.sort_values('total_ingresos', ascending = False).head(8)
+
+    if 'pelicula' in df_peliculas.columns and 'total_alquileres' in df_peliculas.columns:
+        agregados["top8_rentals"] = df_peliculas.sort_values('total_alquileres', ascending = False).head(8)
+
+    if "total_alquileres" in df_peliculas.columns and "total_ingresos" in df_peliculas.columns:
+        # Películas estratégicas: pocos alquileres e ingresos altos
+        umbral_alquileres_pocos = umbral_cuantil(df_peliculas, 'total_alquileres', 0.35, cuantiles)
+        umbral_ingreso_alto = umbral_cuantil(df_peliculas, 'total_ingresos', 0.75, cuantiles)
+        es_interes = mascara_segmento(
+            df_peliculas, 'total_alquileres', 'total_ingresos', umbral_alquileres_pocos, umbral_ingreso_alto
+        )
+        agregados["peliculas_interes"] = df_peliculas.loc[es_interes, ['pelicula', 'total_alquileres', 'total_ingresos']]
+        agregados["segmentos_peliculas"] = segmentar_dispersion(
+            df_peliculas[['pelicula', 'total_alquileres', 'total_ingresos']], es_interes,
+            '🎯 Películas Estratégicas', 'Películas Generales', 'total_alquileres', 'total_ingresos'
+        )
+        agregados["porcentaje_peliculas"] = es_interes.sum() / len(df_peliculas) * 100
+
+    return agregados
+
+
+def agregados_ingresos(df_ingresos):
+    top_cat_global = df_ingresos.loc[df_ingresos["ingresos"].idxmax()]
+    agregados = {
+        "vista_previa": df_ingresos.head(),
+        "total_tiendas": df_ingresos["store_id"].nunique(),
+        "tiendas": sorted(df_ingresos["store_id"].unique().tolist()),
+        "categorias_unicas_ing": df_ingresos["categoria"].nunique(),
+        "cat_top": top_cat_global["categoria"],
+        "monto_top": top_cat_global["ingresos"],
+        "tienda_top": top_cat_global["store_id"],
+    }
+
+    # Las 5 categorías con mayores ingresos globales, para las barras por tienda
+    top5_cats = (
+        df_ingresos.groupby('categoria')['ingresos']
+                .sum().nlargest(5).index
+    )
+    agregados["df_top5"] = df_ingresos[df_ingresos['categoria'].isin(top5_cats)]
+
+    # % de ingresos por categoría y tienda, en formato largo para el heatmap
+    pivot_pct = (
+        df_ingresos.pivot(index = 'categoria', columns = 'store_id', values = 'pct_ingreso_tienda')
+                .fillna(0).round(1)
+    ).reset_index()
+    # Columnas numéricas a string para que Plotly las trate como categóricas
+    pivot_pct.columns = pivot_pct.columns.astype(str)
+    agregados["df_heatmap"] = pivot_pct.melt(id_vars = 'categoria', var_name = 'store_id', value_name = 'pct_ingreso')
+    return agregados
+
+
+# Vista del dashboard -> (dataset del que sale, función de agregados)
+AGREGADOS_POR_VISTA = {
+    "detalle": ("detalle_alquileres_limpio", agregados_detalle),
+    "alquileres_mes": ("alquileres_por_mes_categoria_limpio", agregados_alquileres_mes),
+    "clientes": ("clientes_mas_frecuentes_limpio", agregados_clientes),
+    "peliculas": ("peliculas_mas_rentables_limpio", agregados_peliculas),
+    "ingresos": ("ingresos_por_tienda_categoria_limpio", agregados_ingresos),
+}
+
+
+def calcular_agregados(df_detalle, df_alquileres_mes, df_clientes, df_peliculas, df_ingresos):
+    """KPIs y entradas de los gráficos de las cinco pestañas."""
+    return {
+        "detalle": agregados_detalle(df_detalle),
+        "alquileres_mes": agregados_alquileres_mes(df_alquileres_mes),
+        "clientes": agregados_clientes(df_clientes),
+        "peliculas": agregados_peliculas(df_peliculas),
+        "ingresos": agregados_ingresos(df_ingresos),
+    }
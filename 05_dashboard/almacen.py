@@ -0,0 +1,130 @@
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+# --- ALMACÉN COLUMNAR COMPARTIDO ---
+# Cada dataset se guarda una vez como una carpeta de columnas .npy de ancho fijo, que los
+# procesos del dashboard abren con np.load(mmap_mode="r"): los datos quedan en el page
+# cache del sistema operativo y todos los procesos del host comparten las mismas páginas.
+#   - números y fechas (datetime64[s]): un .npy por columna, con el tipo del dataset;
+#   - textos: codificados con diccionario, <columna>.codigos.npy (int8/int16/int32, el
+#     mismo ancho que usa pandas para los códigos, así la categórica no los copia) y el
+#     diccionario en esquema.json.
+# El DataFrame que devuelve leer_almacen apunta a esos arrays sin copiarlos (solo lectura;
+# con copy-on-write, cualquier modificación trabaja sobre una copia propia).
+# Cada escritura arma una versión nueva (almacen/<dataset>/v<ns>/) y la publica reemplazando
+# de forma atómica el puntero almacen/<dataset>/ACTUAL: un lector resuelve el puntero una
+# vez y lee esquema y columnas de la misma versión, sin ver nunca una carpeta a medias.
+#
+#   python carga_datos.py --formato almacen      # escribe almacen/<dataset>/ desde los CSV
+
+CARPETA_ALMACEN = "almacen"
+PUNTERO = "ACTUAL"
+# Versiones que se conservan: la publicada y la anterior, que un lector que resolvió el
+# puntero justo antes de la publicación todavía puede estar abriendo
+VERSIONES_CONSERVADAS = 2
+
+
+def ruta_almacen(nombre, carpeta = "."):
+    """Carpeta de la versión publicada del dataset en el almacén, o None si no se escribió."""
+    base = os.path.join(carpeta, CARPETA_ALMACEN, nombre)
+    try:
+        with open(os.path.join(base, PUNTERO), encoding = "utf-8") as f:
+            ruta = os.path.join(base, f.read().strip())
+    except FileNotFoundError:
+        return None
+    return ruta if os.path.exists(os.path.join(ruta, "esquema.json")) else None
+
+
+def _tipo_codigos(n_categorias):
+    # Mismo criterio que pandas (coerce_indexer_dtype) para el ancho de los códigos
+    for tipo in (np.int8, np.int16, np.int32):
+        if n_categorias < np.iinfo(tipo).max:
+            return tipo
+    return np.int64
+
+
+# --- ESCRITURA ---
+def escribir_almacen(df, nombre, carpeta = "."):
+    """
+    Escribe el DataFrame como columnas .npy + esquema.json en una versión nueva y la publica
+    reemplazando el puntero (un solo os.replace). Un proceso que ya tenía abierta la versión
+    anterior la sigue leyendo sin problema (sus archivos siguen vivos mientras estén mapeados).
+    """
+    base = os.path.join(carpeta, CARPETA_ALMACEN, nombre)
+    version = f"v{time.time_ns()}"
+    ruta = os.path.join(base, version)
+    os.makedirs(ruta)
+
+    columnas = []
+    for columna in df.columns:
+        serie = df[columna]
+        if isinstance(serie.dtype, pd.CategoricalDtype) or not (
+            pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_datetime64_any_dtype(serie)
+        ):
+            categorica = pd.Categorical(serie)
+            codigos = categorica.codes.astype(_tipo_codigos(len(categorica.categories)))
+            np.save(os.path.join(ruta, columna + ".codigos.npy"), codigos)
+            columnas.append({
+                "nombre": columna, "codificacion": "diccionario",
+                "diccionario": [str(c) for c in categorica.categories],
+            })
+        else:
+            valores = serie.to_numpy()
+            if valores.dtype.kind == "M":
+                valores = valores.astype("datetime64[s]")
+            np.save(os.path.join(ruta, columna + ".npy"), valores)
+            columnas.append({"nombre": columna, "codificacion": "fijo", "tipo": str(valores.dtype)})
+
+    with open(os.path.join(ruta, "esquema.json"), "w", encoding = "utf-8") as f:
+        json.dump({"filas": len(df), "columnas": columnas}, f, ensure_ascii = False, indent = 2)
+
+    puntero = os.path.join(base, PUNTERO)
+    with open(puntero + ".parcial", "w", encoding = "utf-8") as f:
+        f.write(version)
+    os.replace(puntero + ".parcial", puntero)
+
+    # Versiones viejas (los nombres v<ns> ordenan por fecha); las que no llegaron a publicarse también
+    versiones = sorted(e.name for e in os.scandir(base) if e.is_dir() and e.name.startswith("v"))
+    for vieja in versiones[:versiones.index(version) + 1][:-VERSIONES_CONSERVADAS]:
+        shutil.rmtree(os.path.join(base, vieja), ignore_errors = True)
+    return ruta
+
+
+# --- LECTURA ---
+def leer_esquema(ruta):
+    with open(os.path.join(ruta, "esquema.json"), encoding = "utf-8") as f:
+        return json.load(f)
+
+
+def _leer_version(ruta, columnas):
+    datos = {}
+    for columna in leer_esquema(ruta)["columnas"]:
+        if columnas is not None and columna["nombre"] not in columnas:
+            continue
+        if columna["codificacion"] == "diccionario":
+            codigos = np.load(os.path.join(ruta, columna["nombre"] + ".codigos.npy"), mmap_mode = "r")
+            valores = pd.Categorical.from_codes(codigos, pd.Index(columna["diccionario"], dtype = "str"))
+            datos[columna["nombre"]] = pd.Series(valores, copy = False)
+        else:
+            datos[columna["nombre"]] = np.load(os.path.join(ruta, columna["nombre"] + ".npy"), mmap_mode = "r")
+    return pd.DataFrame(datos, copy = False)
+
+
+def leer_almacen(nombre, carpeta = ".", columnas = None, intentos = 3):
+    """DataFrame sobre los .npy mapeados en memoria (columns=None: todas)."""
+    for intento in range(intentos):
+        # El puntero se resuelve una sola vez por intento: esquema y columnas salen de la misma versión
+        ruta = ruta_almacen(nombre, carpeta)
+        if ruta is None:
+            raise FileNotFoundError(f"No hay almacén para {nombre} en {os.path.join(carpeta, CARPETA_ALMACEN)}")
+        try:
+            return _leer_version(ruta, columnas)
+        except FileNotFoundError:
+            # Se publicaron dos versiones mientras se leía y esta se borró: se vuelve a resolver
+            if intento == intentos - 1:
+                raise
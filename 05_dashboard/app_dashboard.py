@@ -1,8 +1,21 @@
+import os
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import matplotlib.pyplot as plt
 import numpy as np
+import plotly.io as pio
+
+from agregados import AGREGADOS_POR_VISTA, agregados_ingresos
+from almacen import ruta_almacen
+from cache_disco import cache_desde_entorno
+from carga_datos import leer_dataset, memoria_datasets, version_datos
+from cubo import AGREGADOS_DEL_CUBO, leer_cubo, version_cubo
+from cuantiles import leer_cuantiles
+from filtros import MotorFiltros
+from graficos import figura_dispersion_continua, figura_segmentos
+from instrumentacion import Cronometro, instrumentacion_desde_entorno
 
 # --- CONFIGURACIÓN DE LA PÁGINA ---
 st.set_page_config(
@@ -43,47 +56,207 @@ st.markdown("""
 """, unsafe_allow_html = True)
 
 # --- CARGA DE LOS CSV ---
+# Si existe la versión Parquet/Arrow de un dataset (python carga_datos.py) se usa esa:
+# tipos ya resueltos, categorías con diccionario y fechas nativas.
+# Con SAKILA_CARGA_COMPACTA=1 se cargan con tipos compactos y sin las columnas derivables
+# del detalle: cada proceso de Streamlit mantiene estos DataFrames en memoria.
+CARGA_COMPACTA = os.environ.get("SAKILA_CARGA_COMPACTA", "0") == "1"
+# Sin los CSV sueltos se leen desde csv_limpios.zip (o el zip de SAKILA_ARCHIVO_DATOS) o desde
+# <dataset>.csv.zst, de a bloques parseados en paralelo sin descomprimir el archivo entero en
+# memoria; SAKILA_BLOQUE_MB cambia el tamaño de bloque (por defecto carga_datos.BYTES_POR_BLOQUE).
+BYTES_POR_BLOQUE = int(float(os.environ.get("SAKILA_BLOQUE_MB", "0")) * 2**20) or None
+
+@st.cache_data
+def cargar_csv(nombre, version, compacto = False):
+    return leer_dataset(nombre, compacto = compacto, bytes_por_bloque = BYTES_POR_BLOQUE)
+
+# Con el almacén compartido (python carga_datos.py --formato almacen) el DataFrame solo
+# envuelve arrays mapeados en memoria: se guarda con cache_resource, que entrega el mismo
+# objeto a todas las sesiones en vez de una copia, y los procesos del host comparten las páginas.
+@st.cache_resource
+def cargar_almacen(nombre, version, compacto = False):
+    return leer_dataset(nombre, compacto = compacto)
+
+def cargar_dataset(nombre, version, compacto = False):
+    if ruta_almacen(nombre) is not None:
+        return cargar_almacen(nombre, version, compacto)
+    return cargar_csv(nombre, version, compacto)
+
+# --- CACHE DE RESULTADOS EN DISCO ---
+# Compartido por todas las sesiones y procesos del host, con tope en bytes (LRU) y TTL:
+# un agregado filtrado que ya calculó otra sesión u otro proceso no se vuelve a calcular.
+@st.cache_resource
+def cargar_cache_resultados():
+    return cache_desde_entorno()
+
+def resultado_cacheado(version, vista, parametros, calcular):
+    cache = cargar_cache_resultados()
+    if cache is None:
+        return calcular()
+    return cache.calcular(version, vista, parametros, calcular)
+
+# --- AGREGADOS (KPIs y entradas de los gráficos) ---
+# Se calculan una vez por vista y por versión de los datos (tamaño y fecha de cada archivo):
+# los reruns por interacción solo leen este resultado cacheado, y una vista que nunca se
+# abre no carga su dataset.
+# Si existe el cubo de conteos (python cubo.py) y está al día con el detalle, las pestañas
+# 1 y 2 salen de sumas sobre sus ejes, sin cargar las filas.
+@st.cache_resource
+def cargar_cubo(version, version_del_cubo):
+    return leer_cubo() if version_del_cubo else None
+
 @st.cache_data
-def cargar_csv():
-    df_detalle = pd.read_csv("detalle_alquileres_limpio.csv")
-    df_alquileres_mes = pd.read_csv("alquileres_por_mes_categoria_limpio.csv")
-    df_clientes = pd.read_csv("clientes_mas_frecuentes_limpio.csv")
-    df_peliculas = pd.read_csv("peliculas_mas_rentables_limpio.csv")
-    df_ingresos = pd.read_csv("ingresos_por_tienda_categoria_limpio.csv")
-    return df_detalle, df_alquileres_mes, df_clientes, df_peliculas, df_ingresos
+def cargar_agregados(vista, version, compacto = False, version_del_cubo = None):
+    cubo = cargar_cubo(version, version_del_cubo)
+    if cubo is not None and vista in AGREGADOS_DEL_CUBO:
+        return AGREGADOS_DEL_CUBO[vista](cubo)
+    nombre, calcular = AGREGADOS_POR_VISTA[vista]
+    # Clientes y películas: umbrales de los segmentos desde los sketches guardados por el pipeline
+    cuantiles = leer_cuantiles(nombre)
+    opciones = {} if cuantiles is None else {"cuantiles": cuantiles}
+    return resultado_cacheado(
+        version, vista, {"compacto": compacto},
+        lambda: calcular(cargar_dataset(nombre, version, compacto), **opciones)
+    )
 
-df_detalle, df_alquileres_mes, df_clientes, df_peliculas, df_ingresos = cargar_csv()
+# Índices de filtrado del detalle: se arman una vez por versión y se comparten entre sesiones
+@st.cache_resource
+def cargar_motor_filtros(version, compacto = False):
+    return MotorFiltros(cargar_dataset("detalle_alquileres_limpio", version, compacto))
+
+VERSION_DATOS = version_datos()
+VERSION_CUBO = version_cubo()
+CUBO = cargar_cubo(VERSION_DATOS, VERSION_CUBO)
+
+# --- MEMORIA POR DATASET ---
+# Bajo demanda: medirla obliga a cargar los cinco datasets
+if st.sidebar.toggle("💾 Memoria de los datos", value = False):
+    memoria = memoria_datasets({
+        nombre: cargar_dataset(nombre, VERSION_DATOS, CARGA_COMPACTA) for nombre, _ in AGREGADOS_POR_VISTA.values()
+    })
+    st.sidebar.caption("Carga compacta" if CARGA_COMPACTA else "Carga normal (SAKILA_CARGA_COMPACTA=1 para la compacta)")
+    if all(ruta_almacen(nombre) is not None for nombre in memoria):
+        st.sidebar.caption("Almacén compartido: los datos están mapeados en memoria y no se duplican por proceso")
+    for nombre, tamano in memoria.items():
+        st.sidebar.caption(f"{nombre}: {tamano / 2**20:.2f} MB")
+    st.sidebar.caption(f"**Total: {sum(memoria.values()) / 2**20:.2f} MB**")
+
+# --- ESTADÍSTICAS DEL CACHE EN DISCO ---
+if cargar_cache_resultados() is not None and st.sidebar.toggle("🗄️ Cache de resultados", value = False):
+    stats = cargar_cache_resultados().estadisticas()
+    st.sidebar.caption(f"Entradas: {stats['entradas']} ({stats['bytes'] / 2**20:.2f} de {stats['max_bytes'] / 2**20:.0f} MB)")
+    st.sidebar.caption(f"Hits: {stats['hits']} · Misses: {stats['misses']} · Tasa de hits: {stats['tasa_hits']:.0%}")
+    st.sidebar.caption(f"Desalojos: {stats['desalojos']} · Expiradas: {stats['expiradas']} (TTL {stats['ttl']:.0f} s)")
+
+# --- INSTRUMENTACIÓN POR SECCIÓN ---
+# En cada rerun, la vista que se ejecuta registra un evento "seccion" (SAKILA_METRICAS, ver
+# instrumentacion.py): segundos de preparación de datos (hasta la tabla de vista previa),
+# de armado de figuras (desde la marca anterior hasta cada gráfico) y de envío (serialización
+# y st.plotly_chart), más la cantidad de figuras y los bytes de su JSON.
+@st.cache_resource
+def cargar_instrumentacion():
+    return instrumentacion_desde_entorno("dashboard", por_proceso = True)
+
+INSTRUMENTACION = cargar_instrumentacion()
+MEDICION = None  # medición de la vista en curso (una por rerun)
+
+def marcar(fase):
+    if MEDICION is not None:
+        MEDICION["cronometro"].marcar(fase)
+
+def mostrar_grafico(fig):
+    if MEDICION is None:
+        st.plotly_chart(fig, use_container_width = True)
+        return
+    marcar("figuras")
+    # Mismo JSON que arma Streamlit para el navegador: su tamaño es el payload de la figura
+    MEDICION["bytes_figuras"] += len(pio.to_json(fig, validate = False))
+    MEDICION["figuras"] += 1
+    st.plotly_chart(fig, use_container_width = True)
+    marcar("envio")
+
+def ejecutar_vista(nombre, vista):
+    global MEDICION
+    if INSTRUMENTACION is None:
+        vista()
+        return
+    MEDICION = {"cronometro": Cronometro(), "figuras": 0, "bytes_figuras": 0}
+    vista()
+    marcar("otros")
+    fases = MEDICION["cronometro"].fases
+    INSTRUMENTACION.registrar("seccion", {"seccion": nombre}, {
+        "datos_segundos": fases.get("datos", 0.0),
+        "figuras_segundos": fases.get("figuras", 0.0),
+        "envio_segundos": fases.get("envio", 0.0),
+        "otros_segundos": fases.get("otros", 0.0),
+        "figuras": MEDICION["figuras"],
+        "figuras_bytes": MEDICION["bytes_figuras"],
+    })
+    MEDICION = None
 
 # --- TÍTULO ---
 st.title("🎬 Dashboard - Análisis de la Base Sakila")
 st.markdown("Explora los reportes organizados por pestañas. Selecciona el análisis que deseas visualizar.")
 
-# --- PESTAÑAS ---
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "Detalle Alquileres",
-    "Alquileres por Mes y Categoría",
-    "Clientes Más Frecuentes",
-    "Películas Más Rentables",
-    "Ingresos por Tienda y Categoría"
-])
+# --- VISTAS ---
+# Cada pestaña es una función: con el selector de vista solo se ejecuta (y se envía al
+# navegador) la vista activa; SAKILA_TODAS_LAS_PESTANAS=1 vuelve a st.tabs, que ejecuta las cinco.
+TODAS_LAS_PESTANAS = os.environ.get("SAKILA_TODAS_LAS_PESTANAS", "0") == "1"
 
 # --- TAB 1: DETALLE ALQUILERES ---
-with tab1:
+def vista_detalle():
     st.markdown("<div class='section-title'>🎛️ Análisis de Detalle de Alquileres</div>", unsafe_allow_html = True)
-    st.dataframe(df_detalle.head())
+
+    # --- FILTROS ---
+    # Sin filtros se usan los agregados cacheados; con filtros, el motor de índices los
+    # recalcula (búsqueda binaria por fecha + índices por categoría/género) en milisegundos.
+    # Con el cubo, las opciones salen de sus etiquetas y el motor solo se arma al filtrar.
+    if CUBO is not None:
+        fecha_min = pd.Timestamp(CUBO.etiquetas["fecha_min"]).date()
+        fecha_max = pd.Timestamp(CUBO.etiquetas["fecha_max"]).date()
+        opciones_categoria, opciones_genero = CUBO.categorias, CUBO.generos
+    else:
+        motor = cargar_motor_filtros(VERSION_DATOS, CARGA_COMPACTA)
+        fecha_min, fecha_max = motor.rango_fechas
+        opciones_categoria, opciones_genero = motor.nombres_categoria, motor.nombres_genero
+    with st.expander("🔎 Filtros", expanded = False):
+        rango = st.date_input(
+            "Rango de fechas", value = (fecha_min, fecha_max),
+            min_value = fecha_min, max_value = fecha_max, key = "filtro_fechas"
+        )
+        categorias = st.multiselect("Categorías", opciones_categoria, key = "filtro_categorias")
+        generos = st.multiselect("Género estimado", opciones_genero, key = "filtro_generos")
+    # Mientras se elige el rango, date_input devuelve solo la fecha inicial
+    desde, hasta = (rango[0], rango[1]) if len(rango) == 2 else (rango[0], fecha_max)
+
+    if (desde, hasta) != (fecha_min, fecha_max) or categorias or generos:
+        def filtrar():
+            motor = cargar_motor_filtros(VERSION_DATOS, CARGA_COMPACTA)
+            return motor.agregados(motor.seleccionar(desde, hasta, categorias or None, generos or None))
+
+        # Con un hit del cache en disco ni siquiera se arma el motor
+        det = resultado_cacheado(VERSION_DATOS, "detalle", {
+            "compacto": CARGA_COMPACTA, "desde": desde, "hasta": hasta,
+            "categorias": categorias, "generos": generos,
+        }, filtrar)
+        total = cargar_agregados("detalle", VERSION_DATOS, CARGA_COMPACTA, VERSION_CUBO)["total_alquileres"]
+        st.caption(f"Filtrado: {det['total_alquileres']} de {total} alquileres")
+    else:
+        det = cargar_agregados("detalle", VERSION_DATOS, CARGA_COMPACTA, VERSION_CUBO)
+    st.dataframe(det["vista_previa"])
+    marcar("datos")
     
     # --- KPIs GENERALES ---
     st.markdown("<hr>", unsafe_allow_html = True)
     st.markdown("<div class='section-title'>📈 KPIs Generales</div>", unsafe_allow_html = True)
 
-    total_alquileres = df_detalle.shape[0]
-    categorias_unicas = df_detalle["categoria"].nunique()
+    total_alquileres = det["total_alquileres"]
+    categorias_unicas = det["categorias_unicas"]
 
-    dias_mas_alquilados = df_detalle['weekday'].value_counts()
-    dia_top = dias_mas_alquilados.idxmax()
-    cantidad_top = dias_mas_alquilados.max()
-    dia_bajo = dias_mas_alquilados.idxmin()
-    cantidad_baja = dias_mas_alquilados.min()
+    dia_top = det["dia_top"]
+    cantidad_top = det["cantidad_top"]
+    dia_bajo = det["dia_bajo"]
+    cantidad_baja = det["cantidad_baja"]
 
     # KPIs como tarjetas
     kpi1, kpi2, kpi3, kpi4 = st.columns(4)
@@ -97,9 +270,8 @@ with tab1:
     st.markdown("<div class='section-title'>📊✨ Visualizaciones</div>", unsafe_allow_html = True)
 
     # --- Gráfico de Horas ---
-    if 'hour' in df_detalle.columns:
-        conteo_horas = df_detalle['hour'].value_counts().sort_index().reset_index()
-        conteo_horas.columns = ['Hora', 'Cantidad de Alquileres']
+    if "conteo_horas" in det:
+        conteo_horas = det["conteo_horas"]
 
         fig = px.bar(
             conteo_horas, x = 'Hora', y = 'Cantidad de Alquileres',
@@ -112,9 +284,8 @@ with tab1:
         fig.update_layout(xaxis = dict(tickmode = 'linear'))
 
     # --- Gráfico de Género ---
-    if 'genero_estimado' in df_detalle.columns:
-        conteo_genero = df_detalle['genero_estimado'].value_counts().reset_index()
-        conteo_genero.columns = ['Género', 'Cantidad']
+    if "conteo_genero" in det:
+        conteo_genero = det["conteo_genero"]
 
         fig_genero = px.bar(
             conteo_genero, x = 'Género', y = 'Cantidad',
@@ -127,15 +298,15 @@ with tab1:
 
     col1, col2 = st.columns(2)
     with col1:
-        st.plotly_chart(fig, use_container_width = True)
+        mostrar_grafico(fig)
         st.caption("🔍 **Insight:** Las horas pico de alquileres se concentran entre 14:00 y 21:00 horas.")
     with col2:
-        st.plotly_chart(fig_genero, use_container_width = True)
+        mostrar_grafico(fig_genero)
         st.caption("🔍 **Insight:** Predomina el género masculino en las estimaciones.")
 
     # --- Gráfico de Categorías ---
-    if 'categoria' in df_detalle.columns:
-        conteo_cats = df_detalle.groupby(['categoria', 'genero_estimado']).size().reset_index(name = 'Cantidad')
+    if "conteo_cats" in det:
+        conteo_cats = det["conteo_cats"]
 
         fig_top_cats = px.bar(
             conteo_cats, x = 'categoria', y = 'Cantidad',
@@ -152,11 +323,8 @@ with tab1:
         )
 
     # --- Gráfico de Días ---
-    if 'weekday' in df_detalle.columns:
-        conteo_dias = df_detalle['weekday'].value_counts().reindex(
-            ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        ).reset_index()
-        conteo_dias.columns = ['Día', 'Cantidad']
+    if "conteo_dias" in det:
+        conteo_dias = det["conteo_dias"]
 
         fig_dias = px.bar(
             conteo_dias, x = 'Cantidad', y = 'Día',
@@ -169,10 +337,10 @@ with tab1:
 
     col3, col4 = st.columns(2)
     with col3:
-        st.plotly_chart(fig_top_cats, use_container_width = True)
+        mostrar_grafico(fig_top_cats)
         st.caption("🔍 **Insight:** Acción, Animación y Sports dominan el top de categorías.")
     with col4:
-        st.plotly_chart(fig_dias, use_container_width = True)
+        mostrar_grafico(fig_dias)
         st.caption("🔍 **Insight:** Los fines de semana muestran mayor actividad, pero se observa un pico de alquileres el día Martes.")
 
 
@@ -182,22 +350,23 @@ with tab1:
    
 
 # --- TAB 2: ALQUILERES POR MES Y CATEGORÍA ---
-with tab2:
+def vista_alquileres_mes():
     st.markdown("<div class='section-title'>📆 Alquileres por Mes y Categoría</div>", unsafe_allow_html = True)
-    st.dataframe(df_alquileres_mes.head())
+    alq = cargar_agregados("alquileres_mes", VERSION_DATOS, CARGA_COMPACTA, VERSION_CUBO)
+    st.dataframe(alq["vista_previa"])
+    marcar("datos")
     
     
     # --- KPIs GENERALES ---
     st.markdown("<hr>", unsafe_allow_html = True)
     st.markdown("<div class='section-title'>📈 KPIs Generales</div>", unsafe_allow_html = True)
     
-    meses_analizados = df_alquileres_mes["mes"].nunique()
-    n_alquileres = df_alquileres_mes["total_alquileres"].sum()
-    prom_alquileres_mensuales = df_alquileres_mes["total_global_mes"].mean()
+    meses_analizados = alq["meses_analizados"]
+    n_alquileres = alq["n_alquileres"]
+    prom_alquileres_mensuales = alq["prom_alquileres_mensuales"]
     
-    fila_max_alquileres = df_alquileres_mes.loc[df_alquileres_mes['total_global_mes'].idxmax()]
-    mes_mayor_alquiler = fila_max_alquileres['nombre_mes']
-    cantidad_mayor_alquiler = fila_max_alquileres['total_global_mes']
+    mes_mayor_alquiler = alq["mes_mayor_alquiler"]
+    cantidad_mayor_alquiler = alq["cantidad_mayor_alquiler"]
 
     
     # KPIs como tarjetas
@@ -213,8 +382,8 @@ with tab2:
 
     
     # --- Gráfico: Tendencia global de alquileres por mes ---
-    if 'mes' in df_alquileres_mes.columns and 'total_global_mes' in df_alquileres_mes.columns:
-        df_mes = df_alquileres_mes.drop_duplicates(subset = 'mes')
+    if "df_mes" in alq:
+        df_mes = alq["df_mes"]
 
         fig_tendencia_mes = px.line(
             df_mes,
@@ -237,18 +406,11 @@ with tab2:
 
 
     # --- Gráfico: Participación de las categorías Top 4 ---
-    if 'categoria' in df_alquileres_mes.columns and 'total_alquileres' in df_alquileres_mes.columns:
-
-        # Top 4 categorías con más alquileres totales
-        top4_cats = df_alquileres_mes.groupby('categoria')['total_alquileres'].sum().nlargest(4).index
-        df_top4 = df_alquileres_mes[df_alquileres_mes['categoria'].isin(top4_cats)].copy()
+    if "pivot_top4" in alq:
 
-        # Pivotear los datos para gráfico de área
-        pivot_top4 = (
-            df_top4.pivot(index = 'mes', columns = 'categoria', values = 'total_alquileres')
-                .fillna(0)
-                .reset_index()
-        )
+        # Top 4 categorías con más alquileres totales, ya pivoteadas por mes
+        top4_cats = alq["top4_cats"]
+        pivot_top4 = alq["pivot_top4"]
 
         # Crear gráfico de área apilada interactivo
         fig_top4_area = px.area(
@@ -271,26 +433,18 @@ with tab2:
         
     col1, col2 = st.columns(2)
     with col1:
-        st.plotly_chart(fig_tendencia_mes, use_container_width = True)
+        mostrar_grafico(fig_tendencia_mes)
         st.caption("🔍 **Insight:** Esta visualización muestra la evolución mensual de los alquileres.")
     with col2:
-        st.plotly_chart(fig_top4_area, use_container_width = True)
+        mostrar_grafico(fig_top4_area)
         st.caption("🔍 **Insight:** Este gráfico muestra cómo evoluciona la participación de las 4 categorías más populares a lo largo del tiempo.")
         
 
     # --- Gráfico: Estacionalidad de alquileres ---
-    if 'nombre_mes' in df_alquileres_mes.columns and 'total_alquileres' in df_alquileres_mes.columns:
-
-        # Orden correcto de los meses 
-        orden_meses = df_alquileres_mes[['num_mes', 'nombre_mes']].drop_duplicates().sort_values('num_mes')['nombre_mes'].tolist()
+    if "df_estacionalidad" in alq:
 
-        # Agrupación por nombre del mes y cálculo del promedio
-        df_estacionalidad = (
-            df_alquileres_mes.groupby('nombre_mes', observed = True)['total_alquileres']
-                .mean()
-                .reindex(orden_meses)  # Asegura el orden correcto
-                .reset_index(name = 'promedio_alquileres')
-        )
+        # Promedio por nombre del mes, en orden de calendario
+        df_estacionalidad = alq["df_estacionalidad"]
 
         # Crear gráfico de barras con Plotly
         fig_estacionalidad = px.bar(
@@ -317,30 +471,30 @@ with tab2:
         )
 
         # Mostrar en Streamlit
-        st.plotly_chart(fig_estacionalidad, use_container_width = True)
+        mostrar_grafico(fig_estacionalidad)
         st.caption("🔍 **Insight:** Este gráfico revela patrones estacionales al mostrar el promedio de alquileres por cada mes del calendario.")
 
 
 
 # --- TAB 3: CLIENTES MÁS FRECUENTES ---
-with tab3:
+def vista_clientes():
     st.markdown("<div class='section-title'> 👥 Análisis de Clientes mas Frecuentes</div>", unsafe_allow_html = True)
-    st.dataframe(df_clientes.head())
+    cli = cargar_agregados("clientes", VERSION_DATOS, CARGA_COMPACTA)
+    st.dataframe(cli["vista_previa"])
+    marcar("datos")
     
     # --- KPIs GENERALES ---
     st.markdown("<hr>", unsafe_allow_html = True)
     st.markdown("<div class='section-title'>📈 KPIs Generales</div>", unsafe_allow_html = True)
 
-    total_clientes = df_clientes.shape[0]
-    ingreso_total = df_clientes["total_gastado"].sum()
+    total_clientes = cli["total_clientes"]
+    ingreso_total = cli["ingreso_total"]
 
-    max_gastado = df_clientes.loc[df_clientes['total_gastado'].idxmax()]
-    cliente_max = max_gastado["cliente"]
-    cantidad_max = max_gastado["total_gastado"]
+    cliente_max = cli["cliente_max"]
+    cantidad_max = cli["cantidad_max"]
     
-    mas_frecuente = df_clientes.loc[df_clientes["total_transacciones"].idxmax()]
-    cliente_mas_frecuente = mas_frecuente["cliente"]
-    cliente_frecuencia = mas_frecuente["total_transacciones"]
+    cliente_mas_frecuente = cli["cliente_mas_frecuente"]
+    cliente_frecuencia = cli["cliente_frecuencia"]
 
     # KPIs como tarjetas
     kpi1, kpi2, kpi3, kpi4 = st.columns(4)
@@ -353,10 +507,10 @@ with tab3:
     st.markdown("<hr>", unsafe_allow_html = True)
     st.markdown("<div class='section-title'>📊✨ Visualizaciones</div>", unsafe_allow_html = True)
     
-    if "total_gastado" in df_clientes.columns and "cliente" in df_clientes.columns:
+    if "top10" in cli:
         
         # Top 10 clientes que gastaron mas
-        top10 = df_clientes.sort_values('total_gastado', ascending = False).head(10)
+        top10 = cli["top10"]
 
         fig_top10_gasto = px.bar(
             top10,
@@ -386,8 +540,8 @@ with tab3:
       
       
     # --- Gráfico: Top 15 Clientes por Transacciones ---
-    if 'cliente' in df_clientes.columns and 'total_transacciones' in df_clientes.columns:
-        top15 = df_clientes.sort_values("total_transacciones", ascending = False).head(15)
+    if "top15" in cli:
+        top15 = cli["top15"]
 
         fig_top15 = px.bar(
             top15,
@@ -417,26 +571,24 @@ with tab3:
   
     col1, col2 = st.columns(2)
     with col1:
-        st.plotly_chart(fig_top10_gasto, use_container_width = True)
+        mostrar_grafico(fig_top10_gasto)
         st.caption("🔍 **Insight:** Estos son los 10 clientes que han generado más ingresos en total.")
     with col2:
-        st.plotly_chart(fig_top15, use_container_width = True)
+        mostrar_grafico(fig_top15)
         st.caption("🔍 **Insight:** Los clientes con más transacciones pueden representar mayor fidelización o rentabilidad.")
         
 
 
     # --- Gráfico: Relación entre Frecuencia y Gasto (Bubble Chart) ---
-    if 'total_transacciones' in df_clientes.columns and 'total_gastado' in df_clientes.columns:
+    if "dispersion" in cli:
 
-        fig_scatter = px.scatter(
-            df_clientes,
+        # Con muchos clientes, agregados.py ya lo resumió en una densidad 2D
+        fig_scatter = figura_dispersion_continua(
+            cli["dispersion"],
             x = 'total_transacciones',
             y = 'total_gastado',
-            color = 'total_gastado',
             hover_name = 'cliente',
-            size_max = 60,
-            template = 'plotly_dark',
-            title = "💸 Relación entre Cantidad de Transacciones y Total Gastado"
+            titulo = "💸 Relación entre Cantidad de Transacciones y Total Gastado"
         )
 
         fig_scatter.update_layout(
@@ -445,41 +597,27 @@ with tab3:
             margin = dict(l = 40, r = 40, t = 60, b = 40)
         )
 
-        st.plotly_chart(fig_scatter, use_container_width = True)
+        mostrar_grafico(fig_scatter)
         st.caption("🔍 **Insight:** Este gráfico permite observar la correlación entre frecuencia de alquileres y el gasto total. Cada burbuja representa un cliente.")
 
 
 
     # --- Filtrar Clientes de Interés ---
-    umbral_transacciones_pocas = df_clientes['total_transacciones'].quantile(0.50)
-    umbral_gasto_alto = df_clientes['total_gastado'].quantile(0.75)
-
-    clientes_interes = df_clientes[
-        (df_clientes['total_transacciones'] <= umbral_transacciones_pocas) &
-        (df_clientes['total_gastado'] >= umbral_gasto_alto)
-    ].copy()
-    clientes_interes['tipo'] = '🎯 Clientes de Interés'
+    # Pocas transacciones (<= mediana) y gasto alto (>= p75), ya separados por tipo
+    clientes_interes = cli["clientes_interes"]
+    segmentos = cli["segmentos"]
 
-    otros_clientes = df_clientes[~df_clientes.index.isin(clientes_interes.index)].copy()
-    otros_clientes['tipo'] = 'Clientes Generales'
-
-    # Combinar en un solo DataFrame
-    df_plot = pd.concat([clientes_interes, otros_clientes])
-
-    # --- Gráfico con Plotly ---
-    fig_clientes_interes = px.scatter(
-        df_plot,
+    # --- Gráfico con Plotly (SVG, WebGL o densidad + puntos según la cantidad de clientes) ---
+    fig_clientes_interes = figura_segmentos(
+        segmentos,
         x = 'total_transacciones',
         y = 'total_gastado',
-        color = 'tipo',
         hover_name = 'cliente',
-        size_max = 60,
-        color_discrete_map = {
+        colores = {
             'Clientes Generales': 'lightgreen',
             '🎯 Clientes de Interés': 'red'
         },
-        template = 'plotly_dark',
-        title = "🎯 Clientes con Pocas Transacciones y Alto Gasto"
+        titulo = "🎯 Clientes con Pocas Transacciones y Alto Gasto"
     )
 
     fig_clientes_interes.update_layout(
@@ -490,15 +628,17 @@ with tab3:
     )
 
     # --- Mostrar gráfico e insight ---
-    st.plotly_chart(fig_clientes_interes, use_container_width = True)
+    mostrar_grafico(fig_clientes_interes)
+    if segmentos["omitidos"]:
+        st.caption(f"Se muestran los {len(segmentos['puntos'])} clientes de interés con mayor gasto ({segmentos['omitidos']} más en la tabla).")
     st.caption("🔍 **Insight:** Este gráfico destaca a los clientes que, a pesar de tener pocas transacciones, realizan un gasto considerable. Representan oportunidades de fidelización.")
 
     # --- Mostrar tabla de clientes de interés ---
     st.subheader("📋 Clientes de Interés")
-    st.dataframe(clientes_interes[['cliente', 'total_transacciones', 'total_gastado']])
+    st.dataframe(clientes_interes)
 
     # --- Mostrar porcentaje representado ---
-    porcentaje = len(clientes_interes) / len(df_clientes) * 100
+    porcentaje = cli["porcentaje"]
     st.markdown(f"Estos **{len(clientes_interes)} clientes** representan aproximadamente el **{porcentaje:.2f}%** del total.")
 
 
@@ -507,25 +647,25 @@ with tab3:
 
 
 # --- TAB 4: PELÍCULAS MÁS RENTABLES ---
-with tab4:
+def vista_peliculas():
 
     st.markdown("<div class='section-title'> 🎥 Análisis de Películas Más Rentables</div>", unsafe_allow_html = True)
-    st.dataframe(df_peliculas.head())
+    pel = cargar_agregados("peliculas", VERSION_DATOS, CARGA_COMPACTA)
+    st.dataframe(pel["vista_previa"])
+    marcar("datos")
     
     # --- KPIs GENERALES ---
     st.markdown("<hr>", unsafe_allow_html = True)
     st.markdown("<div class='section-title'>📈 KPIs Generales</div>", unsafe_allow_html = True)
 
-    total_peliculas = df_peliculas.shape[0]
-    ingreso_medio = df_peliculas["total_ingresos"].mean()
+    total_peliculas = pel["total_peliculas"]
+    ingreso_medio = pel["ingreso_medio"]
 
-    max_ingresos = df_peliculas.loc[df_peliculas['total_ingresos'].idxmax()]
-    peli_max = max_ingresos["pelicula"]
-    peli_cantidad_max = max_ingresos["total_ingresos"]
+    peli_max = pel["peli_max"]
+    peli_cantidad_max = pel["peli_cantidad_max"]
     
-    mas_alquileres = df_peliculas.loc[df_peliculas["total_alquileres"].idxmax()]
-    peli_mas_alquilada = mas_alquileres["pelicula"]
-    peli_frecuencia = mas_alquileres["total_alquileres"]
+    peli_mas_alquilada = pel["peli_mas_alquilada"]
+    peli_frecuencia = pel["peli_frecuencia"]
 
     # KPIs como tarjetas
     kpi1, kpi2, kpi3, kpi4 = st.columns(4)
@@ -539,8 +679,8 @@ with tab4:
     st.markdown("<div class='section-title'>📊✨ Visualizaciones</div>", unsafe_allow_html = True)
     
     
-    if 'pelicula' in df_peliculas.columns and 'total_ingresos' in df_peliculas.columns:
-        top8_income = df_peliculas.sort_values('total_ingresos', ascending = False).head(8)
+    if "top8_income" in pel:
+        top8_income = pel["top8_income"]
 
         fig_top8_peliculas = px.bar(
             top8_income,
@@ -564,12 +704,12 @@ with tab4:
         fig_top8_peliculas.update_traces(texttemplate = '$%{text:,.2f}', textposition = 'outside')
 
         # Mostrar en dashboard
-        st.plotly_chart(fig_top8_peliculas, use_container_width = True)
+        mostrar_grafico(fig_top8_peliculas)
         st.caption("🔍 **Insight:** Estas son las 8 películas que han generado mayores ingresos totales en la historia de la base de datos.")
         
         
-    if 'pelicula' in df_peliculas.columns and 'total_alquileres' in df_peliculas.columns:
-        top8_rentals = df_peliculas.sort_values('total_alquileres', ascending = False).head(8)
+    if "top8_rentals" in pel:
+        top8_rentals = pel["top8_rentals"]
 
         fig_top8_alquileres = px.bar(
             top8_rentals,
@@ -595,45 +735,28 @@ with tab4:
         )
 
         # Mostrar en el dashboard
-        st.plotly_chart(fig_top8_alquileres, use_container_width = True)
+        mostrar_grafico(fig_top8_alquileres)
         st.caption("🔍 **Insight:** Estas películas son las más alquiladas del catálogo, lo cual refleja su alta popularidad entre los clientes.")
 
 
 
     # --- Definir umbrales para análisis estratégico ---
-    if "total_alquileres" in df_peliculas.columns and "total_ingresos" in df_peliculas.columns:
-        # --- Definir umbrales para "películas estratégicas" ---
-        umbral_alquileres_pocos = df_peliculas['total_alquileres'].quantile(0.35)
-        umbral_ingreso_alto = df_peliculas['total_ingresos'].quantile(0.75)
-
-        # --- Filtrar películas de interés ---
-        peliculas_interes = df_peliculas[
-            (df_peliculas['total_alquileres'] <= umbral_alquileres_pocos) &
-            (df_peliculas['total_ingresos'] >= umbral_ingreso_alto)
-        ].copy()
-        peliculas_interes['tipo'] = '🎯 Películas Estratégicas'
-
-        # --- Clasificar el resto ---
-        otras_peliculas = df_peliculas[~df_peliculas.index.isin(peliculas_interes.index)].copy()
-        otras_peliculas['tipo'] = 'Películas Generales'
-
-        # --- Combinar en un solo DataFrame para el gráfico ---
-        df_plot_peliculas = pd.concat([peliculas_interes, otras_peliculas])
+    if "segmentos_peliculas" in pel:
+        # --- Películas estratégicas (alquileres <= p35 e ingresos >= p75) y el resto ---
+        peliculas_interes = pel["peliculas_interes"]
+        segmentos_peliculas = pel["segmentos_peliculas"]
 
         # --- Gráfico de dispersión con estilo unificado ---
-        fig_peliculas_interes = px.scatter(
-            df_plot_peliculas,
+        fig_peliculas_interes = figura_segmentos(
+            segmentos_peliculas,
             x = 'total_alquileres',
             y = 'total_ingresos',
-            color = 'tipo',
             hover_name = 'pelicula',
-            size_max = 60,
-            color_discrete_map = {
+            colores = {
                 'Películas Generales': 'lightgreen',
                 '🎯 Películas Estratégicas': 'red'
             },
-            template = 'plotly_dark',
-            title = "🎯 Películas Estratégicas: Altos Ingresos con Pocos Alquileres"
+            titulo = "🎯 Películas Estratégicas: Altos Ingresos con Pocos Alquileres"
         )
 
         fig_peliculas_interes.update_layout(
@@ -644,17 +767,19 @@ with tab4:
         )
 
         # --- Mostrar gráfico en el dashboard ---
-        st.plotly_chart(fig_peliculas_interes, use_container_width = True)
+        mostrar_grafico(fig_peliculas_interes)
+        if segmentos_peliculas["omitidos"]:
+            st.caption(f"Se muestran las {len(segmentos_peliculas['puntos'])} películas estratégicas con mayores ingresos ({segmentos_peliculas['omitidos']} más en la tabla).")
 
         # --- Insight profesional ---
         st.caption("🔍 **Insight:** Estas películas tienen pocos alquileres pero generan ingresos altos. Podrían tratarse de títulos premium, de nicho o con precios elevados. Merecen especial atención en la estrategia de distribución.")
 
         # --- Mostrar tabla de películas estratégicas ---
         st.subheader("📋 Películas Estratégicas")
-        st.dataframe(peliculas_interes[['pelicula', 'total_alquileres', 'total_ingresos']])
+        st.dataframe(peliculas_interes)
 
         # --- Mostrar porcentaje representado ---
-        porcentaje_peliculas = len(peliculas_interes) / len(df_peliculas) * 100
+        porcentaje_peliculas = pel["porcentaje_peliculas"]
         st.markdown(f"Estas **{len(peliculas_interes)} películas** representan aproximadamente el **{porcentaje_peliculas:.2f}%** del total analizado.")
 
 
@@ -662,22 +787,33 @@ with tab4:
     
 
 # --- TAB 5: INGRESOS POR TIENDA Y CATEGORÍA ---
-with tab5:
+def vista_ingresos():
     
     st.markdown("<div class='section-title'>🏬 Análisis de Ingresos por Tienda y Categoría</div>", unsafe_allow_html = True)
-    st.dataframe(df_ingresos.head())
+    ing = cargar_agregados("ingresos", VERSION_DATOS, CARGA_COMPACTA)
+
+    # --- FILTRO POR TIENDA ---
+    # El detalle de alquileres no trae la tienda; el filtro aplica a los ingresos por tienda
+    tiendas = st.multiselect("Tiendas", ing["tiendas"], key = "filtro_tiendas")
+    if tiendas and len(tiendas) < len(ing["tiendas"]):
+        def filtrar():
+            df_ingresos = cargar_dataset("ingresos_por_tienda_categoria_limpio", VERSION_DATOS, CARGA_COMPACTA)
+            return agregados_ingresos(df_ingresos[df_ingresos["store_id"].isin(tiendas)])
+
+        ing = resultado_cacheado(VERSION_DATOS, "ingresos", {"compacto": CARGA_COMPACTA, "tiendas": tiendas}, filtrar)
+    st.dataframe(ing["vista_previa"])
+    marcar("datos")
     
     # --- KPIs GENERALES ---
     st.markdown("<hr>", unsafe_allow_html = True)
     st.markdown("<div class='section-title'>📈 KPIs Generales</div>", unsafe_allow_html = True)
 
-    total_tiendas = df_ingresos["store_id"].nunique()
-    categorias_unicas_ing = df_ingresos["categoria"].nunique()
+    total_tiendas = ing["total_tiendas"]
+    categorias_unicas_ing = ing["categorias_unicas_ing"]
 
-    top_cat_global = df_ingresos.loc[df_ingresos["ingresos"].idxmax()]
-    cat_top = top_cat_global["categoria"]
-    monto_top = top_cat_global["ingresos"]
-    tienda_top = top_cat_global["store_id"]
+    cat_top = ing["cat_top"]
+    monto_top = ing["monto_top"]
+    tienda_top = ing["tienda_top"]
    
     # KPIs como tarjetas
     kpi1, kpi2, kpi3 = st.columns(3)
@@ -690,12 +826,8 @@ with tab5:
     st.markdown("<div class='section-title'>📊✨ Visualizaciones</div>", unsafe_allow_html = True)
     
     
-    # --- Seleccionar las 5 categorías con mayores ingresos globales ---
-    top5_cats = (
-        df_ingresos.groupby('categoria')['ingresos']
-                .sum().nlargest(5).index
-    )
-    df_top5 = df_ingresos[df_ingresos['categoria'].isin(top5_cats)].copy()
+    # --- Las 5 categorías con mayores ingresos globales ---
+    df_top5 = ing["df_top5"]
 
     # --- Gráfico de barras agrupadas con Plotly ---
     fig_ingresos_tienda_cat = px.bar(
@@ -723,7 +855,7 @@ with tab5:
     )
 
     # --- Mostrar gráfico ---
-    st.plotly_chart(fig_ingresos_tienda_cat, use_container_width = True)
+    mostrar_grafico(fig_ingresos_tienda_cat)
 
     # --- Insight profesional ---
     st.caption("🔍 **Insight:** Este gráfico compara los ingresos generados por las principales categorías de películas en cada tienda. Permite identificar fortalezas o carencias por tienda y especializar estrategias de catálogo.")
@@ -732,18 +864,8 @@ with tab5:
         
         
         
-    # --- Crear pivot table con % de ingresos por categoría y tienda ---
-    
-    pivot_pct = (
-        df_ingresos.pivot(index = 'categoria', columns = 'store_id', values = 'pct_ingreso_tienda')
-                .fillna(0).round(1)
-    ).reset_index()
-
-    # Convertir columnas numéricas a string para que Plotly las trate como categóricas
-    pivot_pct.columns = pivot_pct.columns.astype(str)
-
-    # Melt para plotly
-    df_heatmap = pivot_pct.melt(id_vars = 'categoria', var_name = 'store_id', value_name = 'pct_ingreso')
+    # --- % de ingresos por categoría y tienda (pivot + melt ya hechos) ---
+    df_heatmap = ing["df_heatmap"]
 
     # --- Gráfico tipo Heatmap con corrección ---
     fig_heatmap_pct = px.density_heatmap(
@@ -766,9 +888,27 @@ with tab5:
     )
 
     # Mostrar en dashboard
-    st.plotly_chart(fig_heatmap_pct, use_container_width = True)
+    mostrar_grafico(fig_heatmap_pct)
     st.caption("🔍 **Insight:** Este heatmap resalta el porcentaje que representa cada categoría en el total de ingresos por tienda.")
 
+
+
+# --- SELECTOR DE VISTA ---
+VISTAS = {
+    "Detalle Alquileres": vista_detalle,
+    "Alquileres por Mes y Categoría": vista_alquileres_mes,
+    "Clientes Más Frecuentes": vista_clientes,
+    "Películas Más Rentables": vista_peliculas,
+    "Ingresos por Tienda y Categoría": vista_ingresos,
+}
+
+if TODAS_LAS_PESTANAS:
+    for pestana, (nombre, vista) in zip(st.tabs(list(VISTAS)), VISTAS.items()):
+        with pestana:
+            ejecutar_vista(nombre, vista)
+else:
+    seleccion = st.radio("Vista", list(VISTAS), horizontal = True, label_visibility = "collapsed", key = "vista")
+    ejecutar_vista(seleccion, VISTAS[seleccion])
+
         
 ## para ejecutar el script:  python -m streamlit run app_dashboard.py
-
@@ -0,0 +1,102 @@
+import glob
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from pytest_benchmark.utils import get_machine_id
+
+# Los módulos del dashboard son scripts sueltos en 05_dashboard, no un paquete
+CARPETA_DASHBOARD = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, CARPETA_DASHBOARD)
+
+from carga_datos import DATASETS  # noqa: E402
+
+# Línea base de los tiempos, versionada junto a los benchmarks
+CARPETA_LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "linea_base")
+
+
+# --- ESCALADO SINTÉTICO ---
+# Cada dataset se multiplica por el factor conservando su forma: el detalle repite los
+# alquileres (mismas 16 categorías, mismos días/horas), los rankings suman clientes y
+# películas nuevos con montos perturbados (los cuantiles no quedan en empates exactos),
+# los alquileres por mes suman categorías y los ingresos suman tiendas, para que los pivots
+# sigan teniendo una fila por par (mes, categoría) / (categoría, tienda).
+def _repetir(df, factor):
+    return df.iloc[np.tile(np.arange(len(df)), factor)].reset_index(drop = True)
+
+
+def _copia(df, factor):
+    return np.repeat(np.arange(factor), len(df))
+
+
+def escalar_dataset(nombre, df, factor, semilla = 0):
+    if factor == 1:
+        return df
+    rng = np.random.default_rng(semilla)
+    escalado = _repetir(df, factor)
+    copia = _copia(df, factor)
+
+    if nombre == "detalle_alquileres_limpio":
+        escalado["rental_id"] = np.arange(1, len(escalado) + 1)
+    elif nombre == "alquileres_por_mes_categoria_limpio":
+        escalado["categoria"] = escalado["categoria"] + np.where(copia > 0, " " + copia.astype(str), "")
+        escalado["total_global_mes"] = escalado.groupby("mes")["total_alquileres"].transform("sum")
+    elif nombre == "clientes_mas_frecuentes_limpio":
+        escalado["customer_id"] = np.arange(1, len(escalado) + 1)
+        escalado["cliente"] = escalado["cliente"] + " " + copia.astype(str)
+        escalado["total_gastado"] = (escalado["total_gastado"] * rng.uniform(0.8, 1.2, len(escalado))).round(2)
+    elif nombre == "peliculas_mas_rentables_limpio":
+        escalado["pelicula"] = escalado["pelicula"] + " " + copia.astype(str)
+        escalado["total_ingresos"] = (escalado["total_ingresos"] * rng.uniform(0.8, 1.2, len(escalado))).round(2)
+        escalado["ingreso_promedio_por_renta"] = escalado["total_ingresos"] / escalado["total_alquileres"]
+    elif nombre == "ingresos_por_tienda_categoria_limpio":
+        escalado["store_id"] = escalado["store_id"] + copia * (df["store_id"].max())
+    return escalado
+
+
+# --- OPCIONES Y FIXTURES ---
+def pytest_addoption(parser):
+    parser.addoption(
+        "--escalas", default = "1,10,100",
+        help = "Factores de escala separados por coma (1 = CSV publicados); 1000 pide varios GB de RAM"
+    )
+
+
+@pytest.hookimpl(tryfirst = True)
+def pytest_configure(config):
+    # Sin --benchmark-storage explícito, los resultados se guardan/comparan en linea_base/
+    if config.getoption("benchmark_storage", None) == "file://./.benchmarks":
+        config.option.benchmark_storage = "file://" + CARPETA_LINEA_BASE
+
+    # pytest-benchmark separa las líneas base por máquina (sistema, intérprete y versión de
+    # Python): sin una que coincida, --benchmark-compare no compara nada y ninguna regresión
+    # falla. Se corta antes, salvo en la corrida que justamente graba la línea base.
+    grabando = config.getoption("benchmark_save", None) or config.getoption("benchmark_autosave", None)
+    omitidos = config.getoption("benchmark_disable", False) or config.getoption("benchmark_skip", False)
+    almacenamiento = config.getoption("benchmark_storage", "")
+    if config.getoption("benchmark_compare", None) and not grabando and not omitidos and almacenamiento.startswith("file://"):
+        maquina = get_machine_id()
+        carpeta = os.path.join(almacenamiento[len("file://"):], maquina)
+        if not glob.glob(os.path.join(carpeta, "*.json")):
+            raise pytest.UsageError(
+                f"No hay línea base para esta máquina ({maquina}) en {carpeta}: grabe una con "
+                "--benchmark-save=linea_base antes de comparar (ver benchmarks en 05_dashboard/README.md)"
+            )
+
+
+def pytest_generate_tests(metafunc):
+    if "escala" in metafunc.fixturenames:
+        escalas = [int(e) for e in metafunc.config.getoption("escalas").split(",")]
+        metafunc.parametrize("escala", escalas, ids = [f"x{e}" for e in escalas], scope = "session")
+
+
+@pytest.fixture(scope = "session")
+def datos_publicados():
+    return {nombre: pd.read_csv(os.path.join(CARPETA_DASHBOARD, nombre + ".csv")) for nombre in DATASETS}
+
+
+@pytest.fixture(scope = "session")
+def datasets(datos_publicados, escala):
+    return {nombre: escalar_dataset(nombre, df, escala) for nombre, df in datos_publicados.items()}
@@ -0,0 +1,59 @@
+import pandas as pd
+
+from agregados import (
+    agregados_alquileres_mes,
+    agregados_clientes,
+    agregados_detalle,
+    agregados_ingresos,
+    agregados_peliculas,
+)
+from filtros import MotorFiltros
+
+# --- BENCHMARKS DE LOS AGREGADOS DEL DASHBOARD ---
+# Cada función de agregados.py sobre los CSV publicados (x1) y sobre versiones escaladas
+# (x10, x100; x1000 con --escalas). Los tiempos se comparan contra linea_base/: con
+# --benchmark-compare-fail una regresión hace fallar la corrida (ver README del dashboard).
+
+
+def test_agregados_detalle(benchmark, datasets):
+    df = datasets["detalle_alquileres_limpio"]
+    agregados = benchmark(agregados_detalle, df)
+    assert agregados["total_alquileres"] == len(df)
+    assert agregados["conteo_dias"]["Cantidad"].sum() == len(df)
+
+
+def test_agregados_alquileres_mes(benchmark, datasets):
+    df = datasets["alquileres_por_mes_categoria_limpio"]
+    agregados = benchmark(agregados_alquileres_mes, df)
+    assert agregados["n_alquileres"] == df["total_alquileres"].sum()
+    assert len(agregados["top4_cats"]) == 4
+
+
+def test_agregados_clientes(benchmark, datasets):
+    df = datasets["clientes_mas_frecuentes_limpio"]
+    agregados = benchmark(agregados_clientes, df)
+    assert agregados["total_clientes"] == len(df)
+    assert 0 < len(agregados["clientes_interes"]) < len(df)
+
+
+def test_agregados_peliculas(benchmark, datasets):
+    df = datasets["peliculas_mas_rentables_limpio"]
+    agregados = benchmark(agregados_peliculas, df)
+    assert agregados["total_peliculas"] == len(df)
+    assert 0 < len(agregados["peliculas_interes"]) < len(df)
+
+
+def test_agregados_ingresos(benchmark, datasets):
+    df = datasets["ingresos_por_tienda_categoria_limpio"]
+    agregados = benchmark(agregados_ingresos, df)
+    assert len(agregados["df_heatmap"]) == df["categoria"].nunique() * df["store_id"].nunique()
+
+
+def test_filtro_detalle(benchmark, datasets):
+    # Un mes, dos categorías y un género sobre el motor ya armado
+    motor = MotorFiltros(datasets["detalle_alquileres_limpio"])
+    desde, hasta = pd.Timestamp("2005-07-01").date(), pd.Timestamp("2005-07-31").date()
+    agregados = benchmark(
+        lambda: motor.agregados(motor.seleccionar(desde, hasta, ["Action", "Sports"], ["Femenino"]))
+    )
+    assert 0 < agregados["total_alquileres"] < len(motor.fechas)
@@ -0,0 +1,169 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+
+# --- CACHE DE RESULTADOS EN DISCO ---
+# Los agregados filtrados se repiten entre sesiones y entre procesos; st.cache_data no se
+# comparte entre procesos ni tiene tope de tamaño. Este cache guarda cada resultado
+# (pickle) en una base SQLite local que usan todos los procesos del host:
+#   - clave: hash de (versión de los datos, vista, parámetros del filtro);
+#   - TTL: una entrada más vieja que ttl segundos cuenta como miss y se borra;
+#   - tope en bytes: al guardar, se desalojan las entradas usadas hace más tiempo (LRU);
+#   - contadores de hits, misses, desalojos y expiradas, para dimensionarlo con tráfico real.
+#
+#   python cache_disco.py              # estadísticas del cache
+#   python cache_disco.py --vaciar
+#
+# Variables de entorno: SAKILA_CACHE_DISCO (ruta de la base; "0" lo desactiva),
+# SAKILA_CACHE_MB (tope, 256 por defecto) y SAKILA_CACHE_TTL (segundos, 3600 por defecto).
+
+RUTA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_resultados.sqlite")
+CONTADORES = ["hits", "misses", "desalojos", "expiradas"]
+
+
+def clave_resultado(version, vista, parametros):
+    """Hash estable de (versión, vista, parámetros); el orden de las listas de filtros no cuenta."""
+    parametros = {k: sorted(v) if isinstance(v, (list, tuple, set)) else v for k, v in parametros.items()}
+    texto = json.dumps([version, vista, parametros], sort_keys = True, default = str)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class CacheResultados:
+
+    def __init__(self, ruta = RUTA_CACHE, max_bytes = 256 * 2**20, ttl = 3600):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        with self._conexion() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS resultados ("
+                "clave TEXT PRIMARY KEY, valor BLOB NOT NULL, bytes INTEGER NOT NULL, "
+                "creado REAL NOT NULL, usado REAL NOT NULL)"
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS resultados_usado ON resultados (usado)")
+            con.execute("CREATE TABLE IF NOT EXISTS contadores (nombre TEXT PRIMARY KEY, valor INTEGER NOT NULL)")
+            con.executemany("INSERT OR IGNORE INTO contadores VALUES (?, 0)", [(c,) for c in CONTADORES])
+
+    @contextlib.contextmanager
+    def _conexion(self):
+        # Una conexión por operación: los hilos de Streamlit y los demás procesos no comparten
+        # estado; SQLite serializa las escrituras (timeout de espera por el lock)
+        con = sqlite3.connect(self.ruta, timeout = 30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    @staticmethod
+    def _contar(con, nombre, cantidad = 1):
+        con.execute("UPDATE contadores SET valor = valor + ? WHERE nombre = ?", (cantidad, nombre))
+
+    def obtener(self, clave):
+        """(True, valor) si la clave está vigente; (False, None) si no."""
+        ahora = time.time()
+        with self._conexion() as con:
+            fila = con.execute("SELECT valor, creado FROM resultados WHERE clave = ?", (clave,)).fetchone()
+            if fila is not None and ahora - fila[1] > self.ttl:
+                con.execute("DELETE FROM resultados WHERE clave = ?", (clave,))
+                self._contar(con, "expiradas")
+                fila = None
+            if fila is None:
+                self._contar(con, "misses")
+                return False, None
+            con.execute("UPDATE resultados SET usado = ? WHERE clave = ?", (ahora, clave))
+            self._contar(con, "hits")
+        return True, pickle.loads(fila[0])
+
+    def guardar(self, clave, valor):
+        datos = pickle.dumps(valor, protocol = pickle.HIGHEST_PROTOCOL)
+        if len(datos) > self.max_bytes:
+            return
+        ahora = time.time()
+        with self._conexion() as con:
+            con.execute("BEGIN IMMEDIATE")
+            con.execute(
+                "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?)",
+                (clave, datos, len(datos), ahora, ahora)
+            )
+            # Desalojo LRU hasta quedar bajo el tope
+            total = con.execute("SELECT SUM(bytes) FROM resultados").fetchone()[0]
+            desalojadas = []
+            if total > self.max_bytes:
+                for vieja, tamano in con.execute(
+                    "SELECT clave, bytes FROM resultados WHERE clave != ? ORDER BY usado", (clave,)
+                ):
+                    desalojadas.append((vieja,))
+                    total -= tamano
+                    if total <= self.max_bytes:
+                        break
+                con.executemany("DELETE FROM resultados WHERE clave = ?", desalojadas)
+                self._contar(con, "desalojos", len(desalojadas))
+
+    def calcular(self, version, vista, parametros, funcion):
+        """Resultado cacheado de funcion() para (versión, vista, parámetros); si no está, lo calcula y guarda."""
+        clave = clave_resultado(version, vista, parametros)
+        encontrado, valor = self.obtener(clave)
+        if not encontrado:
+            valor = funcion()
+            self.guardar(clave, valor)
+        return valor
+
+    def estadisticas(self):
+        with self._conexion() as con:
+            stats = dict(con.execute("SELECT nombre, valor FROM contadores").fetchall())
+            entradas, total = con.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM resultados").fetchone()
+        consultas = stats["hits"] + stats["misses"]
+        stats.update({
+            "entradas": entradas,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "tasa_hits": stats["hits"] / consultas if consultas else 0.0,
+        })
+        return stats
+
+    def vaciar(self):
+        with self._conexion() as con:
+            con.execute("DELETE FROM resultados")
+            con.execute("UPDATE contadores SET valor = 0")
+
+
+def cache_desde_entorno():
+    """Cache configurado con SAKILA_CACHE_DISCO/MB/TTL, o None si está desactivado."""
+    ruta = os.environ.get("SAKILA_CACHE_DISCO", RUTA_CACHE)
+    if ruta == "0":
+        return None
+    return CacheResultados(
+        ruta,
+        max_bytes = int(float(os.environ.get("SAKILA_CACHE_MB", "256")) * 2**20),
+        ttl = float(os.environ.get("SAKILA_CACHE_TTL", "3600")),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Estadísticas del cache de resultados del dashboard.")
+    parser.add_argument("--vaciar", action = "store_true", help = "Borra las entradas y pone los contadores en cero")
+    args = parser.parse_args()
+
+    cache = cache_desde_entorno()
+    if cache is None:
+        print("Cache desactivado (SAKILA_CACHE_DISCO=0)")
+        return
+    if args.vaciar:
+        cache.vaciar()
+    stats = cache.estadisticas()
+    print(f"🗄️ {cache.ruta}")
+    print(f"Entradas: {stats['entradas']} ({stats['bytes'] / 2**20:.2f} de {stats['max_bytes'] / 2**20:.0f} MB), TTL {stats['ttl']:.0f} s")
+    print(f"Hits: {stats['hits']}  Misses: {stats['misses']}  Tasa de hits: {stats['tasa_hits']:.0%}")
+    print(f"Desalojos: {stats['desalojos']}  Expiradas: {stats['expiradas']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,567 @@
+import argparse
+import collections
+import contextlib
+import io
+import os
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from almacen import escribir_almacen, leer_almacen, ruta_almacen
+from generos import EstimadorGenero, primeros_nombres
+
+# --- DATASETS DEL DASHBOARD ---
+DATASETS = [
+    "detalle_alquileres_limpio",
+    "alquileres_por_mes_categoria_limpio",
+    "clientes_mas_frecuentes_limpio",
+    "peliculas_mas_rentables_limpio",
+    "ingresos_por_tienda_categoria_limpio",
+]
+
+# Formatos columnares, en orden de preferencia sobre el CSV
+EXTENSIONES_COLUMNARES = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def esquemas():
+    """
+    Esquema explícito de cada dataset (y de cada CSV crudo de la exportación): categorías
+    con diccionario, fechas como timestamp nativo y enteros del ancho justo. Import
+    diferido: pyarrow solo hace falta para leer o escribir los formatos columnares.
+    """
+    import pyarrow as pa
+
+    categoria = pa.dictionary(pa.int32(), pa.string())
+    monto = pa.decimal128(12, 2)
+    return {
+        "detalle_alquileres_limpio": pa.schema([
+            ("rental_id", pa.int32()),
+            ("cliente", categoria),
+            ("pelicula", categoria),
+            ("categoria", categoria),
+            ("rental_date", pa.timestamp("s")),
+            ("year", pa.int16()),
+            ("month", pa.int8()),
+            ("month_name", categoria),
+            ("day", pa.int8()),
+            ("weekday", categoria),
+            ("hour", pa.int8()),
+            ("primer_nombre", categoria),
+            ("genero_estimado", categoria),
+        ]),
+        "alquileres_por_mes_categoria_limpio": pa.schema([
+            ("mes", pa.string()),
+            ("categoria", pa.string()),
+            ("total_alquileres", pa.int64()),
+            ("year", pa.int16()),
+            ("nombre_mes", pa.string()),
+            ("num_mes", pa.int8()),
+            ("total_global_mes", pa.int64()),
+        ]),
+        "clientes_mas_frecuentes_limpio": pa.schema([
+            ("customer_id", pa.int32()),
+            ("cliente", pa.string()),
+            ("total_transacciones", pa.int64()),
+            ("total_gastado", pa.float64()),
+        ]),
+        "peliculas_mas_rentables_limpio": pa.schema([
+            ("pelicula", pa.string()),
+            ("total_alquileres", pa.int64()),
+            ("total_ingresos", pa.float64()),
+            ("ingreso_promedio_por_renta", pa.float64()),
+        ]),
+        "ingresos_por_tienda_categoria_limpio": pa.schema([
+            ("store_id", pa.int64()),
+            ("categoria", pa.string()),
+            ("ingresos", pa.float64()),
+            ("pct_ingreso_tienda", pa.float64()),
+        ]),
+        # CSV crudos de sql_sakila_script.py --formato-columnar: los montos como
+        # decimal(12,2), igual que SUM(p.amount)
+        "detalle_alquileres": pa.schema([
+            ("rental_id", pa.int32()),
+            ("cliente", categoria),
+            ("pelicula", categoria),
+            ("categoria", categoria),
+            ("rental_date", pa.timestamp("s")),
+        ]),
+        "alquileres_por_mes_categoria": pa.schema([
+            ("mes", pa.string()),
+            ("categoria", categoria),
+            ("total_alquileres", pa.int64()),
+        ]),
+        "ingresos_por_tienda_categoria": pa.schema([
+            ("store_id", pa.int16()),
+            ("categoria", categoria),
+            ("ingresos", monto),
+        ]),
+        "peliculas_mas_rentables": pa.schema([
+            ("pelicula", pa.string()),
+            ("total_alquileres", pa.int64()),
+            ("total_ingresos", monto),
+        ]),
+        "clientes_mas_frecuentes": pa.schema([
+            ("customer_id", pa.int32()),
+            ("cliente", pa.string()),
+            ("total_transacciones", pa.int64()),
+            ("total_gastado", monto),
+        ]),
+    }
+
+
+# --- CARGA COMPACTA ---
+# Tipos de pandas para el modo de memoria reducida: categóricas para los textos que se
+# repiten, enteros del ancho justo y float32 solo en los cocientes (los montos se suman
+# en los KPIs y quedan en float64). Los conteos que el dashboard ordena para sus top N van en
+# int32: con int16 NumPy ordena con otro algoritmo y cambian los empates del ranking.
+# Las columnas que no aparecen se descartan al leer.
+TIPOS_COMPACTOS = {
+    "detalle_alquileres_limpio": {
+        "rental_id": "int32",
+        "cliente": "category",
+        "pelicula": "category",
+        "categoria": "category",
+        "rental_date": "datetime64[s]",
+        "weekday": "category",
+        "hour": "int8",
+        "genero_estimado": "category",
+    },
+    "alquileres_por_mes_categoria_limpio": {
+        "mes": "category",
+        "categoria": "category",
+        "total_alquileres": "int32",
+        "year": "int16",
+        "nombre_mes": "category",
+        "num_mes": "int8",
+        "total_global_mes": "int32",
+    },
+    "clientes_mas_frecuentes_limpio": {
+        "customer_id": "int16",
+        "cliente": "str",
+        "total_transacciones": "int32",
+        "total_gastado": "float64",
+    },
+    "peliculas_mas_rentables_limpio": {
+        "pelicula": "str",
+        "total_alquileres": "int32",
+        "total_ingresos": "float64",
+        "ingreso_promedio_por_renta": "float32",
+    },
+    "ingresos_por_tienda_categoria_limpio": {
+        "store_id": "int8",
+        "categoria": "str",
+        "ingresos": "float64",
+        "pct_ingreso_tienda": "float32",
+    },
+}
+
+
+def _primer_nombre(df):
+    # Sobre las categorías de cliente (una por cliente), no sobre cada alquiler
+    primeros = primeros_nombres(df["cliente"].cat.categories)
+    return pd.Series(primeros[df["cliente"].cat.codes], index=df.index, dtype="category")
+
+
+def _genero_estimado(df):
+    # Un género por primer nombre distinto (cache, diccionario y regla de generos.py), por código
+    _, generos = EstimadorGenero().estimar(df["cliente"])
+    return pd.Series(generos, index=df.index)
+
+
+# Columnas del detalle que no se cargan en modo compacto porque se derivan de
+# rental_date / cliente; reconstruir_columnas las agrega solo si alguien las pide
+COLUMNAS_DERIVADAS = {
+    "detalle_alquileres_limpio": {
+        "year": lambda df: df["rental_date"].dt.year.astype("int16"),
+        "month": lambda df: df["rental_date"].dt.month.astype("int8"),
+        "month_name": lambda df: df["rental_date"].dt.month_name().astype("category"),
+        "day": lambda df: df["rental_date"].dt.day.astype("int8"),
+        "primer_nombre": _primer_nombre,
+        "genero_estimado": _genero_estimado,
+    },
+}
+
+
+def compactar(df, nombre):
+    """Deja solo las columnas de TIPOS_COMPACTOS del dataset, con esos tipos."""
+    tipos = TIPOS_COMPACTOS[nombre]
+    return df[[c for c in tipos if c in df.columns]].astype({c: t for c, t in tipos.items() if c in df.columns})
+
+
+def reconstruir_columnas(df, nombre, columnas):
+    """Agrega a un dataset compacto las columnas derivadas pedidas que no estén cargadas."""
+    derivadas = COLUMNAS_DERIVADAS.get(nombre, {})
+    for columna in columnas:
+        if columna not in df.columns:
+            df[columna] = derivadas[columna](df)
+    return df
+
+
+def memoria_datasets(datasets):
+    """Bytes en memoria de cada DataFrame (deep: incluye el contenido de los strings)."""
+    return {nombre: int(df.memory_usage(deep=True).sum()) for nombre, df in datasets.items()}
+
+
+# --- LECTURA ---
+def ruta_columnar(nombre, carpeta="."):
+    """Primer archivo columnar disponible para el dataset, o None si solo existe el CSV."""
+    for extension in EXTENSIONES_COLUMNARES.values():
+        ruta = os.path.join(carpeta, nombre + extension)
+        if os.path.exists(ruta):
+            return ruta
+    return None
+
+
+def version_archivo(nombre, carpeta="."):
+    """Archivo que se leería para el dataset, con su tamaño y fecha de modificación."""
+    almacen = ruta_almacen(nombre, carpeta)
+    if almacen is not None:
+        # El esquema se reescribe en cada escritura del almacén
+        estado = os.stat(os.path.join(almacen, "esquema.json"))
+        return (os.path.relpath(almacen, carpeta), estado.st_size, estado.st_mtime_ns)
+    ruta, miembro = ruta_columnar(nombre, carpeta), None
+    if ruta is None:
+        ruta, miembro = fuente_csv(nombre, carpeta)
+    estado = os.stat(ruta)
+    etiqueta = os.path.basename(ruta) + (f":{miembro}" if miembro else "")
+    return (etiqueta, estado.st_size, estado.st_mtime_ns)
+
+
+def version_datos(carpeta="."):
+    """
+    Identifica la versión de los datos: version_archivo de cada dataset. Sirve de clave de
+    cache: cambia cuando se regeneran los archivos.
+    """
+    return tuple(version_archivo(nombre, carpeta) for nombre in DATASETS)
+
+
+def leer_dataset(nombre, carpeta=".", compacto=False, workers=None, bytes_por_bloque=None):
+    """
+    Lee el dataset desde el almacén mapeado en memoria si existe, si no desde Parquet/Arrow
+    (tipos ya resueltos) y si no desde el CSV (suelto o comprimido, ver leer_csv). Con
+    compacto=True solo se leen las columnas de TIPOS_COMPACTOS y con esos tipos.
+    """
+    tipos = TIPOS_COMPACTOS[nombre] if compacto else None
+    if ruta_almacen(nombre, carpeta) is not None:
+        df = leer_almacen(nombre, carpeta, columnas=list(tipos) if compacto else None)
+        return compactar(df, nombre) if compacto else df
+    ruta = ruta_columnar(nombre, carpeta)
+    if ruta is not None:
+        try:
+            # columns=None lee todas; en modo compacto las descartadas ni se decodifican
+            columnas = [c for c in tipos if c in esquemas()[nombre].names] if compacto else None
+            if ruta.endswith(".parquet"):
+                import pyarrow.parquet as pq
+                tabla = pq.read_table(ruta, columns=columnas)
+            else:
+                import pyarrow.feather as feather
+                tabla = feather.read_table(ruta, columns=columnas, memory_map=True)
+            df = tabla.to_pandas()
+            return compactar(df, nombre) if compacto else df
+        except ImportError:
+            pass
+    if not compacto:
+        return leer_csv(nombre, carpeta, workers=workers, bytes_por_bloque=bytes_por_bloque)
+    # El CSV se parsea directo a los tipos compactos, sin pasar por object/int64
+    fechas = [c for c, t in tipos.items() if t.startswith("datetime")]
+    opciones = {
+        "usecols": lambda c: c in tipos,
+        "dtype": {c: t for c, t in tipos.items() if c not in fechas},
+        "parse_dates": fechas,
+    }
+    df = leer_csv(nombre, carpeta, opciones, workers=workers, bytes_por_bloque=bytes_por_bloque)
+    return compactar(df, nombre)
+
+
+def leer_datasets(nombres=DATASETS, carpeta=".", compacto=False, workers=None, bytes_por_bloque=None):
+    """Lee varios datasets a la vez (cada uno, además, con sus bloques en paralelo)."""
+    with ThreadPoolExecutor(max_workers=len(nombres), thread_name_prefix="dataset") as ejecutor:
+        futuros = {
+            nombre: ejecutor.submit(leer_dataset, nombre, carpeta, compacto, workers, bytes_por_bloque)
+            for nombre in nombres
+        }
+        return {nombre: futuro.result() for nombre, futuro in futuros.items()}
+
+
+# --- LECTURA DESDE ARCHIVOS COMPRIMIDOS ---
+# Sin los CSV sueltos, el dataset se lee de <nombre>.csv.zst o de un miembro (<nombre>.csv o
+# <nombre>.csv.zst) del zip de la carpeta (csv_limpios.zip) o del que indique SAKILA_ARCHIVO_DATOS,
+# por ejemplo 04_output_csv_sakila_limpio/csv_limpios.zip tal como lo publica el pipeline:
+# se descomprime al vuelo, sin escribir nada a disco. En todos los casos el texto se va leyendo
+# de a bloques que se cortan en fin de registro y se parsean en paralelo con hilos (la
+# descompresión zlib/zstd y el tokenizador de read_csv liberan el GIL): el archivo nunca está
+# entero descomprimido en memoria. Los bloques son de BYTES_POR_BLOQUE como máximo y, si se
+# conoce el tamaño del texto, de un bloque por hilo en los archivos chicos.
+ARCHIVO_LIMPIOS = "csv_limpios.zip"
+WORKERS_CARGA = os.cpu_count() or 1
+BYTES_POR_BLOQUE = 8 * 2**20
+
+# Tipos con los que read_csv lee cada CSV limpio entero. Se pasan a todos los bloques: inferidos
+# por bloque, una columna podría salir con otro tipo que en una sola lectura del archivo
+TIPOS_CSV = {
+    "detalle_alquileres_limpio": {
+        "rental_id": "int64", "cliente": "str", "pelicula": "str", "categoria": "str",
+        "rental_date": "str", "year": "int64", "month": "int64", "month_name": "str",
+        "day": "int64", "weekday": "str", "hour": "int64", "primer_nombre": "str",
+        "genero_estimado": "str",
+    },
+    "alquileres_por_mes_categoria_limpio": {
+        "mes": "str", "categoria": "str", "total_alquileres": "int64", "year": "int64",
+        "nombre_mes": "str", "num_mes": "int64", "total_global_mes": "int64",
+    },
+    "clientes_mas_frecuentes_limpio": {
+        "customer_id": "int64", "cliente": "str", "total_transacciones": "int64", "total_gastado": "float64",
+    },
+    "peliculas_mas_rentables_limpio": {
+        "pelicula": "str", "total_alquileres": "int64", "total_ingresos": "float64",
+        "ingreso_promedio_por_renta": "float64",
+    },
+    "ingresos_por_tienda_categoria_limpio": {
+        "store_id": "int64", "categoria": "str", "ingresos": "float64", "pct_ingreso_tienda": "float64",
+    },
+}
+
+
+def ruta_archivo_datos(carpeta="."):
+    """Zip con los CSV limpios (SAKILA_ARCHIVO_DATOS o csv_limpios.zip de la carpeta), o None."""
+    ruta = os.environ.get("SAKILA_ARCHIVO_DATOS") or os.path.join(carpeta, ARCHIVO_LIMPIOS)
+    return ruta if os.path.exists(ruta) else None
+
+
+def fuente_csv(nombre, carpeta="."):
+    """(ruta, miembro del zip o None) de donde se lee el CSV del dataset."""
+    for ruta in (os.path.join(carpeta, nombre + ".csv"), os.path.join(carpeta, nombre + ".csv.zst")):
+        if os.path.exists(ruta):
+            return ruta, None
+    archivo = ruta_archivo_datos(carpeta)
+    if archivo is not None:
+        with zipfile.ZipFile(archivo) as zf:
+            miembros = {os.path.basename(m): m for m in zf.namelist()}
+        for miembro in (nombre + ".csv", nombre + ".csv.zst"):
+            if miembro in miembros:
+                return archivo, miembros[miembro]
+    # Sin ninguna fuente, la lectura levanta el FileNotFoundError del CSV
+    return os.path.join(carpeta, nombre + ".csv"), None
+
+
+def _tamano_texto(ruta, miembro=None):
+    """Bytes del CSV sin comprimir si se conocen sin leerlo (de un .csv.zst, su tamaño comprimido)."""
+    if miembro is None:
+        return os.path.getsize(ruta)
+    with zipfile.ZipFile(ruta) as zf:
+        return zf.getinfo(miembro).file_size
+
+
+@contextlib.contextmanager
+def _abrir_csv(ruta, miembro=None):
+    """Flujo binario con el texto del CSV, descomprimiendo zip y zstd al vuelo."""
+    with contextlib.ExitStack() as pila:
+        if miembro is None:
+            flujo = pila.enter_context(open(ruta, "rb"))
+        else:
+            flujo = pila.enter_context(pila.enter_context(zipfile.ZipFile(ruta)).open(miembro))
+        if (miembro or ruta).endswith(".zst"):
+            # Import diferido: zstandard solo hace falta para los miembros .zst
+            import zstandard
+            flujo = io.BufferedReader(pila.enter_context(zstandard.ZstdDecompressor().stream_reader(flujo)))
+        yield flujo
+
+
+def _fin_de_registro(datos, inicio, fin):
+    """Posición después del último salto de línea de datos[inicio:fin] fuera de comillas (inicio si no hay)."""
+    while True:
+        fin = datos.rfind(b"\n", inicio, fin)
+        if fin < 0:
+            return inicio
+        # Con una cantidad par de comillas desde el inicio del bloque, el salto cierra un registro
+        if datos.count(b'"', inicio, fin) % 2 == 0:
+            return fin + 1
+
+
+def _bloques_csv(flujo, bytes_por_bloque=BYTES_POR_BLOQUE):
+    """Bloques de registros completos, cada uno con el encabezado, leyendo de a bytes_por_bloque."""
+    encabezado = flujo.readline()
+    emitidos = 0
+    pendiente = b""
+    while True:
+        leido = flujo.read(bytes_por_bloque)
+        if not leido:
+            break
+        datos = pendiente + leido
+        corte = _fin_de_registro(datos, 0, len(datos))
+        if corte:
+            yield encabezado + datos[:corte]
+            emitidos += 1
+        pendiente = datos[corte:]
+    if pendiente or not emitidos:
+        yield encabezado + pendiente
+
+
+def _parsear_bloque(texto, opciones):
+    return pd.read_csv(io.BytesIO(texto), **opciones)
+
+
+def _concatenar(partes):
+    """Une los bloques parseados; las categóricas con sus categorías ordenadas, como las de read_csv."""
+    if len(partes) == 1:
+        return partes[0]
+    columnas = {}
+    for columna in partes[0].columns:
+        series = [parte[columna] for parte in partes]
+        if isinstance(series[0].dtype, pd.CategoricalDtype):
+            columnas[columna] = union_categoricals(series, sort_categories=True)
+        else:
+            columnas[columna] = pd.concat(series, ignore_index=True)
+    return pd.DataFrame(columnas)
+
+
+def leer_csv(nombre, carpeta=".", opciones=None, workers=None, bytes_por_bloque=None):
+    """
+    read_csv del dataset desde su fuente (CSV suelto, .csv.zst o miembro del zip), con los
+    bloques parseados en paralelo por `workers` hilos (por defecto, uno por núcleo). Sin
+    bytes_por_bloque, bloques de BYTES_POR_BLOQUE o uno por hilo si el archivo es más chico.
+    Sin un dtype en las opciones, cada bloque se parsea con TIPOS_CSV del dataset.
+    """
+    workers = workers or WORKERS_CARGA
+    fuente = fuente_csv(nombre, carpeta)
+    if bytes_por_bloque is None:
+        bytes_por_bloque = BYTES_POR_BLOQUE
+        if os.path.exists(fuente[0]):
+            bytes_por_bloque = min(bytes_por_bloque, _tamano_texto(*fuente) // workers + 1)
+    opciones = dict(opciones or {})
+    opciones.setdefault("dtype", TIPOS_CSV.get(nombre))
+    partes, pendientes = [], collections.deque()
+    with _abrir_csv(*fuente) as flujo, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bloque") as ejecutor:
+        for bloque in _bloques_csv(flujo, bytes_por_bloque):
+            pendientes.append(ejecutor.submit(_parsear_bloque, bloque, opciones))
+            # A lo sumo dos bloques por hilo en vuelo: acota el texto descomprimido en memoria
+            if len(pendientes) > 2 * workers:
+                partes.append(pendientes.popleft().result())
+        partes.extend(futuro.result() for futuro in pendientes)
+    return _concatenar(partes)
+
+
+# --- CONVERSIÓN CSV -> PARQUET / ARROW ---
+def escribir_columnar(ruta_csv, formato="parquet"):
+    """
+    Escribe junto al CSV su versión Parquet o Arrow IPC con el esquema explícito de su nombre
+    en esquemas(). La usan convertir_dataset y la exportación (sql_sakila_script.py --formato-columnar).
+    """
+    import pyarrow.csv as pv
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    esquema = esquemas()[os.path.splitext(os.path.basename(ruta_csv))[0]]
+    # El CSV se lee con los tipos base y luego se castea: diccionarios y enteros angostos
+    tipos_lectura = {
+        campo.name: campo.type.value_type if hasattr(campo.type, "value_type") else campo.type
+        for campo in esquema
+    }
+    tabla = pv.read_csv(
+        ruta_csv,
+        convert_options=pv.ConvertOptions(column_types=tipos_lectura, strings_can_be_null=False)
+    ).select(esquema.names).cast(esquema)
+
+    ruta = os.path.splitext(ruta_csv)[0] + EXTENSIONES_COLUMNARES[formato]
+    if formato == "parquet":
+        pq.write_table(tabla, ruta, compression="zstd")
+    else:
+        # Sin compresión: con memory_map=True la tabla de Arrow queda sobre el mapeo del archivo
+        # (un Arrow comprimido se descomprime entero al heap aunque se lea con memory_map)
+        feather.write_feather(tabla, ruta, compression="uncompressed")
+    return ruta
+
+
+def convertir_dataset(nombre, carpeta=".", formato="parquet"):
+    """Convierte <nombre>.csv al formato columnar con el esquema explícito del dataset."""
+    return escribir_columnar(os.path.join(carpeta, nombre + ".csv"), formato)
+
+
+# --- CONVERSIÓN CSV -> ALMACÉN MAPEADO EN MEMORIA ---
+def guardar_almacen(nombre, carpeta="."):
+    """
+    Escribe el almacén del dataset desde su CSV: fechas como datetime64[s], enteros con el
+    ancho de TIPOS_COMPACTOS y los textos codificados con diccionario.
+    """
+    tipos = TIPOS_COMPACTOS[nombre]
+    fechas = [c for c, t in tipos.items() if t.startswith("datetime")]
+    enteros = {c: t for c, t in tipos.items() if t.startswith("int")}
+    df = pd.read_csv(os.path.join(carpeta, nombre + ".csv"), dtype=enteros, parse_dates=fechas)
+    return escribir_almacen(df, nombre, carpeta)
+
+
+# --- COMPRESIÓN CSV -> ZSTD ---
+def comprimir_csv(nombre, carpeta=".", nivel=10):
+    """Escribe <nombre>.csv.zst junto al CSV, para desplegar sin los CSV sueltos."""
+    import zstandard
+
+    ruta = os.path.join(carpeta, nombre + ".csv.zst")
+    with open(os.path.join(carpeta, nombre + ".csv"), "rb") as origen, open(ruta, "wb") as destino:
+        zstandard.ZstdCompressor(level=nivel, threads=-1).copy_stream(origen, destino)
+    return ruta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte los CSV limpios del dashboard a Parquet, Arrow, zstd o al almacén compartido.")
+    parser.add_argument(
+        "--formato", choices=list(EXTENSIONES_COLUMNARES) + ["zst", "almacen"], default="parquet",
+        help="zst: <dataset>.csv.zst; almacen: columnas .npy que todos los procesos del dashboard mapean en memoria"
+    )
+    parser.add_argument("--carpeta", default=".")
+    parser.add_argument(
+        "--memoria", action="store_true",
+        help="No convierte: compara la memoria de cada dataset con la carga normal y la compacta"
+    )
+    parser.add_argument(
+        "--tiempo-carga", action="store_true",
+        help="No convierte: mide la lectura de los datasets en serie (un hilo) y en paralelo"
+    )
+    parser.add_argument("--bloque-mb", type=float, help=f"Con --tiempo-carga: tamaño de bloque al parsear los CSV (por defecto {BYTES_POR_BLOQUE // 2**20})")
+    args = parser.parse_args()
+
+    if args.tiempo_carga:
+        bytes_por_bloque = int(args.bloque_mb * 2**20) if args.bloque_mb else None
+        for nombre in DATASETS:
+            print(f"📄 {nombre}: {version_archivo(nombre, args.carpeta)[0]}")
+        inicio = time.perf_counter()
+        for nombre in DATASETS:
+            leer_dataset(nombre, args.carpeta, workers=1, bytes_por_bloque=bytes_por_bloque)
+        en_serie = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        leer_datasets(DATASETS, args.carpeta, bytes_por_bloque=bytes_por_bloque)
+        en_paralelo = time.perf_counter() - inicio
+        print(f"⏱️ en serie {en_serie:.2f}s, en paralelo ({WORKERS_CARGA} hilos por dataset) {en_paralelo:.2f}s")
+        return
+
+    if args.memoria:
+        normal = memoria_datasets({n: leer_dataset(n, args.carpeta) for n in DATASETS})
+        compacta = memoria_datasets({n: leer_dataset(n, args.carpeta, compacto=True) for n in DATASETS})
+        print(f"{'dataset':<40} {'normal MB':>10} {'compacta MB':>12} {'ahorro':>8}")
+        for nombre in DATASETS:
+            print(
+                f"{nombre:<40} {normal[nombre] / 2**20:>10.2f} {compacta[nombre] / 2**20:>12.2f} "
+                f"{1 - compacta[nombre] / normal[nombre]:>8.0%}"
+            )
+        print(f"{'total':<40} {sum(normal.values()) / 2**20:>10.2f} {sum(compacta.values()) / 2**20:>12.2f}")
+        return
+
+    for nombre in DATASETS:
+        if args.formato == "almacen":
+            ruta = guardar_almacen(nombre, args.carpeta)
+            tamano = sum(e.stat().st_size for e in os.scandir(ruta))
+            print(f"✅ {ruta}: {tamano / 1024:.0f} KB")
+            continue
+        if args.formato == "zst":
+            ruta = comprimir_csv(nombre, args.carpeta)
+        else:
+            ruta = convertir_dataset(nombre, args.carpeta, args.formato)
+        tamano_csv = os.path.getsize(os.path.join(args.carpeta, nombre + ".csv"))
+        print(f"✅ {ruta}: {os.path.getsize(ruta) / 1024:.0f} KB (CSV {tamano_csv / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from carga_datos import leer_dataset, version_archivo
+
+# --- CUANTILES APROXIMADOS (SKETCH KLL) ---
+# Los umbrales de los segmentos "de Interés" / "Estratégicas" (p50/p75 de clientes, p35/p75
+# de películas) salen de un sketch KLL: una pila de niveles donde cada valor del nivel h
+# representa 2**h valores originales. Cuando un nivel se llena se ordena y se sube uno de
+# cada dos valores (con desplazamiento al azar) al nivel siguiente, así que el sketch ocupa
+# O(k · log n) valores y el error de rango es ~1/k sin importar cuántas filas haya:
+#   - se alimenta por bloques de TAMANO_BLOQUE (nunca copia la columna entera);
+#   - dos sketches se fusionan nivel a nivel (por ejemplo, uno por partición de la exportación);
+#   - mientras no se compactó (hasta ~k valores) guarda todos los valores y el cuantil es exacto,
+#     con la misma interpolación lineal que pandas.
+# limpieza_datos.py (--limpiar del pipeline) guarda los sketches de los datasets de clientes
+# y películas en cuantiles_segmentos.json con la versión de la que salieron; el dashboard
+# los usa mientras esa versión siga vigente.
+#
+#   python cuantiles.py             # reconstruye cuantiles_segmentos.json desde los datasets
+
+K_CUANTILES = 2000
+TAMANO_BLOQUE = 65_536
+ARCHIVO_CUANTILES = "cuantiles_segmentos.json"
+
+# Dataset -> columnas cuyos cuantiles definen los segmentos de las pestañas 3 y 4
+COLUMNAS_SEGMENTOS = {
+    "clientes_mas_frecuentes_limpio": ["total_transacciones", "total_gastado"],
+    "peliculas_mas_rentables_limpio": ["total_alquileres", "total_ingresos"],
+}
+
+
+class SketchKLL:
+
+    def __init__(self, k = K_CUANTILES, semilla = 0):
+        self.k = k
+        self.n = 0
+        self.niveles = [np.empty(0)]
+        self._rng = np.random.default_rng(semilla)
+
+    def _capacidad(self, nivel):
+        # Los niveles bajos tienen menos capacidad (factor 2/3 por nivel desde el más alto)
+        profundidad = len(self.niveles) - nivel - 1
+        return int(np.ceil(self.k * (2 / 3) ** profundidad)) + 1
+
+    def _compactar(self):
+        nivel = 0
+        while nivel < len(self.niveles):
+            if len(self.niveles[nivel]) < self._capacidad(nivel):
+                nivel += 1
+                continue
+            if nivel == len(self.niveles) - 1:
+                self.niveles.append(np.empty(0))
+            ordenados = np.sort(self.niveles[nivel])
+            # Sube uno de cada dos (peso doble); con cantidad impar, el mayor se queda
+            par = len(ordenados) - len(ordenados) % 2
+            subidos = ordenados[self._rng.integers(2):par:2]
+            self.niveles[nivel + 1] = np.concatenate([self.niveles[nivel + 1], subidos])
+            self.niveles[nivel] = ordenados[par:]
+            nivel += 1
+
+    def agregar(self, valores):
+        """Agrega los valores (sin NaN) por bloques; devuelve el sketch."""
+        valores = np.asarray(valores)
+        for inicio in range(0, len(valores), TAMANO_BLOQUE):
+            bloque = valores[inicio:inicio + TAMANO_BLOQUE].astype(np.float64)
+            bloque = bloque[~np.isnan(bloque)]
+            self.niveles[0] = np.concatenate([self.niveles[0], bloque])
+            self.n += len(bloque)
+            self._compactar()
+        return self
+
+    def fusionar(self, otro):
+        """Suma otro sketch (mismo k) a este, nivel a nivel."""
+        while len(self.niveles) < len(otro.niveles):
+            self.niveles.append(np.empty(0))
+        for nivel, valores in enumerate(otro.niveles):
+            self.niveles[nivel] = np.concatenate([self.niveles[nivel], valores])
+        self.n += otro.n
+        self._compactar()
+        return self
+
+    @property
+    def exacto(self):
+        return len(self.niveles) == 1
+
+    def cuantil(self, q):
+        if self.n == 0:
+            return np.nan
+        if self.exacto:
+            return float(np.quantile(self.niveles[0], q))
+        valores = np.concatenate(self.niveles)
+        pesos = np.concatenate([np.full(len(v), 2 ** nivel, dtype = np.int64) for nivel, v in enumerate(self.niveles)])
+        orden = np.argsort(valores, kind = "stable")
+        acumulado = np.cumsum(pesos[orden])
+        # Valor cuyo bloque de rangos contiene el rango q · (n - 1)
+        return float(valores[orden][np.searchsorted(acumulado, q * (acumulado[-1] - 1), side = "right")])
+
+    def a_dict(self):
+        return {"k": self.k, "n": self.n, "niveles": [v.tolist() for v in self.niveles]}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        sketch = cls(datos["k"])
+        sketch.n = datos["n"]
+        sketch.niveles = [np.asarray(v, dtype = np.float64) for v in datos["niveles"]]
+        return sketch
+
+
+def construir_cuantiles(df, columnas, k = K_CUANTILES):
+    """Un sketch por columna, alimentado por bloques."""
+    return {columna: SketchKLL(k).agregar(df[columna].to_numpy()) for columna in columnas}
+
+
+# --- PERSISTENCIA ---
+def escribir_cuantiles(carpeta = ".", nombres = None):
+    """
+    Escribe cuantiles_segmentos.json con los sketches de cada dataset (por defecto, todos los
+    de COLUMNAS_SEGMENTOS) y la versión de la que salen; conserva los de los demás datasets.
+    """
+    ruta = os.path.join(carpeta, ARCHIVO_CUANTILES)
+    contenido = {}
+    if os.path.exists(ruta):
+        with open(ruta, encoding = "utf-8") as f:
+            contenido = json.load(f)
+    for nombre in nombres or COLUMNAS_SEGMENTOS:
+        sketches = construir_cuantiles(leer_dataset(nombre, carpeta), COLUMNAS_SEGMENTOS[nombre])
+        contenido[nombre] = {
+            "origen": list(version_archivo(nombre, carpeta)),
+            "sketches": {columna: sketch.a_dict() for columna, sketch in sketches.items()},
+        }
+    with open(ruta + ".parcial", "w", encoding = "utf-8") as f:
+        json.dump(contenido, f)
+    os.replace(ruta + ".parcial", ruta)
+    return ruta
+
+
+def leer_cuantiles(nombre, carpeta = "."):
+    """Sketches guardados del dataset, o None si no hay o salieron de otra versión de los datos."""
+    ruta = os.path.join(carpeta, ARCHIVO_CUANTILES)
+    if nombre not in COLUMNAS_SEGMENTOS or not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding = "utf-8") as f:
+        guardado = json.load(f).get(nombre)
+    if guardado is None or guardado["origen"] != list(version_archivo(nombre, carpeta)):
+        return None
+    return {columna: SketchKLL.desde_dict(datos) for columna, datos in guardado["sketches"].items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Construye los sketches de cuantiles de los segmentos del dashboard.")
+    parser.add_argument("--carpeta", default = ".")
+    args = parser.parse_args()
+
+    ruta = escribir_cuantiles(args.carpeta)
+    for nombre in COLUMNAS_SEGMENTOS:
+        for columna, sketch in leer_cuantiles(nombre, args.carpeta).items():
+            print(f"✅ {nombre}.{columna}: {sketch.n} valores, {sum(len(v) for v in sketch.niveles)} en el sketch")
+    print(f"📦 {ruta}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from agregados import DIAS_SEMANA, agregados_alquileres_mes, agregados_desde_conteos
+from carga_datos import leer_dataset, version_archivo
+
+# --- CUBO DE CONTEOS ---
+# Todos los gráficos de las pestañas 1 y 2 (por hora, por día, categoría x género, por mes,
+# top 4 categorías por mes, estacionalidad) son marginales de un mismo tensor de conteos
+# mes x día de la semana x hora x categoría x género. Se construye una vez desde el detalle
+# y se guarda como .npy (memory-mappable) + .json con las etiquetas de cada eje; el dashboard
+# responde con sumas sobre ejes, sin tocar las filas. Con 10 meses, 16 categorías y 3
+# géneros son ~80 000 celdas (~320 KB en int32), sin importar cuántos alquileres haya.
+#
+#   python cubo.py                  # construye cubo_alquileres.npy/.json desde el detalle
+#
+# El detalle no trae montos, así que el cubo solo tiene conteos (no ingresos).
+
+NOMBRE_CUBO = "cubo_alquileres"
+EJES = ["mes", "weekday", "hour", "categoria", "genero_estimado"]
+MESES = ["January", "February", "March", "April", "May", "June", "July",
+         "August", "September", "October", "November", "December"]
+
+
+# --- CONSTRUCCIÓN ---
+def construir_cubo(df_detalle):
+    """Conteos (int32) y etiquetas de cada eje."""
+    fechas = pd.to_datetime(df_detalle["rental_date"])
+    periodos = fechas.dt.year.to_numpy() * 12 + fechas.dt.month.to_numpy() - 1
+    primero, ultimo = periodos.min(), periodos.max()
+    meses = [f"{p // 12}-{p % 12 + 1:02d}-01" for p in range(primero, ultimo + 1)]
+
+    categorias = pd.Categorical(df_detalle["categoria"])
+    generos = pd.Categorical(df_detalle["genero_estimado"])
+    forma = (len(meses), 7, 24, len(categorias.categories), len(generos.categories))
+
+    # Un solo bincount sobre el índice plano de cada fila
+    indice = np.ravel_multi_index(
+        (periodos - primero, fechas.dt.dayofweek.to_numpy(), fechas.dt.hour.to_numpy(),
+         categorias.codes, generos.codes),
+        forma
+    )
+    conteos = np.bincount(indice, minlength = int(np.prod(forma))).astype(np.int32).reshape(forma)
+
+    etiquetas = {
+        "mes": meses,
+        "weekday": DIAS_SEMANA,
+        "hour": list(range(24)),
+        "categoria": [str(c) for c in categorias.categories],
+        "genero_estimado": [str(g) for g in generos.categories],
+        "fecha_min": str(fechas.min().date()),
+        "fecha_max": str(fechas.max().date()),
+        "vista_previa": json.loads(df_detalle.head().to_json(orient = "records", date_format = "iso")),
+    }
+    return conteos, etiquetas
+
+
+def guardar_cubo(conteos, etiquetas, carpeta = "."):
+    ruta = os.path.join(carpeta, NOMBRE_CUBO)
+    with open(ruta + ".npy.parcial", "wb") as f:
+        np.save(f, conteos)
+    os.replace(ruta + ".npy.parcial", ruta + ".npy")
+    with open(ruta + ".json.parcial", "w", encoding = "utf-8") as f:
+        json.dump(etiquetas, f, ensure_ascii = False, indent = 2)
+    os.replace(ruta + ".json.parcial", ruta + ".json")
+    return ruta + ".npy"
+
+
+# --- LECTURA Y CONSULTAS ---
+class CuboAlquileres:
+
+    def __init__(self, conteos, etiquetas):
+        self.conteos = conteos
+        self.etiquetas = etiquetas
+        self.meses = etiquetas["mes"]
+        self.categorias = etiquetas["categoria"]
+        self.generos = etiquetas["genero_estimado"]
+
+    def marginal(self, *ejes):
+        """Suma del cubo sobre todos los ejes salvo los pedidos (en el orden de EJES)."""
+        return self.conteos.sum(axis = tuple(i for i, eje in enumerate(EJES) if eje not in ejes))
+
+    def agregados_detalle(self):
+        """Entradas de la pestaña 1 (como agregados.agregados_detalle) sin leer el detalle."""
+        return agregados_desde_conteos(
+            pd.DataFrame(self.etiquetas["vista_previa"]),
+            self.marginal("weekday"),
+            self.marginal("hour"),
+            self.marginal("categoria", "genero_estimado"),
+            self.categorias, self.generos
+        )
+
+    def alquileres_mes(self):
+        """Equivalente a alquileres_por_mes_categoria_limpio (mes x categoría con alquileres)."""
+        por_mes_categoria = self.marginal("mes", "categoria")
+        filas_mes, filas_cat = np.nonzero(por_mes_categoria)
+        meses = pd.to_datetime(pd.Series(self.meses))
+        df = pd.DataFrame({
+            "mes": np.asarray(self.meses)[filas_mes],
+            "categoria": np.asarray(self.categorias)[filas_cat],
+            "total_alquileres": por_mes_categoria[filas_mes, filas_cat],
+            "year": meses.dt.year.to_numpy()[filas_mes],
+            "nombre_mes": [MESES[m - 1] for m in meses.dt.month.to_numpy()[filas_mes]],
+            "num_mes": meses.dt.month.to_numpy()[filas_mes],
+            "total_global_mes": por_mes_categoria.sum(axis = 1)[filas_mes],
+        })
+        # Por mes y, dentro del mes, de más a menos alquileres (los gráficos no dependen del orden interno)
+        return df.sort_values(["mes", "total_alquileres"], ascending = [True, False], kind = "stable").reset_index(drop = True)
+
+    def agregados_alquileres_mes(self):
+        """Entradas de la pestaña 2 (como agregados.agregados_alquileres_mes)."""
+        return agregados_alquileres_mes(self.alquileres_mes())
+
+
+# Vistas del dashboard que el cubo responde sin leer su dataset
+AGREGADOS_DEL_CUBO = {
+    "detalle": CuboAlquileres.agregados_detalle,
+    "alquileres_mes": CuboAlquileres.agregados_alquileres_mes,
+}
+
+
+def version_cubo(carpeta = "."):
+    """Tamaño y fecha de modificación del cubo (clave de cache), o None si no se construyó."""
+    ruta = os.path.join(carpeta, NOMBRE_CUBO + ".json")
+    if not os.path.exists(ruta):
+        return None
+    estado = os.stat(ruta)
+    return (estado.st_size, estado.st_mtime_ns)
+
+
+def leer_cubo(carpeta = "."):
+    """
+    Cubo mapeado en memoria (solo lectura), o None si no existe o se construyó desde otra
+    versión del detalle (en ese caso el dashboard vuelve a los agregados por filas).
+    """
+    ruta = os.path.join(carpeta, NOMBRE_CUBO)
+    if not (os.path.exists(ruta + ".npy") and os.path.exists(ruta + ".json")):
+        return None
+    with open(ruta + ".json", encoding = "utf-8") as f:
+        etiquetas = json.load(f)
+    if etiquetas.get("origen") != list(version_archivo("detalle_alquileres_limpio", carpeta)):
+        return None
+    return CuboAlquileres(np.load(ruta + ".npy", mmap_mode = "r"), etiquetas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Construye el cubo de conteos de alquileres del dashboard.")
+    parser.add_argument("--carpeta", default = ".")
+    args = parser.parse_args()
+
+    conteos, etiquetas = construir_cubo(leer_dataset("detalle_alquileres_limpio", args.carpeta))
+    # Versión del detalle con que se construyó: si se regenera, el cubo deja de usarse
+    etiquetas["origen"] = list(version_archivo("detalle_alquileres_limpio", args.carpeta))
+    ruta = guardar_cubo(conteos, etiquetas, args.carpeta)
+    print(f"✅ {ruta}: {' x '.join(map(str, conteos.shape))} celdas, {conteos.nbytes / 1024:.0f} KB, {int(conteos.sum())} alquileres")
+
+
+if __name__ == "__main__":
+    main()
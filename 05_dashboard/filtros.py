@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from agregados import agregados_desde_conteos
+
+# --- MOTOR DE FILTROS DEL DETALLE ---
+# Índices que se arman una sola vez sobre df_detalle para que cualquier combinación de
+# filtros (rango de fechas, categorías, géneros) recalcule los KPIs de la pestaña 1 sin
+# recorrer el DataFrame con máscaras booleanas:
+#   - las filas se ordenan por rental_date: un rango de fechas son dos búsquedas binarias
+#     (np.searchsorted) y queda como un slice contiguo;
+#   - por cada categoría, las posiciones (ya ordenadas) de sus filas: dentro del rango de
+#     fechas se recortan también con searchsorted;
+#   - por cada género, un bitmap (array booleano) para intersectar.
+# Los conteos salen de np.bincount sobre códigos enteros de hora, día, categoría y género.
+
+
+class MotorFiltros:
+
+    def __init__(self, df_detalle):
+        fechas = pd.to_datetime(df_detalle["rental_date"])
+        # Posición en df_detalle de cada fila ordenada; el DataFrame no se copia
+        self.orden = np.argsort(fechas.to_numpy(), kind = "stable")
+        self.df = df_detalle
+        fechas = fechas.iloc[self.orden]
+
+        self.fechas = fechas.to_numpy().astype("datetime64[s]")
+        self.horas = fechas.dt.hour.to_numpy().astype(np.int8)
+        self.dias = fechas.dt.dayofweek.to_numpy().astype(np.int8)
+
+        categorias = pd.Categorical(df_detalle["categoria"].to_numpy()[self.orden])
+        self.nombres_categoria = list(categorias.categories)
+        self.codigos_categoria = categorias.codes.astype(np.int16)
+        self.filas_por_categoria = {
+            nombre: np.flatnonzero(self.codigos_categoria == codigo)
+            for codigo, nombre in enumerate(self.nombres_categoria)
+        }
+
+        generos = pd.Categorical(df_detalle["genero_estimado"].to_numpy()[self.orden])
+        self.nombres_genero = list(generos.categories)
+        self.codigos_genero = generos.codes.astype(np.int8)
+        self.bitmap_por_genero = {
+            nombre: self.codigos_genero == codigo for codigo, nombre in enumerate(self.nombres_genero)
+        }
+
+    @property
+    def rango_fechas(self):
+        return self.fechas[0].astype("datetime64[D]").item(), self.fechas[-1].astype("datetime64[D]").item()
+
+    def seleccionar(self, desde = None, hasta = None, categorias = None, generos = None):
+        """
+        Filas que cumplen los filtros (None = sin filtro; fechas inclusivas, por día). Sin filtro de
+        categoría ni género devuelve un slice del rango de fechas; si no, posiciones ordenadas.
+        """
+        inicio = 0 if desde is None else np.searchsorted(self.fechas, np.datetime64(desde, "s"), side = "left")
+        fin = len(self.fechas) if hasta is None else np.searchsorted(
+            self.fechas, np.datetime64(hasta, "D") + np.timedelta64(1, "D"), side = "left"
+        )
+        if categorias is None and generos is None:
+            return slice(inicio, fin)
+
+        if categorias is None:
+            filas = np.arange(inicio, fin)
+        else:
+            partes = []
+            for nombre in categorias:
+                posiciones = self.filas_por_categoria.get(nombre, np.empty(0, dtype = np.int64))
+                partes.append(posiciones[np.searchsorted(posiciones, inicio):np.searchsorted(posiciones, fin)])
+            filas = np.sort(np.concatenate(partes)) if partes else np.empty(0, dtype = np.int64)
+
+        if generos is not None:
+            bitmap = np.zeros(len(self.fechas), dtype = bool)
+            for nombre in generos:
+                if nombre in self.bitmap_por_genero:
+                    bitmap |= self.bitmap_por_genero[nombre]
+            filas = filas[bitmap[filas]]
+        return filas
+
+    def agregados(self, seleccion):
+        """Mismas entradas que agregados.agregados_detalle, solo para las filas seleccionadas."""
+        n_generos = len(self.nombres_genero)
+        conteo_cruzado = np.bincount(
+            self.codigos_categoria[seleccion].astype(np.int64) * n_generos + self.codigos_genero[seleccion],
+            minlength = len(self.nombres_categoria) * n_generos
+        ).reshape(len(self.nombres_categoria), n_generos)
+        return agregados_desde_conteos(
+            self.df.iloc[self.orden[seleccion][:5]],
+            np.bincount(self.dias[seleccion], minlength = 7),
+            np.bincount(self.horas[seleccion], minlength = 24),
+            conteo_cruzado, self.nombres_categoria, self.nombres_genero
+        )
@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# --- GÉNERO ESTIMADO POR PRIMER NOMBRE ---
+# El notebook estimaba el género con una función aplicada fila por fila sobre `cliente`.
+# Aquí se resuelve una sola vez por primer nombre distinto y el resultado vuelve a las filas
+# por código entero (pd.factorize de clientes y de nombres):
+#   1. cache persistente (cache_generos.json) con los nombres ya resueltos;
+#   2. diccionario opcional nombres_genero.csv (columnas nombre,genero) que corrige la regla;
+#   3. regla del notebook para el resto: termina en 'a' o 'e' -> Femenino, si no Masculino.
+# El cache guarda la versión de la regla y la del diccionario: si cualquiera cambia, se descarta.
+# Lo usan limpieza_datos.py (columna genero_estimado del pipeline) y carga_datos.py
+# (reconstruye la columna si un detalle no la trae).
+#
+#   python generos.py                 # resuelve los nombres del detalle y muestra el origen de cada uno
+#   python generos.py --vaciar-cache
+
+GENEROS = ["Femenino", "Masculino", "Desconocido"]
+DESCONOCIDO = GENEROS.index("Desconocido")
+VERSION_REGLA = 1
+
+CARPETA_GENEROS = os.path.dirname(os.path.abspath(__file__))
+RUTA_DICCIONARIO = os.path.join(CARPETA_GENEROS, "nombres_genero.csv")
+RUTA_CACHE_GENEROS = os.path.join(CARPETA_GENEROS, "cache_generos.json")
+
+
+def primeros_nombres(clientes):
+    """Primer nombre en minúsculas de cada cliente (textos distintos, no filas)."""
+    return pd.Index(np.asarray(clientes, dtype = object)).str.split().str[0].str.lower()
+
+
+def regla_sufijo(nombres):
+    """Regla del notebook sobre un Index de nombres; devuelve el código de GENEROS de cada uno."""
+    nombres = pd.Series(nombres, dtype = object)
+    femenino = nombres.str.endswith(("a", "e")).to_numpy(dtype = bool, na_value = False)
+    return np.where(nombres.isna(), DESCONOCIDO, np.where(femenino, 0, 1)).astype(np.int8)
+
+
+def leer_diccionario(ruta = RUTA_DICCIONARIO):
+    """nombre (minúsculas) -> código de GENEROS; vacío si el archivo no existe."""
+    if not os.path.exists(ruta):
+        return {}
+    df = pd.read_csv(ruta, dtype = str).dropna()
+    generos = df["genero"].str.strip().str.capitalize()
+    invalidos = sorted(set(generos) - set(GENEROS))
+    if invalidos:
+        raise ValueError(f"{ruta}: géneros desconocidos {invalidos} (válidos: {', '.join(GENEROS)})")
+    return dict(zip(df["nombre"].str.strip().str.lower(), generos.map(GENEROS.index)))
+
+
+def _firma(ruta):
+    if not os.path.exists(ruta):
+        return None
+    estado = os.stat(ruta)
+    return [estado.st_size, estado.st_mtime_ns]
+
+
+class EstimadorGenero:
+
+    def __init__(self, ruta_diccionario = RUTA_DICCIONARIO, ruta_cache = RUTA_CACHE_GENEROS):
+        self.diccionario = leer_diccionario(ruta_diccionario)
+        self.ruta_cache = ruta_cache
+        self.firma = [VERSION_REGLA, _firma(ruta_diccionario)]
+        self.resueltos = {}
+        if ruta_cache and os.path.exists(ruta_cache):
+            with open(ruta_cache, encoding = "utf-8") as f:
+                cache = json.load(f)
+            if cache.get("firma") == self.firma:
+                self.resueltos = cache["nombres"]
+        self.nuevos = 0
+
+    def codigos(self, nombres):
+        """Código de GENEROS de cada nombre distinto (NaN -> Desconocido); agrega los nuevos al cache."""
+        nombres = pd.Index(nombres, dtype = object)
+        codigos = np.array(nombres.map(self.resueltos), dtype = float)
+        faltan = np.isnan(codigos) & nombres.notna()
+        if faltan.any():
+            nuevos = nombres[faltan]
+            del_diccionario = np.array(nuevos.map(self.diccionario), dtype = float)
+            resueltos = np.where(np.isnan(del_diccionario), regla_sufijo(nuevos), del_diccionario)
+            codigos[faltan] = resueltos
+            self.resueltos.update(zip(nuevos, resueltos.astype(int).tolist()))
+            self.nuevos += len(nuevos)
+        return np.where(np.isnan(codigos), DESCONOCIDO, codigos).astype(np.int8)
+
+    def estimar(self, clientes):
+        """
+        (primer_nombre, genero_estimado) de cada fila como categóricas. Las operaciones de texto
+        corren sobre los clientes distintos y los nombres distintos; las filas solo indexan códigos.
+        """
+        codigos_cliente, distintos = pd.factorize(clientes)
+        codigos_nombre, nombres = pd.factorize(primeros_nombres(distintos))
+        codigos_fila = np.where(codigos_cliente >= 0, codigos_nombre[codigos_cliente], -1)
+        generos = np.append(self.codigos(nombres), DESCONOCIDO)  # el código -1 (sin nombre) cae en el último
+        return (
+            pd.Categorical.from_codes(codigos_fila, nombres),
+            pd.Categorical.from_codes(generos[codigos_fila], GENEROS),
+        )
+
+    def guardar(self):
+        """Escribe el cache si se resolvieron nombres nuevos (escritura atómica)."""
+        if not self.nuevos or not self.ruta_cache:
+            return
+        with open(self.ruta_cache + ".parcial", "w", encoding = "utf-8") as f:
+            json.dump({"firma": self.firma, "nombres": self.resueltos}, f, ensure_ascii = False, sort_keys = True)
+        os.replace(self.ruta_cache + ".parcial", self.ruta_cache)
+        self.nuevos = 0
+
+
+def main():
+    from carga_datos import leer_dataset
+
+    parser = argparse.ArgumentParser(description = "Género estimado por primer nombre (diccionario + cache + regla).")
+    parser.add_argument("--carpeta", default = ".")
+    parser.add_argument("--vaciar-cache", action = "store_true", help = f"Borra {os.path.basename(RUTA_CACHE_GENEROS)}")
+    args = parser.parse_args()
+
+    if args.vaciar_cache and os.path.exists(RUTA_CACHE_GENEROS):
+        os.remove(RUTA_CACHE_GENEROS)
+    estimador = EstimadorGenero()
+    en_cache = len(estimador.resueltos)
+    detalle = leer_dataset("detalle_alquileres_limpio", args.carpeta)
+    nombres, generos = estimador.estimar(detalle["cliente"])
+    distintos = nombres.categories
+    print(f"👤 {len(detalle)} filas, {len(distintos)} nombres distintos "
+          f"({en_cache} ya en cache, {sum(n in estimador.diccionario for n in distintos)} en el diccionario)")
+    for genero, cantidad in pd.Series(generos).value_counts().items():
+        print(f"  {genero}: {cantidad}")
+    estimador.guardar()
+    print(f"🗂️ {RUTA_CACHE_GENEROS}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import plotly.express as px
+import plotly.graph_objects as go
+
+# --- GRÁFICOS DE DISPERSIÓN ESCALABLES ---
+# Hasta UMBRAL_WEBGL puntos se dibujan en SVG, como siempre; por encima, con trazas WebGL
+# (scattergl), que el navegador pinta en la GPU. Cuando agregados.py ya resumió los puntos
+# generales en una densidad 2D, esa grilla se dibuja como heatmap bajo los puntos destacados.
+UMBRAL_WEBGL = 1_000
+
+
+def modo_render(n_puntos):
+    return "webgl" if n_puntos > UMBRAL_WEBGL else "svg"
+
+
+def _heatmap_densidad(densidad, escala, nombre, mostrar_escala):
+    return go.Heatmap(
+        x = densidad["x"], y = densidad["y"], z = densidad["z"],
+        colorscale = escala, showscale = mostrar_escala, name = nombre,
+        hovertemplate = "x≈%{x:.1f}<br>y≈%{y:.2f}<br>Cantidad: %{z}<extra>" + nombre + "</extra>"
+    )
+
+
+def figura_segmentos(segmentos, x, y, hover_name, colores, titulo):
+    """Dispersión por 'tipo' (segmentos de agregados.segmentar_dispersion)."""
+    puntos = segmentos["puntos"]
+    densidad = segmentos["densidad"]
+    if densidad is None:
+        return px.scatter(
+            puntos, x = x, y = y, color = 'tipo', hover_name = hover_name, size_max = 60,
+            color_discrete_map = colores, template = 'plotly_dark', title = titulo,
+            render_mode = modo_render(len(puntos))
+        )
+
+    # Muchas filas: densidad de los generales + destacados como puntos WebGL encima
+    fig = go.Figure(_heatmap_densidad(
+        densidad, [[0, 'rgba(0,0,0,0)'], [0.001, 'darkgreen'], [1, colores[densidad["tipo"]]]],
+        densidad["tipo"], False
+    ))
+    tipo_destacado = next(t for t in colores if t != densidad["tipo"])
+    fig.add_trace(go.Scattergl(
+        x = puntos[x], y = puntos[y], mode = 'markers', name = tipo_destacado,
+        marker = dict(color = colores[tipo_destacado]), hovertext = puntos[hover_name],
+        hovertemplate = "<b>%{hovertext}</b><br>" + x + "=%{x}<br>" + y + "=%{y}<extra></extra>"
+    ))
+    fig.update_layout(template = 'plotly_dark', title = titulo, showlegend = True)
+    return fig
+
+
+def figura_dispersion_continua(datos, x, y, hover_name, titulo):
+    """Dispersión coloreada por y; si datos ya es una densidad 2D, un heatmap de conteos."""
+    if isinstance(datos, dict):
+        fig = go.Figure(_heatmap_densidad(datos, 'Viridis', 'Cantidad', True))
+        fig.update_layout(template = 'plotly_dark', title = titulo)
+        return fig
+    return px.scatter(
+        datos, x = x, y = y, color = y, hover_name = hover_name, size_max = 60,
+        template = 'plotly_dark', title = titulo, render_mode = modo_render(len(datos))
+    )
@@ -0,0 +1,109 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+# --- INSTRUMENTACIÓN (EXTRACTOR Y DASHBOARD) ---
+# Cada medición es un evento con etiquetas (qué consulta, qué sección) y valores numéricos
+# (segundos por fase, filas, bytes). Se escribe en dos formatos, en la misma carpeta:
+#   - <servicio>.jsonl: una línea JSON por evento, para analizar corridas puntuales;
+#   - <servicio>.prom: formato de texto de Prometheus (lo lee el textfile collector de
+#     node_exporter o cualquier scraper local). Por serie: el último valor como gauge,
+#     la suma acumulada como counter (_total) y la cantidad de eventos (_eventos_total).
+# Con por_proceso=True (los procesos del dashboard) cada proceso escribe su propio .prom
+# con la etiqueta proceso=<pid>, y lo borra al terminar.
+#
+# Variable de entorno: SAKILA_METRICAS (carpeta; por defecto 05_dashboard/metricas, "0" lo desactiva).
+# La usan sql_sakila_script.py (evento "exportacion") y app_dashboard.py (evento "seccion").
+
+RUTA_METRICAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "metricas")
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas_prometheus(etiquetas):
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in etiquetas) + "}"
+
+
+class Instrumentacion:
+
+    def __init__(self, servicio, carpeta = RUTA_METRICAS, por_proceso = False):
+        os.makedirs(carpeta, exist_ok = True)
+        self.servicio = servicio
+        self.ruta_log = os.path.join(carpeta, f"{servicio}.jsonl")
+        self.ruta_prometheus = os.path.join(carpeta, f"{servicio}_{os.getpid()}.prom" if por_proceso else f"{servicio}.prom")
+        self._proceso = [("proceso", str(os.getpid()))] if por_proceso else []
+        # (evento, etiquetas) -> {"eventos": n, "ultimo": {valor: x}, "suma": {valor: x}}
+        self._series = {}
+        # Los reruns de Streamlit corren en hilos del mismo proceso
+        self._lock = threading.Lock()
+        if por_proceso:
+            atexit.register(self._borrar_prometheus)
+
+    def registrar(self, evento, etiquetas, valores):
+        """Agrega un evento al log JSON y actualiza el archivo de Prometheus."""
+        linea = json.dumps(
+            {"ts": round(time.time(), 3), "servicio": self.servicio, "evento": evento, **etiquetas, **valores},
+            ensure_ascii = False, default = str
+        )
+        clave = (evento, tuple(sorted((k, str(v)) for k, v in etiquetas.items())))
+        with self._lock:
+            # Una sola escritura en modo append: las líneas de otros procesos no se intercalan
+            with open(self.ruta_log, "a", encoding = "utf-8") as f:
+                f.write(linea + "\n")
+            serie = self._series.setdefault(clave, {"eventos": 0, "ultimo": {}, "suma": {}})
+            serie["eventos"] += 1
+            for nombre, valor in valores.items():
+                serie["ultimo"][nombre] = valor
+                serie["suma"][nombre] = serie["suma"].get(nombre, 0) + valor
+            self._escribir_prometheus()
+
+    def _escribir_prometheus(self):
+        metricas = {}
+        for (evento, etiquetas), serie in self._series.items():
+            etiquetas = _etiquetas_prometheus(list(etiquetas) + self._proceso)
+            metricas.setdefault((f"sakila_{evento}_eventos_total", "counter"), []).append((etiquetas, serie["eventos"]))
+            for nombre, valor in serie["ultimo"].items():
+                metricas.setdefault((f"sakila_{evento}_{nombre}", "gauge"), []).append((etiquetas, valor))
+                metricas.setdefault((f"sakila_{evento}_{nombre}_total", "counter"), []).append((etiquetas, serie["suma"][nombre]))
+
+        lineas = []
+        for (nombre, tipo), muestras in sorted(metricas.items()):
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            lineas.extend(f"{nombre}{etiquetas} {float(valor)!r}" for etiquetas, valor in muestras)
+        # Escritura atómica: el scraper nunca lee un archivo a medio escribir
+        parcial = self.ruta_prometheus + ".parcial"
+        with open(parcial, "w", encoding = "utf-8") as f:
+            f.write("\n".join(lineas) + "\n")
+        os.replace(parcial, self.ruta_prometheus)
+
+    def _borrar_prometheus(self):
+        try:
+            os.remove(self.ruta_prometheus)
+        except OSError:
+            pass
+
+
+def instrumentacion_desde_entorno(servicio, por_proceso = False):
+    """Instrumentación en la carpeta de SAKILA_METRICAS, o None si está desactivada."""
+    carpeta = os.environ.get("SAKILA_METRICAS", RUTA_METRICAS)
+    if carpeta == "0":
+        return None
+    return Instrumentacion(servicio, carpeta, por_proceso = por_proceso)
+
+
+# --- CRONÓMETRO POR FASES ---
+class Cronometro:
+    """Reparte el tiempo por vueltas: marcar(fase) suma a esa fase lo transcurrido desde la marca anterior."""
+
+    def __init__(self):
+        self.fases = {}
+        self._ultima = time.perf_counter()
+
+    def marcar(self, fase):
+        ahora = time.perf_counter()
+        self.fases[fase] = self.fases.get(fase, 0.0) + ahora - self._ultima
+        self._ultima = ahora